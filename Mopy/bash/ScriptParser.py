@@ -200,6 +200,25 @@ def __init__(self, statement_type, active, keywords=[], **attribs):
         for i in attribs:
             setattr(self, i, attribs[i])
 
+# CompiledScript ----------------------------------
+#  Holds the compiled form of a script: the lexemes
+#  of each line it ran and the RPN of each
+#  expression it evaluated, so lines that run more
+#  than once skip tokenizing and conversion to RPN
+#--------------------------------------------------
+class CompiledScript(object):
+    __slots__ = (u'lines', u'rpns')
+
+    def __init__(self):
+        # line text -> tuple of (text, type, pos) lexemes. Whether a name is
+        # a variable changes while running, so those are stored as NAME and
+        # resolved when the line runs
+        self.lines = {}
+        # expression signature -> tuple of (token index, text, type, numArgs)
+        # instructions - the index points into the expression's tokens, or
+        # is None for tokens that TokensToRPN inserts itself
+        self.rpns = {}
+
 # Token -------------------------------------------
 #  Token object, to hold info about a token
 #--------------------------------------------------
@@ -428,6 +447,7 @@ def __init__(self,
         self.cLine = 0
         self.tokens = []
         self.Flow = []
+        self.compiled = CompiledScript()
 
         self.opChars = ''
         self.operators = {}
@@ -523,14 +543,28 @@ def PurgeFlow(self): self.Flow = []
     # Run a line of code: returns True if more lines are needed to make a complete line, False if not
     def RunLine(self, line):
         # First reset tokens if we're starting a new line
-        if not self.runon:
+        continued = self.runon
+        if not continued:
             self.cLineStart = self.cLine
             self.tokens = []
 
-        # Now parse the tokens
+        # Now parse the tokens - lines continuing a previous one depend on
+        # its tokens, so only complete lines are compiled
         self.cLine += 1
-        self.TokenizeLine(line)
-        if self.runon: return True
+        lexemes = None if continued else self.compiled.lines.get(line)
+        if lexemes is None:
+            self.TokenizeLine(line)
+            if self.runon: return True
+            if not continued:
+                self.compiled.lines[line] = tuple(
+                    (t.text, NAME if t.type == VARIABLE else t.type, t.pos)
+                    for t in self.tokens)
+        else:
+            self.cCol = len(line)
+            variables = self.variables
+            self.tokens = [Parser.Token(text, VARIABLE if (
+                type_ == NAME and text in variables) else type_, self,
+                self.cLine, pos) for text, type_, pos in lexemes]
 
         # No tokens?
         if len(self.tokens) == 0: return False
@@ -609,7 +643,30 @@ def TokenizeLine(self, line):
     # Run a list of tokens
     def ExecuteTokens(self, tokens=None):
         tokens = tokens or self.tokens
-        self.TokensToRPN(list(tokens))
+        # Variables and names are handled the same when converting to RPN
+        signature = tuple((t.text, NAME if t.type == VARIABLE else t.type,
+                           t.numArgs) for t in tokens)
+        try:
+            instructions = self.compiled.rpns.get(signature)
+        except TypeError: # unhashable token text, can't be compiled
+            signature = instructions = None
+        if instructions is None:
+            rpn = self.TokensToRPN(list(tokens))
+            if signature is not None:
+                token_index = {id(t): i for i, t in enumerate(tokens)}
+                self.compiled.rpns[signature] = tuple(
+                    (token_index.get(id(t)), t.text, t.type, t.numArgs)
+                    for t in rpn)
+            return self.ExecuteRPN()
+        rpn = []
+        for i, text, type_, numArgs in instructions:
+            if i is None:
+                tok = Parser.Token(text, type_, self)
+            else:
+                tok = tokens[i]
+            tok.numArgs = numArgs
+            rpn.append(tok)
+        self.rpn = rpn
         return self.ExecuteRPN()
 
     # Convert a list of tokens to rpn
@@ -725,13 +782,12 @@ def ExecuteRPN(self, rpn=None):
         stack = []
         for i in rpn:
             if i.type == OPERATOR:
-                if len(stack) < i.tkn.minArgs:
-                    error(ERR_TOO_FEW_ARGS % (u'operator', i.text, len(stack), i.tkn.minArgs))
-                args = []
-                while len(args) < i.tkn.minArgs:
-                    args.append(stack.pop())
-                args.reverse()
-                ret = i(*args)
+                op = i.tkn
+                if len(stack) < op.minArgs:
+                    error(ERR_TOO_FEW_ARGS % (u'operator', i.text, len(stack), op.minArgs))
+                args = stack[-op.minArgs:]
+                del stack[-op.minArgs:]
+                ret = op(*args)
                 if isinstance(ret, list):
                     stack.extend([Parser.Token(x) for x in ret])
                 else:
@@ -32,6 +32,7 @@
 import errno
 import re
 import time
+from bisect import bisect_right
 from collections import defaultdict, OrderedDict
 # Local
 from . import bass, bolt, env, exception
@@ -761,6 +762,49 @@ def _do_swap(cached_ini, ini_key):
             _do_swap(self._cached_ini_lo, self.ini_key_lo)
         super(INIGame, self).swap(old_path, new_path)
 
+def _plan_restamp(mtimes, spacing=60):
+    """Plan the smallest set of mtime changes that make the specified
+    mtimes, which belong to plugins in their desired load order, strictly
+    increasing. Returns a list holding the new mtime of each plugin, or None
+    if the plugin can keep its current mtime.
+
+    Two plugins at positions i < j can both keep their mtimes iff there are
+    enough free seconds between them for the plugins in between, i.e. iff
+    mtimes[j] - mtimes[i] >= j - i. So the plugins to keep are a longest
+    non-decreasing subsequence of mtimes[k] - k. The first plugin (the game
+    master) always keeps its mtime, so that subsequence starts with it and
+    only plugins that fit after it are candidates. The others are spread
+    evenly over the gaps between kept plugins, or placed spacing seconds
+    apart after the last kept plugin."""
+    parents = [None] * len(mtimes)
+    tails, tail_indices = [], []
+    for k, mtime in enumerate(mtimes):
+        if k and mtime - k < mtimes[0]: continue # would sort before master
+        pos = bisect_right(tails, mtime - k)
+        if pos: parents[k] = tail_indices[pos - 1]
+        if pos == len(tails):
+            tails.append(mtime - k)
+            tail_indices.append(k)
+        else:
+            tails[pos] = mtime - k
+            tail_indices[pos] = k
+    kept = []
+    k = tail_indices[-1] if tail_indices else None
+    while k is not None:
+        kept.append(k)
+        k = parents[k]
+    kept.reverse()
+    new_mtimes = [None] * len(mtimes)
+    if not kept: return new_mtimes
+    last = kept[-1]
+    for i, j in zip(kept, kept[1:]):
+        time_gap = mtimes[j] - mtimes[i]
+        for k in xrange(1, j - i):
+            new_mtimes[i + k] = mtimes[i] + time_gap * k // (j - i)
+    for k in xrange(last + 1, len(mtimes)):
+        new_mtimes[k] = mtimes[last] + spacing * (k - last)
+    return new_mtimes
+
 class TimestampGame(Game):
     """Oblivion and other games where load order is set using modification
     times.
@@ -818,27 +862,18 @@ def _fetch_active_plugins(self):
     def _persist_load_order(self, lord, active):
         assert set(self.mod_infos.keys()) == set(lord) # (lord must be valid)
         if len(lord) == 0: return
-        current = self.__calculate_mtime_order()
-        # break conflicts
-        older = self.mod_infos[current[0]].mtime # initialize to game master
-        for i, mod in enumerate(current[1:]):
+        # restamp as few mods as possible, breaking conflicts along the way
+        new_mtimes = _plan_restamp([self.mod_infos[m].mtime for m in lord])
+        for mod, new_mtime in zip(lord, new_mtimes):
+            if new_mtime is None: continue
             info = self.mod_infos[mod]
-            if info.mtime == older: break
-            older = info.mtime
-        else: mod = i = None # define i to avoid warning below
-        if mod is not None: # respace this and next mods in 60 sec intervals
-            for mod in current[i + 1:]:
-                info = self.mod_infos[mod]
-                older += 60
-                info.setmtime(older)
-        restamp = []
-        for ordered, mod in zip(lord, current):
-            if ordered == mod: continue
-            restamp.append((ordered, self.mod_infos[mod].mtime))
-        for ordered, mtime in restamp:
-            self.mod_infos[ordered].setmtime(mtime)
-        # rebuild our cache
-        self._rebuild_mtimes_cache()
+            old_mtime = info.mtime
+            info.setmtime(new_mtime)
+            # update our cache
+            self._mtime_mods[old_mtime].discard(mod)
+            if not self._mtime_mods[old_mtime]:
+                del self._mtime_mods[old_mtime]
+            self._mtime_mods[new_mtime].add(mod)
 
     def _rebuild_mtimes_cache(self):
         self._mtime_mods.clear()
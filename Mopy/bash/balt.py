@@ -39,6 +39,7 @@
 import threading
 from functools import partial, wraps
 from collections import OrderedDict
+from itertools import chain
 #--wx
 import wx
 import wx.adv
@@ -46,7 +47,7 @@
 from .gui import Button, CancelButton, CheckBox, HBoxedLayout, HLayout, \
     Label, LayoutOptions, OkButton, RIGHT, Stretch, TextArea, TOP, VLayout, \
     web_viewer_available, DialogWindow, WindowFrame, EventResult, ListBox, \
-    Font, CheckListBox, UIListCtrl, PanelWin, Colors, DocumentViewer, ImageWrapper, \
+    Font, CheckListBox, UIListCtrl, VirtualUIListCtrl, PanelWin, Colors, DocumentViewer, ImageWrapper, \
     BusyCursor, GlobalMenu, WrappingTextMixin
 from .gui.base_components import _AComponent
 
@@ -898,10 +899,16 @@ class UIList(wx.Panel):
     _editLabels = False # allow editing the labels - also enables F2 shortcut
     _sunkenBorder = True
     _singleCell = False # allow only single selections (no ctrl/shift+click)
+    # Use a virtual list control, which only computes the labels and format of
+    # the rows that are painted - set on lists that may get very long
+    _virtual = False
     #--Sorting
     nonReversibleCols = {u'Load Order', u'Current Order'}
     _default_sort_col = 'File' # override as needed
     _sort_keys = {} # sort_keys[col] provides the sort key for this col
+    # Columns whose sort keys depend on global state (e.g. the load order),
+    # so they can change without their item being refreshed - never memoized
+    _volatile_sort_cols = frozenset()
     _extra_sortings = [] #extra self.methods for fancy sortings - order matters
     # Labels, map the (permanent) order of columns to the label generating code
     labels = OrderedDict()
@@ -922,13 +929,23 @@ def __init__(self, parent, keyPrefix, listData=None, panel=None):
         self.__class__.icons = ColorChecks() \
             if self.__class__.icons is self.__icons else self.__class__.icons
         #--gList
-        self.__gList = UIListCtrl(self, self.__class__._editLabels,
+        # Memo of the rows of a virtual list, item -> (labels, image, attr)
+        self._row_cache = {}
+        # Memo of the sort keys, column -> item -> key, the positions of the
+        # items when sorted by the default column and the last sort result
+        self._sort_key_cache = {}
+        self._default_ranks = None
+        self._last_sorted = []
+        list_ctrl_type = VirtualUIListCtrl if self._virtual else UIListCtrl
+        self.__gList = list_ctrl_type(self, self.__class__._editLabels,
                                   self.__class__._sunkenBorder,
                                   self.__class__._singleCell, self.dndAllow,
                                   dndFiles=self.__class__._dndFiles,
                                   dndList=self.__class__._dndList,
                                   fnDropFiles=self.OnDropFiles,
                                   fnDropIndexes=self.OnDropIndexes)
+        if self._virtual:
+            self.__gList.set_row_provider(self._get_row)
         if self.icons:
             # Image List: Column sorting order indicators
             # explorer style ^ == ascending
@@ -1018,6 +1035,13 @@ def PopulateItem(self, itemDex=-1, item=None):
                 insert = True
         else: # no way we're inserting with a None item
             item = self.GetItem(itemDex)
+        self._invalidate_items([item])
+        if self._virtual: # row will be recomputed when painted
+            if insert:
+                self.__gList.InsertListCtrlItem(itemDex, u'', item)
+            else:
+                self.__gList.refresh_item_at(itemDex)
+            return
         for colDex, col in enumerate(self.cols):
             labelTxt = self.labels[col](self, item)
             if insert and colDex == 0:
@@ -1042,46 +1066,90 @@ def set_item_format(self, item, item_format):
         tweak_status in Inis) to update respective info's status."""
         pass # screens, bsas
 
-    def __setUI(self, fileName, itemDex):
-        """Set font, status icon, background text etc."""
-        gItem = self.__gList._native_widget.GetItem(itemDex)
+    def _get_item_format(self, item):
+        """Return the format of the specified item and its image index (-1 if
+        it has no image)."""
         df = self._ListItemFormat()
-        self.set_item_format(fileName, df)
+        self.set_item_format(item, df)
+        img = -1
         if df.icon_key and self.icons:
             if isinstance(df.icon_key, tuple):
                 img = self.icons.Get(*df.icon_key)
             else: img = self.icons[df.icon_key]
-            gItem.SetImage(img)
-        if df.text_key:
-            gItem.SetTextColour(colors[df.text_key].to_rgba_tuple())
-        else:
-            gItem.SetTextColour(self.__gList._native_widget.GetTextColour())
-        if df.back_key:
-            gItem.SetBackgroundColour(colors[df.back_key].to_rgba_tuple())
-        else: gItem.SetBackgroundColour(self._defaultTextBackground)
+        return df, img
+
+    def _get_colors(self, df):
+        """Return the text and background colors for the specified format."""
+        text_color = colors[df.text_key].to_rgba_tuple() if df.text_key \
+            else self.__gList._native_widget.GetTextColour()
+        back_color = colors[df.back_key].to_rgba_tuple() if df.back_key \
+            else self._defaultTextBackground
+        return text_color, back_color
+
+    def __setUI(self, fileName, itemDex):
+        """Set font, status icon, background text etc."""
+        gItem = self.__gList._native_widget.GetItem(itemDex)
+        df, img = self._get_item_format(fileName)
+        if img != -1: gItem.SetImage(img)
+        text_color, back_color = self._get_colors(df)
+        gItem.SetTextColour(text_color)
+        gItem.SetBackgroundColour(back_color)
         gItem.SetFont(Font.Style(gItem.GetFont(), bold=df.strong,
                                  slant=df.italics, underline=df.underline))
         self.__gList._native_widget.SetItem(gItem)
 
+    def _get_row(self, item):
+        """Return the labels, image index and attributes of the row for the
+        specified item of a virtual list, computing them if they are not
+        memoized."""
+        try:
+            return self._row_cache[item]
+        except KeyError:
+            labels = [self.labels[col](self, item) for col in self.cols]
+            df, img = self._get_item_format(item)
+            text_color, back_color = self._get_colors(df)
+            font = Font.Style(self.__gList._native_widget.GetFont(),
+                bold=df.strong, slant=df.italics, underline=df.underline)
+            row = self._row_cache[item] = (labels, img, wx.ItemAttr(
+                text_color, back_color, font))
+            return row
+
     def PopulateItems(self):
         """Sort items and populate entire list."""
         self.mouseTexts.clear()
-        items = set(self.data_store.keys())
-        #--Update existing items.
-        index = 0
-        while index < self.item_count:
-            item = self.GetItem(index)
-            if item not in items: self.__gList.RemoveItemAt(index)
-            else:
-                self.PopulateItem(itemDex=index)
-                items.remove(item)
-                index += 1
-        #--Add remaining new items
-        for item in items: self.PopulateItem(item=item)
+        self._invalidate_items()
+        # SortItems will display exactly the items in the data store in
+        # virtual lists, so there is nothing more to do for them here
+        if not self._virtual:
+            items = set(self.data_store.keys())
+            #--Update existing items.
+            index = 0
+            while index < self.item_count:
+                item = self.GetItem(index)
+                if item not in items: self.__gList.RemoveItemAt(index)
+                else:
+                    self.PopulateItem(itemDex=index)
+                    items.remove(item)
+                    index += 1
+            #--Add remaining new items
+            for item in items: self.PopulateItem(item=item)
         #--Sort
         self.SortItems()
         self.autosizeColumns()
 
+    def _invalidate_items(self, items=None):
+        """Drop the memoized rows and sort keys of the specified items, or of
+        all items if items is None."""
+        if items is None:
+            self._row_cache.clear()
+            self._sort_key_cache.clear()
+        else:
+            for item in items:
+                self._row_cache.pop(item, None)
+                for col_keys in self._sort_key_cache.itervalues():
+                    col_keys.pop(item, None)
+        self._default_ranks = None
+
     __all = ()
     def RefreshUI(self, redraw=__all, to_del=__all, detail_item='SAME',
                   **kwargs):
@@ -1091,10 +1159,13 @@ def RefreshUI(self, redraw=__all, to_del=__all, detail_item='SAME',
         if redraw is to_del is self.__all:
             self.PopulateItems()
         else:  #--Iterable
-            for d in to_del:
-                self.__gList.RemoveItemAt(self.GetIndex(d))
-            for upd in redraw:
-                self.PopulateItem(item=upd)
+            self._invalidate_items(chain(to_del, redraw))
+            # SortItems below adds and removes the items of virtual lists
+            if not self._virtual:
+                for d in to_del:
+                    self.__gList.RemoveItemAt(self.GetIndex(d))
+                for upd in redraw:
+                    self.PopulateItem(item=upd)
             #--Sort
             self.SortItems()
             self.autosizeColumns()
@@ -1270,7 +1341,9 @@ def ClearSelected(self, clear_details=False):
     def SelectLast(self):
         self.__gList.lc_select_item_at_index(self.item_count - 1)
 
-    def DeleteAll(self): self.__gList.DeleteAll()
+    def DeleteAll(self):
+        self._invalidate_items()
+        self.__gList.DeleteAll()
 
     def EnsureVisibleItem(self, name, focus=False):
         self.EnsureVisibleIndex(self.GetIndex(name), focus=focus)
@@ -1311,7 +1384,15 @@ def SortItems(self, column=None, reverse='CURRENT'):
         """
         column, reverse, oldcol = self._GetSortSettings(column, reverse)
         items = self._SortItems(column, reverse)
-        self.__gList.ReorderDisplayed(items)
+        if self._virtual:
+            # Selection is tracked by index in virtual lists - restore it
+            selected = self.GetSelected()
+            self.ClearSelected()
+            self.__gList.ReorderDisplayed(items)
+            displayed = set(items)
+            self.SelectItemsNoCallback(s for s in selected if s in displayed)
+        else:
+            self.__gList.ReorderDisplayed(items)
         self._setColumnSortIndicator(column, oldcol, reverse)
 
     def _GetSortSettings(self, column, reverse):
@@ -1340,21 +1421,60 @@ def _GetSortSettings(self, column, reverse):
         self.colReverse[column] = reverse
         return column, reverse, curColumn
 
+    def _cached_sort_key(self, col):
+        """Return a sort key function for the specified column that memoizes
+        the key of each item - see _invalidate_items. Keys of volatile columns
+        are not memoized."""
+        k = self._sort_keys[col] # if key is None then keep it None else
+        k = bolt.natural_key() if k is None else partial(k, self) # give self
+        if col in self._volatile_sort_cols: return k
+        col_keys = self._sort_key_cache.setdefault(col, {})
+        def cached_key(item):
+            try:
+                return col_keys[item]
+            except KeyError:
+                sort_key = col_keys[item] = k(item)
+                return sort_key
+        return cached_key
+
+    def _get_default_ranks(self, items):
+        """Return a dict mapping items to their position when sorted by the
+        default sort column, recomputing it if items were added or
+        invalidated."""
+        ranks = self._default_ranks
+        if (ranks is None or any(i not in ranks for i in items) or
+                self._default_sort_col in self._volatile_sort_cols):
+            default_sorted = sorted(items, key=self._cached_sort_key(
+                self._default_sort_col))
+            ranks = self._default_ranks = {i: r for r, i in
+                                           enumerate(default_sorted)}
+        return ranks
+
     def _SortItems(self, col, reverse=False, items=None, sortSpecial=True):
         """Sort and return items by specified column, possibly in reverse
-        order.
+        order. Items that sort equal by column are always in ascending order
+        of the default sort column.
 
         If items are not specified, sort self.data_store.keys() and
         return that. If sortSpecial is False do not apply extra sortings."""
-        items = items if items is not None else self.data_store.keys()
-        def key(k): # if key is None then keep it None else provide self
-            k = self._sort_keys[k]
-            return bolt.natural_key() if k is None else partial(k, self)
-        defaultKey = key(self._default_sort_col)
-        defSort = col == self._default_sort_col
-        # always apply default sort
-        items.sort(key=defaultKey, reverse=defSort and reverse)
-        if not defSort: items.sort(key=key(col), reverse=reverse)
+        if items is None:
+            # Start from the previous sort result - timsort is close to linear
+            # on nearly sorted input, so re-sorting after a refresh that only
+            # changed a few items is cheap
+            items = self.data_store.keys()
+            store_keys = set(items)
+            prev_sorted = [i for i in self._last_sorted if i in store_keys]
+            prev_keys = set(prev_sorted)
+            items = prev_sorted + [i for i in items if i not in prev_keys]
+            self._last_sorted = items
+        if col == self._default_sort_col:
+            items.sort(key=self._cached_sort_key(col), reverse=reverse)
+        else: # sort by both columns in one stable pass
+            col_key = self._cached_sort_key(col)
+            ranks = self._get_default_ranks(items)
+            rank_sign = -1 if reverse else 1
+            items.sort(key=lambda i: (col_key(i), rank_sign * ranks[i]),
+                       reverse=reverse)
         if sortSpecial:
             for lamda in self._extra_sortings: lamda(self, items)
         return items
@@ -1412,6 +1532,7 @@ def PopulateColumns(self):
         """Create/name columns in ListCtrl."""
         cols = self.cols # this may have been updated in ColumnsMenu.Execute()
         numCols = len(cols)
+        self._row_cache.clear() # memoized labels follow the column order
         names = {_settings['bash.colNames'].get(key) for key in cols}
         self._colDict.clear()
         colDex, listCtrl = 0, self.__gList
@@ -116,6 +116,14 @@ def arg(group, dashed, descr, dest, action='store', default=None):
     parser.add_argument('--genHtml',
                         default=None,
                         help=argparse.SUPPRESS)
+    parser.add_argument('--profile-imports',
+                        action='store_true',
+                        default=False,
+                        dest='profile_imports',
+                        help='Print how long importing each module took once '
+                             'the main window is shown (best combined with '
+                             '-d, so the output ends up in '
+                             'BashBugDump.log).')
     parser.add_argument('-L', '--Language',
                         action='store',
                         default='',
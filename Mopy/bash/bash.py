@@ -33,7 +33,9 @@
 import platform
 import shutil
 import sys
+import time
 import traceback
+import types
 from ConfigParser import ConfigParser
 # Local
 from . import bass, bolt, env, exception, localize
@@ -72,6 +74,62 @@ def _early_setup(debug):
         sys.stdout = _bugdump_handle
         sys.stderr = _bugdump_handle
 
+class _ImportProfiler(object):
+    """Wraps __import__ to record how long importing each module took, both
+    cumulatively (including the modules it imported in turn) and by itself.
+    Installed by the --profile-imports command line option."""
+    def __init__(self):
+        import __builtin__
+        self._builtins = __builtin__
+        self._real_import = __builtin__.__import__
+        self._nested_times = [] # time spent in nested imports, per call
+        self._timings = {} # module label -> [cumulative, own]
+        # module name -> number of modules seen before it, so we can tell
+        # which modules were imported during a given __import__ call
+        self._seen_modules = {m: 0 for m in sys.modules}
+        __builtin__.__import__ = self._timed_import
+
+    def _timed_import(self, name, globals_=None, locals_=None, fromlist=None,
+                      level=-1):
+        num_modules = len(sys.modules)
+        num_seen = len(self._seen_modules)
+        self._nested_times.append(0.0)
+        start = time.time()
+        try:
+            imported = self._real_import(name, globals_, locals_, fromlist,
+                                         level)
+        finally:
+            elapsed = time.time() - start
+            nested = self._nested_times.pop()
+            if self._nested_times: self._nested_times[-1] += elapsed
+        if len(sys.modules) > num_modules: # something was actually imported
+            for module_name in sys.modules:
+                self._seen_modules.setdefault(module_name,
+                                              len(self._seen_modules))
+            if fromlist: # from package import module(s)?
+                label = imported.__name__
+                submodules = [f for f in fromlist if isinstance(
+                    getattr(imported, f, None), types.ModuleType) and
+                    self._seen_modules.get(u'%s.%s' % (label, f),
+                                           -1) >= num_seen]
+                if submodules: label += u'.' + u','.join(submodules)
+            else: label = name
+            timings = self._timings.setdefault(label, [0.0, 0.0])
+            timings[0] += elapsed
+            timings[1] += elapsed - nested
+        return imported
+
+    def report(self, max_modules=50):
+        """Uninstall the profiler and print the modules that took longest to
+        import."""
+        self._builtins.__import__ = self._real_import
+        print(u'Import times (cumulative, own):')
+        for label, (cumulative, own) in sorted(self._timings.iteritems(),
+                key=lambda t: t[1][0], reverse=True)[:max_modules]:
+            print(u'%8.3fs %8.3fs  %s' % (cumulative, own, label))
+
+_import_profiler = None # type: _ImportProfiler
+
 def _import_wx():
     """Import wxpython or show a tkinter error and exit if unsuccessful."""
     global _wx
@@ -235,6 +293,9 @@ def main(opts):
 
     :param opts: command line arguments
     :type opts: Namespace"""
+    global _import_profiler
+    if opts.profile_imports:
+        _import_profiler = _ImportProfiler()
     # Change working dir and logging
     _early_setup(opts.debug)
     # wx is needed to initialize locale, so that's first
@@ -411,6 +472,7 @@ def _main(opts, wx_locale):
     frame = app.Init() # Link.Frame is set here !
     frame.ensureDisplayed()
     frame.bind_refresh()
+    if _import_profiler: _import_profiler.report()
     app.MainLoop()
 
 def _detect_game(opts, backup_bash_ini):
@@ -309,6 +309,7 @@ class MasterList(_ModsUIList):
         'Current Order': lambda self, a: self.loadOrderNames.index(
            self.data_store[a].curr_name),
     }
+    _volatile_sort_cols = frozenset(['Current Order'])
     def _activeModsFirst(self, items):
         if self.selectedFirst:
             items.sort(key=lambda x: self.data_store[x].curr_name not in set(
@@ -659,17 +660,60 @@ def apply_tweaks(cls, tweak_infos, target_ini=None):
         if not cls.ask_create_target_ini(target_ini_file) or not \
                 cls._warn_tweak_game_ini(target_ini_file.abs_path.stail):
             return False
-        needsRefresh = False
+        tweaks_lines, applied_infos = [], []
+        # section -> setting -> the value the tweaks applied so far set it to
+        # (None if they delete it)
+        queued_settings = bolt.DefaultLowerDict(bolt.LowerDict)
         for ini_info in tweak_infos:
-            #--No point applying a tweak that's already applied
             if target_ini: # if target was given calculate the status for it
                 stat = ini_info.getStatus(target_ini_file)
                 ini_info.reset_status() # iniInfos.ini may differ from target
             else: stat = ini_info.tweak_status
-            if stat == 20 or not ini_info.is_applicable(stat): continue
-            needsRefresh |= target_ini_file.applyTweakFile(
-                ini_info.read_ini_content())
-        return needsRefresh
+            if not ini_info.is_applicable(stat): continue
+            tweak_settings, tweak_deleted = ini_info.get_ci_settings(
+                with_deleted=True)
+            #--No point applying a tweak that's already applied - unless a
+            # tweak before it in this batch changes its settings
+            if stat == 20 and not cls._changed_in_batch(
+                    tweak_settings, tweak_deleted, queued_settings): continue
+            for section, section_settings in tweak_settings.iteritems():
+                for setting, (value, _line) in section_settings.iteritems():
+                    queued_settings[section][setting] = value
+            for section, section_deleted in tweak_deleted.iteritems():
+                for setting in section_deleted:
+                    queued_settings[section][setting] = None
+            tweaks_lines.append(ini_info.read_ini_content())
+            applied_infos.append(ini_info)
+        if not tweaks_lines: return False
+        # read and write the target ini once, no matter how many tweaks
+        conflicts = target_ini_file.applyTweakFiles(tweaks_lines)
+        overridden = [u'%s: %s' % (ini_info.abs_path.stail, u', '.join(
+            u'[%s] %s' % s for s in sorted(tweak_conflicts)))
+            for ini_info, tweak_conflicts in zip(applied_infos, conflicts)
+            if tweak_conflicts]
+        if overridden:
+            balt.showWarning(balt.Link.Frame, _(
+                u'These settings were overridden by tweaks applied after '
+                u'them and so do not have the values these tweaks set:') +
+                u'\n\n' + u'\n'.join(overridden), _(u'INI Tweaks'))
+        return True
+
+    @staticmethod
+    def _changed_in_batch(tweak_settings, tweak_deleted, queued_settings):
+        """Return True if the tweaks queued before a tweak with the
+        specified settings and deleted settings set or delete any of them
+        differently."""
+        for section, section_settings in tweak_settings.iteritems():
+            queued_section = queued_settings.get(section, {})
+            for setting, (value, _line) in section_settings.iteritems():
+                if queued_section.get(setting, value) != value:
+                    return True
+        for section, section_deleted in tweak_deleted.iteritems():
+            queued_section = queued_settings.get(section, {})
+            for setting in section_deleted:
+                if queued_section.get(setting) is not None:
+                    return True
+        return False
 
     @staticmethod
     @balt.conversation
@@ -821,10 +865,14 @@ def _get(self, mod): return partial(self.data_store.table.getItem, mod)
         'Mod Status': lambda self, a: self.data_store[a].txt_status(),
         'CRC'       : lambda self, a: self.data_store[a].cached_mod_crc(),
     }
+    # These depend on the load order and on the status of other plugins
+    _volatile_sort_cols = frozenset(['Load Order', u'Indices', 'Status',
+                                     'Mod Status'])
     _extra_sortings = [_ModsUIList._sortEsmsFirst,
                        _ModsUIList._activeModsFirst]
     _dndList, _dndColumns = True, ['Load Order']
     _sunkenBorder = False
+    _virtual = True
     #--Labels
     labels = OrderedDict([
         ('File',       lambda self, p: self.data_store.masterWithVersion(p.s)),
@@ -2190,6 +2238,7 @@ class InstallersList(balt.UIList):
     global_links = OrderedDefaultDict(lambda: Links()) # Global menu
     icons = installercons
     _sunkenBorder = False
+    _virtual = True
     _shellUI = True
     _editLabels = True
     _default_sort_col = 'Package'
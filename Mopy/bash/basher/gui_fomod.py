@@ -69,7 +69,7 @@ def __init__(self, parent_window, target_installer):
             bush.game.version_detect_file).s)
         self.fomod_parser = FomodInstaller(
             fm_file, self.files_list, self.installer_root, bass.dirs[u'mods'],
-            u'.'.join([unicode(i) for i in gver]))
+            u'.'.join([unicode(i) for i in gver]), target_installer.crc)
         super(InstallerFomod, self).__init__(
             parent_window, sizes_dict=bass.settings,
             title=_(u'FOMOD Installer - %s') % self.fomod_parser.fomod_name,
@@ -720,6 +720,7 @@ def InitSaveLinks():
     SaveList.context_links.append(Save_LoadMasters())
     SaveList.context_links.append(File_ListMasters())
     SaveList.context_links.append(Save_DiffMasters())
+    SaveList.context_links.append(Save_RenameMaster())
     if bush.game.Ess.canEditMore:
         SaveList.context_links.append(Save_Stats())
     SaveList.context_links.append(Save_StatObse())
@@ -731,6 +732,7 @@ def InitSaveLinks():
         SaveList.context_links.append(Save_RenamePlayer())
         SaveList.context_links.append(Save_EditCreatedEnchantmentCosts())
         SaveList.context_links.append(Save_ImportFace())
+        SaveList.context_links.append(Save_ExportFaces())
         SaveList.context_links.append(Save_EditCreated('ENCH'))
         SaveList.context_links.append(Save_EditCreated('ALCH'))
         SaveList.context_links.append(Save_EditCreated('SPEL'))
@@ -1752,6 +1752,14 @@ def Execute(self):
         #--Export
         with balt.Progress(self.__class__.progressTitle) as progress:
             parser = self._parser()
+            # Share plugins (masters in particular) between the exported mods
+            try:
+                export_sigs = parser.all_types
+            except AttributeError:
+                pass # FIXME(inf) old-style parser, drop once refactored
+            else:
+                parser.plugin_cache = mod_files.PluginCache()
+                parser.plugin_cache.register_sigs(export_sigs)
             readProgress = SubProgress(progress, 0.1, 0.8)
             readProgress.setFull(len(self.selected))
             for index,(fileName,fileInfo) in enumerate(self.iselected_pairs()):
@@ -31,7 +31,6 @@
 from ..balt import ItemLink, CheckLink, BoolLink, EnabledLink, ChoiceLink, \
     SeparatorLink, Link
 from ..bolt import CsvReader, GPath
-from ..gui import BusyCursor
 
 __all__ = ['Mods_EsmsFirst', 'Mods_LoadList', 'Mods_SelectedFirst',
            'Mods_OblivionVersion', 'Mods_CreateBlankBashedPatch',
@@ -363,7 +362,12 @@ class Mods_CrcRefresh(ItemLink):
     @balt.conversation
     def Execute(self):
         message = u'== %s' % _(u'Mismatched CRCs') + u'\n\n'
-        with BusyCursor(): pairs = bosh.modInfos.refresh_crcs()
+        try:
+            with balt.Progress(_(u'Recalculate CRCs'),
+                               abort=True) as progress:
+                pairs = bosh.modInfos.refresh_crcs(progress=progress)
+        except exception.CancelError:
+            return
         mismatched = {k: v for k, v in pairs.iteritems() if v[0] != v[1]}
         if mismatched:
             message += u'  * ' + u'\n  * '.join(
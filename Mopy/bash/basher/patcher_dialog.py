@@ -182,11 +182,13 @@ def PatchExecute(self):
             #--Save
             progress.setCancel(False, u'%s\n' % patch_name + _(u'Saving...'))
             progress(0.9)
-            self._save_pbash(patchFile, patch_name)
+            with patchFile.build_stats.measure(u'save'):
+                self._save_pbash(patchFile, patch_name)
             #--Done
             progress.Destroy(); progress = None
             timer2 = time.clock()
             #--Readme and log
+            patchFile.build_stats.log_stats(log)
             log.setHeader(None)
             log(u'{{CSS:wtxt_sand_small.css}}')
             logValue = log.out.getvalue()
@@ -197,9 +199,11 @@ def PatchExecute(self):
             docsDir = bass.settings.get('balt.WryeLog.cssDir', GPath(u''))
             tempReadmeDir = Path.tempDir().join(u'Docs')
             tempReadme = tempReadmeDir.join(patch_name.sroot+u'.txt')
-            #--Write log/readme to temp dir first
+            #--Write log/readme and build statistics to temp dir first
             with tempReadme.open('w',encoding='utf-8-sig') as file:
                 file.write(logValue)
+            temp_report = tempReadme.root + u'.json'
+            patchFile.build_stats.write_report(temp_report)
             #--Convert log/readmeto wtxt
             bolt.WryeText.genHtml(tempReadme,None,docsDir)
             #--Try moving temp log/readme to Docs dir
@@ -208,8 +212,9 @@ def PatchExecute(self):
                               parent=self._native_widget)
             except (CancelError,SkipError):
                 # User didn't allow UAC, move to My Games directory instead
-                env.shellMove([tempReadme, tempReadme.root + u'.html'],
-                              bass.dirs[u'saveBase'], parent=self)
+                env.shellMove([tempReadme, tempReadme.root + u'.html',
+                               temp_report], bass.dirs[u'saveBase'],
+                              parent=self)
                 readme = bass.dirs[u'saveBase'].join(readme.tail)
             #finally:
             #    tempReadmeDir.head.rmtree(safety=tempReadmeDir.head.stail)
@@ -36,7 +36,8 @@
 from ..bolt import GPath, SubProgress, struct_pack, struct_unpack
 from ..bosh import faces, SaveInfo
 from ..brec import MreRecord
-from ..exception import ArgumentError, BoltError, CancelError, ModError
+from ..exception import ArgumentError, BoltError, CancelError, ModError, \
+    SaveFileError
 from ..mod_files import LoadFactory, MasterMap, ModFile
 from ..gui import BusyCursor, ImageWrapper
 
@@ -46,7 +47,8 @@
            'Save_EditCreatedEnchantmentCosts', 'Save_ImportFace',
            'Save_EditCreated', 'Save_ReweighPotions', 'Save_UpdateNPCLevels',
            'Save_ExportScreenshot', 'Save_Unbloat', 'Save_RepairAbomb',
-           'Save_RepairHair', 'Save_StatPluggy']
+           'Save_RepairHair', 'Save_StatPluggy', 'Save_RenameMaster',
+           'Save_ExportFaces']
 
 #------------------------------------------------------------------------------
 # Saves Links -----------------------------------------------------------------
@@ -276,6 +278,64 @@ def FromMod(self,fileInfo,srcPath):
         #--Dialog
         ImportFaceDialog.display_dialog(self.window, mod, fileInfo, srcFaces)
 
+#------------------------------------------------------------------------------
+class Save_ExportFaces(ItemLink):
+    """Exports the player faces of the selected saves to a plugin."""
+    _text = _(u'Export Faces...')
+    _help = _(u'Export the player faces of the selected saves to a plugin')
+
+    def Execute(self):
+        destPath = self._askSave(title=_(u'Export Faces To:'),
+                                 defaultDir=bosh.modInfos.store_dir,
+                                 defaultFile=u'Faces.esp', wildcard=u'*.esp',
+                                 style=0)
+        if not destPath: return
+        mod_name = destPath.tail
+        if destPath.head != bosh.modInfos.store_dir:
+            self._showError(_(u'The plugin must be in the %s folder.') %
+                            bush.game.mods_dir)
+            return
+        if mod_name not in bosh.modInfos:
+            bosh.modInfos.create_new_mod(mod_name)
+        try:
+            with balt.Progress(_(u'Export Faces')) as progress:
+                npcs = faces.PCFaces.saves_exportFaces(
+                    list(self.iselected_infos()), bosh.modInfos[mod_name],
+                    progress)
+        except SaveFileError as e:
+            self._showError(u'%s' % e)
+            return
+        finally:
+            bosh.modInfos.new_info(mod_name, notify_bain=True)
+            BashFrame.modList.RefreshUI(refreshSaves=False, focus_list=False)
+        self._showOk(_(u'Exported faces to %s:') % mod_name + u'\n* ' +
+                     u'\n* '.join(npc.eid for npc in npcs), mod_name.s)
+
+#------------------------------------------------------------------------------
+class Save_RenameMaster(ItemLink):
+    """Renames a master in the selected saves and their cosaves."""
+    _text = _(u'Rename Master...')
+    _help = _(u'Rename a master in the selected saves and their cosaves')
+
+    def Execute(self):
+        old_name = self._askText(
+            _(u'Enter the name of the master to rename. E.g. Mod.esp'),
+            title=_(u'Rename Master'))
+        if not old_name: return
+        new_name = self._askText(_(u'Enter the new name for %s:') % old_name,
+                                 title=_(u'Rename Master'), default=old_name)
+        if not new_name or new_name == old_name: return
+        with balt.Progress(_(u'Rename Master')) as progress:
+            changed, failed = bosh.saveInfos.remap_masters(
+                self.selected, {GPath(old_name): GPath(new_name)},
+                progress=progress)
+        bosh.saveInfos.refresh()
+        self.window.RefreshUI(redraw=changed)
+        if failed:
+            self._showError(u'\n'.join(u'%s: %s' % (save_name, error) for
+                save_name, error in sorted(failed.iteritems())),
+                title=_(u'Failed to rename master in some saves'))
+
 #------------------------------------------------------------------------------
 class Save_RenamePlayer(ItemLink):
     """Renames the Player character in a save game."""
@@ -900,11 +960,13 @@ def Execute(self):
                 saveFile.load()
                 records = saveFile.records
                 mapToOrdered = MasterMap(saveFile._masters, ordered)
+                ordered_ids = mapToOrdered.map_fids(
+                    [r[0] for r in records], None)
                 releveledCount = 0
                 #--Loop over change records
                 for recNum in xrange(len(records)):
                     (recId,recType,recFlags,version,data) = records[recNum]
-                    orderedRecId = mapToOrdered(recId,None)
+                    orderedRecId = ordered_ids[recNum]
                     if recType != 35 or recId == 7 or orderedRecId not in npc_info: continue
                     (eid,level,calcMin,calcMax,pcLevelOffset) = npc_info[orderedRecId]
                     npc = bosh._saves.SreNPC(recFlags, data)
@@ -28,6 +28,7 @@
 import os
 import traceback
 from collections import OrderedDict
+from zlib import crc32
 
 import wx.adv as wiz  # wxPython wizard class
 from . import ScriptParser         # generic parser class
@@ -450,6 +451,21 @@ def _link_row(tool, tool_name, need, have, ok, title=None, url=None,
         self._enableForward(False)
         self.Layout()
 
+_compiled_wizards = OrderedDict()
+_max_compiled_wizards = 8
+
+def _get_compiled_wizard(script_crc):
+    """Return the ScriptParser.CompiledScript for the wizard script with the
+    specified CRC, creating an empty one if it is not cached."""
+    try:
+        compiled_wizard = _compiled_wizards.pop(script_crc)
+    except KeyError:
+        compiled_wizard = ScriptParser.CompiledScript()
+        if len(_compiled_wizards) >= _max_compiled_wizards:
+            _compiled_wizards.popitem(last=False)
+    _compiled_wizards[script_crc] = compiled_wizard
+    return compiled_wizard
+
 class WryeParser(ScriptParser.Parser):
     """A derived class of Parser, for handling BAIN install wizards."""
     codeboxRemaps = {
@@ -618,6 +634,7 @@ def __init__(self, wiz_parent, installer, bAuto, codebox=False):
             self.page = None
             self.choices = []
             self.choiceIdex = -1
+            self._data_files_exist = {}
             ##: Figure out why BAIN insists on including an empty sub-package
             # everywhere. Broke this part of the code, hence the 'if s' below.
             self.sublist = bolt.LowerDict({
@@ -754,11 +771,14 @@ def Begin(self, file_path):
         self.cLine = 0
         self.reversing = 0
         self.ExecCount = 0
+        self._data_files_exist = {}
         if file_path.exists() and file_path.isfile():
             try:
                 with file_path.open(encoding='utf-8-sig') as script:
                     # Ensure \n line endings for the script parser
                     self.lines = [x.replace(u'\r\n',u'\n') for x in script.readlines()]
+                self.compiled = _get_compiled_wizard(
+                    crc32(u''.join(self.lines).encode(u'utf-8')))
                 return self.Continue()
             except UnicodeError:
                 balt.showWarning(self._wiz_parent, _(u'Could not read the wizard file.  Please ensure it is encoded in UTF-8 format.'))
@@ -973,10 +993,14 @@ def fnCompareWBVersion(self, wbWant):
 
     def fnDataFileExists(self, *filenames):
         for filename in filenames:
-            if not bass.dirs[u'mods'].join(filename).exists():
-                # Check for ghosted mods
-                if bolt.GPath(filename) in bosh.modInfos:
-                    return True # It's a ghosted mod
+            try:
+                file_exists = self._data_files_exist[filename]
+            except KeyError:
+                # Check for ghosted mods too
+                file_exists = self._data_files_exist[filename] = (
+                    bass.dirs[u'mods'].join(filename).exists() or
+                    bolt.GPath(filename) in bosh.modInfos)
+            if not file_exists:
                 return False
         return True
 
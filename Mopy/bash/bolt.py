@@ -515,6 +515,10 @@ def __setstate__(self,norm):
         self._s = norm
         self._cs = os.path.normcase(norm)
 
+    # Paths are immutable, so copies (e.g. of records) can share them
+    def __copy__(self): return self
+    def __deepcopy__(self, memo): return self
+
     def __len__(self):
         return len(self._s)
 
@@ -31,10 +31,12 @@
 import cPickle as pickle  # PY3
 import collections
 import errno
+import Queue
 import os
 import re
 import struct
 import sys
+import threading
 import time
 import traceback
 from collections import OrderedDict, Iterable
@@ -349,6 +351,9 @@ def snapshot_dir(self):
 
 class ModInfo(FileInfo):
     """A plugin file. Currently, these are .esp, .esm, .esl and .esu files."""
+    # The sources and result of the last reloadBashTags, see refresh_bash_tags
+    _tags_sources = None
+    _reloaded_tags = None
 
     def __init__(self, fullpath, load_cache=False):
         self.isGhost = endsInGhost = (fullpath.cs[-6:] == u'.ghost')
@@ -417,13 +422,18 @@ def calculate_crc(self, recalculate=False):
         path_crc = cached_crc
         if recalculate:
             path_crc = self.abs_path.crc
-            if path_crc != cached_crc:
-                modInfos.table.setItem(self.name,u'crc',path_crc)
-                modInfos.table.setItem(self.name,u'ignoreDirty',False)
-            modInfos.table.setItem(self.name, u'crc_mtime', self._file_mod_time)
-            modInfos.table.setItem(self.name, u'crc_size', self._file_size)
+            self._store_crc(path_crc, cached_crc)
         return path_crc, cached_crc
 
+    def _store_crc(self, path_crc, cached_crc):
+        """Caches the specified freshly calculated crc, along with the mtime
+        and size of the file it was calculated for."""
+        if path_crc != cached_crc:
+            modInfos.table.setItem(self.name,u'crc',path_crc)
+            modInfos.table.setItem(self.name,u'ignoreDirty',False)
+        modInfos.table.setItem(self.name, u'crc_mtime', self._file_mod_time)
+        modInfos.table.setItem(self.name, u'crc_size', self._file_size)
+
     def cached_mod_crc(self): # be sure it's valid before using it!
         return modInfos.table.getItem(self.name, u'crc')
 
@@ -566,6 +576,22 @@ def reloadBashTags(self):
         tags |= added
         tags -= removed
         self.setBashTags(tags)
+        return tags
+
+    def refresh_bash_tags(self, tag_files_stamps):
+        """Reloads bash tags like reloadBashTags, but only if one of their
+        sources changed since the last reload: the description in the plugin
+        header, the LOOT masterlist/userlist, the plugin's BashTags file (whose
+        stamp is looked up in tag_files_stamps) or the tags stored in the
+        table (e.g. if the user edited them in the meantime)."""
+        tags_sources = (self.header.description,
+                        configHelpers.lists_generation,
+                        tag_files_stamps.get(self.name.sbody.lower()))
+        if tags_sources == self._tags_sources and self._reloaded_tags == \
+                modInfos.table.getItem(self.name, u'bashTags'):
+            return
+        self._reloaded_tags = self.reloadBashTags()
+        self._tags_sources = tags_sources
 
     def is_auto_tagged(self, default_auto=True):
         """Returns True if this plugin receives its tags automatically from
@@ -909,6 +935,10 @@ class INIInfo(IniFile):
     def _reset_cache(self, stat_tuple, load_cache):
         super(INIInfo, self)._reset_cache(stat_tuple, load_cache)
         if load_cache: self._status = None
+        # Our settings will be reloaded (or are gone), so the settings index
+        # must be updated - get_ci_settings may do this outside of a refresh
+        if iniInfos is not None:
+            iniInfos.mark_tweak_stale(self.abs_path.tail)
 
     @property
     def tweak_status(self):
@@ -963,13 +993,14 @@ def _status(s):
                         # tweak that is applied, and from the same installer
                         mismatch = 2
                         if self_installer is None: continue
-                        for name, ini_info in infos.iteritems():
+                        for name, value in infos.get_setting_tweaks(
+                                section_key, item).iteritems():
+                            ini_info = infos[name]
                             if self is ini_info: continue
                             if self_installer != infos.table.getItem(
                                     name, u'installer'): continue
                             # It's from the same installer
                             if self._incompatible(ini_info): continue
-                            value = ini_info.getSetting(section_key, item, None)
                             if value == target_section[item][0]:
                                 # The other tweak has the setting we're worried about
                                 mismatch = 1
@@ -1103,16 +1134,26 @@ def write_masters(self):
             with self.abs_path.temp.open('wb') as out:
                 oldMasters = self.header.writeMasters(ins, out)
         oldMasters = [GPath_no_norm(decoder(x)) for x in oldMasters]
-        self.abs_path.untemp()
         # Cosaves - note that we have to use self.header.masters since in
         # FO4/SSE _get_masters() returns the correct interleaved order, but
         # oldMasters has the 'regular first, then ESLs' order
         master_map = {x.s: y.s for x, y in zip(oldMasters, self.header.masters)
                       if x != y}
+        remapped_cosaves = []
         if master_map:
             for co_file in self._co_saves.values():
                 co_file.remap_plugins(master_map)
-                co_file.write_cosave_safe()
+                co_file.write_cosave(co_file.abs_path.temp)
+                remapped_cosaves.append(co_file)
+        # Only replace the files once all of them have been written out
+        self.abs_path.untemp()
+        for co_file in remapped_cosaves:
+            co_file.abs_path.untemp()
+
+    def remapped_masters(self, master_renames):
+        """Return the masters of this save with the renames in the specified
+        old name -> new name dict applied."""
+        return [master_renames.get(m, m) for m in self.header.masters]
 
     def get_cosave_tags(self):
         """Return strings expressing whether cosaves exist and are correct.
@@ -1567,6 +1608,11 @@ class INIInfos(TableFileInfos):
     """:type _ini: IniFile
     :type data: dict[bolt.Path, IniInfo]"""
     file_pattern = re.compile(u'' r'\.ini$', re.I | re.U)
+    # (lowercase section, lowercase key) -> {tweak name: value} - built on
+    # first use by get_setting_tweaks and updated per changed tweak
+    _settings_index = None
+    # The tweaks whose settings were reloaded since they were last indexed
+    _stale_tweaks = set()
 
     def __init__(self):
         INIInfos._default_tweaks = {
@@ -1692,6 +1738,7 @@ def _refresh_ini_tweaks(self):
                 if k in _deleted_: # we restore default over copy
                     _updated.add(k)
                     default_info.reset_status()
+        self._index_tweaks(_added | _deleted_)
         if _updated:
             self._notify_bain(changed={self[n].abs_path for n in _updated})
         return _added, _deleted_, _updated
@@ -1726,8 +1773,55 @@ def delete_refresh(self, deleted_keys, paths_to_keys, check_existence,
                 if k not in set_keys:
                     default_info = self.setdefault(k, d) # type: DefaultIniInfo
                     default_info.reset_status()
+            self._index_tweaks(deleted)
         return deleted
 
+    def new_info(self, fileName, _in_refresh=False, owner=None,
+                 notify_bain=False):
+        info = super(INIInfos, self).new_info(fileName, _in_refresh, owner,
+                                              notify_bain)
+        self._index_tweaks((fileName,))
+        return info
+
+    def _index_tweaks(self, tweak_names):
+        """Update the settings index for the specified tweaks, which were
+        added, changed or deleted (or replaced by a default tweak)."""
+        if self._settings_index is None: return # not built yet
+        for tweak_name in tweak_names:
+            for index_key in self._indexed_keys.pop(tweak_name, ()):
+                setting_tweaks = self._settings_index[index_key]
+                del setting_tweaks[tweak_name]
+                if not setting_tweaks: del self._settings_index[index_key]
+            ini_info = self.get(tweak_name)
+            if ini_info is None: continue
+            indexed = self._indexed_keys[tweak_name] = []
+            for section, tweak_section in \
+                    ini_info.get_ci_settings().iteritems():
+                section = section.lower()
+                for key, (value, _lineno) in tweak_section.iteritems():
+                    index_key = (section, key.lower())
+                    self._settings_index.setdefault(index_key, {})[
+                        tweak_name] = value
+                    indexed.append(index_key)
+
+    def mark_tweak_stale(self, tweak_name):
+        """Called by the tweak with the specified name when its settings
+        cache is reset, so that it is reindexed before the next lookup."""
+        if self._settings_index is not None:
+            self._stale_tweaks.add(tweak_name)
+
+    def get_setting_tweaks(self, section, key):
+        """Return a dict mapping the names of the tweaks that set the
+        specified setting to the values they set it to. Do not modify it."""
+        if self._settings_index is None:
+            self._settings_index, self._indexed_keys = {}, {}
+            self._stale_tweaks = set()
+            self._index_tweaks(self.keys())
+        elif self._stale_tweaks:
+            stale_tweaks, self._stale_tweaks = self._stale_tweaks, set()
+            self._index_tweaks(stale_tweaks)
+        return self._settings_index.get((section.lower(), key.lower()), {})
+
     def get_tweak_lines_infos(self, tweakPath):
         return self._ini.analyse_tweak(self[tweakPath])
 
@@ -1810,6 +1904,9 @@ def _modinfos_cache_wrapper(self, *args, **kwargs):
                 load_order.cached_lord.activeOrdered)
     return _modinfos_cache_wrapper
 
+# Number of plugins ModInfos.refresh_crcs reads at the same time
+_max_crc_threads = 4
+
 #------------------------------------------------------------------------------
 class ModInfos(FileInfos):
     """Collection of modinfos. Represents mods in the Oblivion\Data directory."""
@@ -2209,7 +2306,8 @@ def _rescanMergeable(self, names, progress, return_results):
 
     def _refresh_bash_tags(self):
         """Reloads bash tags for all mods set to receive automatic bash
-        tags."""
+        tags, skipping the ones whose tag sources did not change."""
+        tag_files_stamps = None
         for modName, mod in self.iteritems(): # type: (Path, ModInfo)
             autoTag = mod.is_auto_tagged(default_auto=None)
             if autoTag is None and self.table.getItem(
@@ -2221,14 +2319,57 @@ def _refresh_bash_tags(self):
                 # An old mod that had manual bash tags added, disable auto tags
                 mod.set_auto_tagged(False)
             if autoTag:
-                mod.reloadBashTags()
-
-    def refresh_crcs(self, mods=None): #TODO(ut) progress !
+                if tag_files_stamps is None:
+                    tag_files_stamps = configHelpers.get_tag_files_stamps()
+                mod.refresh_bash_tags(tag_files_stamps)
+
+    def refresh_crcs(self, mods=None, progress=None):
+        """Recalculates the crcs of the specified mods (all mods by default)
+        and caches them. The files are read by a pool of worker threads, while
+        progress is reported (weighted by file size) and the cache is updated
+        from the calling thread. If the progress is canceled, the crcs
+        calculated up to that point are still cached. Returns a dict mapping
+        mod names to (new crc, previously cached crc) tuples."""
         if mods is None: mods = self.keys()
+        progress = progress or bolt.Progress()
+        crc_infos = [self[mod] for mod in mods]
         pairs = {}
-        for mod in mods:
-            inf = self[mod]
-            pairs[inf.name] = inf.calculate_crc(recalculate=True)
+        if not crc_infos: return pairs
+        progress.setFull(max(sum(inf.size for inf in crc_infos), 1))
+        progress(0, _(u'Calculating CRCs...'))
+        pending, finished = Queue.Queue(), Queue.Queue()
+        for inf in crc_infos: pending.put(inf)
+        stop_reading = threading.Event()
+        def _crc_worker():
+            while not stop_reading.is_set():
+                try:
+                    inf = pending.get_nowait()
+                except Queue.Empty:
+                    return
+                try:
+                    finished.put((inf, inf.abs_path.crc, None))
+                except Exception:
+                    stop_reading.set()
+                    finished.put((inf, None, sys.exc_info()))
+        workers = [threading.Thread(target=_crc_worker) for __ in
+                   xrange(min(len(crc_infos), _max_crc_threads))]
+        for worker in workers: worker.start()
+        try:
+            done_size = 0
+            for index in xrange(len(crc_infos)):
+                inf, path_crc, exc_info = finished.get()
+                if exc_info:
+                    raise exc_info[0], exc_info[1], exc_info[2]
+                cached_crc = self.table.getItem(inf.name, u'crc')
+                inf._store_crc(path_crc, cached_crc)
+                pairs[inf.name] = path_crc, cached_crc
+                done_size += inf.size
+                progress(done_size, inf.name.s + u'\n' + _(
+                    u'Calculating CRCs...'))
+        finally:
+            # Don't start on new files, but let the ones being read finish
+            stop_reading.set()
+            for worker in workers: worker.join()
         return pairs
 
     #--Refresh File
@@ -2898,6 +3039,9 @@ def _recalc_real_indices(self):
             self.real_indices[p] = r_index
 
 #------------------------------------------------------------------------------
+# Number of saves SaveInfos.remap_masters rewrites at the same time
+_max_remap_threads = 4
+
 class SaveInfos(FileInfos):
     """SaveInfo collection. Represents save directory and related info."""
     _bain_notify = False
@@ -2942,6 +3086,79 @@ def rightFileType(cls, fileName):
     @property
     def bash_dir(self): return self.store_dir.join(u'Bash')
 
+    def remap_masters(self, save_names, master_renames, progress=None):
+        """Applies the specified master renames to the specified saves and
+        their cosaves. The saves are rewritten in parallel, each one replaced
+        only once it and its cosaves have been written out in full. Returns a
+        list of the names of the saves that were changed and a dict mapping
+        the names of the saves that could not be changed to the error. If the
+        user cancels, the saves that were changed until then are returned."""
+        progress = progress or bolt.Progress()
+        remap_jobs = []
+        changed, failed = [], {}
+        for save_name in save_names:
+            save_inf = self[save_name]
+            new_masters = save_inf.remapped_masters(master_renames)
+            if new_masters == save_inf.header.masters: continue
+            if not save_inf.header.can_edit_header:
+                failed[save_name] = StateError(
+                    _(u'Editing the masters of %s saves is not supported.')
+                    % bush.game.displayName)
+                continue
+            remap_jobs.append((save_inf, new_masters))
+        if not remap_jobs: return changed, failed
+        progress.setFull(len(remap_jobs))
+        progress(0, _(u'Updating masters...'))
+        pending, finished = Queue.Queue(), Queue.Queue()
+        for remap_job in remap_jobs: pending.put(remap_job)
+        stop_remapping = threading.Event()
+        def _remap_worker():
+            while not stop_remapping.is_set():
+                try:
+                    save_inf, new_masters = pending.get_nowait()
+                except Queue.Empty:
+                    return
+                try:
+                    save_inf.makeBackup()
+                    prev_mtime = save_inf.mtime
+                    save_inf.header.masters = new_masters
+                    save_inf.write_masters()
+                    save_inf.setmtime(prev_mtime)
+                    finished.put((save_inf, None))
+                except Exception as e:
+                    deprint(u'Failed to update masters of %s' % save_inf.name,
+                            traceback=True)
+                    finished.put((save_inf, e))
+        def _collect_result(save_inf, remap_error):
+            if remap_error is None:
+                changed.append(save_inf.name)
+            else:
+                # The header may be out of sync with the file now
+                try:
+                    save_inf.readHeader()
+                except SaveFileError: pass
+                failed[save_inf.name] = remap_error
+        workers = [threading.Thread(target=_remap_worker) for __ in
+                   xrange(min(len(remap_jobs), _max_remap_threads))]
+        for worker in workers: worker.start()
+        try:
+            for index in xrange(len(remap_jobs)):
+                save_inf, remap_error = finished.get()
+                _collect_result(save_inf, remap_error)
+                progress(index + 1, save_inf.name.s + u'\n' + _(
+                    u'Updating masters...'))
+        except CancelError:
+            pass # return the saves that were changed so far
+        finally:
+            # Don't start on new saves (e.g. if the user canceled), but let
+            # the ones being rewritten finish
+            stop_remapping.set()
+            for worker in workers: worker.join()
+        # Collect the saves that were still being rewritten when we stopped
+        while not finished.empty():
+            _collect_result(*finished.get_nowait())
+        return changed, failed
+
     def refresh(self, refresh_infos=True, booting=False):
         self._refreshLocalSave()
         return refresh_infos and FileInfos.refresh(self, booting=booting)
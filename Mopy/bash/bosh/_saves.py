@@ -239,6 +239,7 @@ def __init__(self,saveInfo=None,canSave=True):
         self.globals = []
         self.created = []
         self.fid_createdNum = None
+        self.type_createdNums = None
         self.preGlobals = None #--Pre-records, pre-globals
         self.preCreated = None #--Pre-records, pre-created
         self.preRecords = None #--Pre-records, pre
@@ -300,6 +301,7 @@ def insCopy(buff,size,backSize=0):
             for count in xrange(createdNum):
                 progress(ins.tell(),_(u'Reading created...'))
                 self.created.append(MreRecord(unpack_header(modReader), modReader))
+            self.fid_createdNum = self.type_createdNums = None
             #--Pre-records: Quickkeys, reticule, interface, regions
             with sio() as buff:
                 for count in range(4):
@@ -415,8 +417,39 @@ def addMaster(self,master):
             self._masters.append(master)
 
     def indexCreated(self):
-        """Fills out self.fid_recNum."""
-        self.fid_createdNum = {x.fid: i for i, x in enumerate(self.created)}
+        """Fills out self.fid_createdNum and self.type_createdNums."""
+        self.fid_createdNum = {}
+        self.type_createdNums = defaultdict(list)
+        for i, x in enumerate(self.created):
+            self.fid_createdNum[x.fid] = i
+            self.type_createdNums[x.recType].append(i)
+
+    def getCreated(self,fid,default=None):
+        """Returns created record with corresponding fid."""
+        if self.fid_createdNum is None: self.indexCreated()
+        recNum = self.fid_createdNum.get(fid)
+        if recNum is None:
+            return default
+        else:
+            return self.created[recNum]
+
+    def getCreatedOfType(self,recType):
+        """Returns all created records of the specified type, in save
+        order."""
+        if self.fid_createdNum is None: self.indexCreated()
+        return [self.created[i] for i in self.type_createdNums.get(recType,
+                                                                   ())]
+
+    def setCreated(self,record):
+        """Replaces the created record with the same fid and type as record,
+        or adds record if there is none."""
+        if self.fid_createdNum is None: self.indexCreated()
+        recNum = self.fid_createdNum.get(record.fid)
+        if recNum is None or self.created[recNum].recType != record.recType:
+            self.created.append(record)
+            self.fid_createdNum = self.type_createdNums = None
+        else:
+            self.created[recNum] = record
 
     def removeCreated(self,fid):
         """Removes created if it exists. Returns True if record existed, false if not."""
@@ -426,7 +459,8 @@ def removeCreated(self,fid):
             return False
         else:
             del self.created[recNum]
-            del self.fid_createdNum[fid]
+            # The indices of all later records shifted
+            self.fid_createdNum = self.type_createdNums = None
             return True
 
     def indexRecords(self):
@@ -651,6 +685,7 @@ def removeBloating(self,uncreateKeys,removeNullRefs=True,progress=None):
                     kept.append(citem)
                 progress.plus()
             self.created = kept
+            self.fid_createdNum = self.type_createdNums = None
         #--Change records
         progress(progress.state,_(u'Scanning change records.'))
         fids = self.fids
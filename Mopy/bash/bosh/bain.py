@@ -2668,7 +2668,6 @@ def get_clean_data_dir_list(self):
             if installer.is_active:
                 keepFiles.update(installer.ci_dest_sizeCrc) # relative to Data/
         from . import modInfos
-        keepFiles.update((bolt.CIstr(f) for f in bush.game.vanilla_files))
         for bpatch in modInfos.bashed_patches: # type: bolt.Path
             keepFiles.add(bolt.CIstr(bpatch.s))
             bp_doc = modInfos.table.getItem(bpatch, u'doc')
@@ -2687,7 +2686,9 @@ def get_clean_data_dir_list(self):
                           for f in bush.game.Bain.wrye_bash_data_files))
         keepFiles.update((bolt.CIstr(f)
                           for f in bush.game.Bain.keep_data_files))
-        removes = set(self.data_sizeCrcDate) - keepFiles
+        lower_vanilla = bush.game.lower_vanilla_files
+        removes = {f for f in self.data_sizeCrcDate if
+                   f.lower() not in lower_vanilla} - keepFiles
         # don't remove files in Wrye Bash-related directories or Ini Tweaks
         skipPrefixes = [skipDir.lower() + os.sep for skipDir in
                         bush.game.Bain.wrye_bash_data_dirs |
@@ -23,11 +23,13 @@
 """BAIN Converters aka BCFs"""
 
 from __future__ import division
+import Queue  # PY3
 import cPickle as pickle  # PY3
 import re
 import sys
+import threading
 
-from .. import bolt, archives, bass
+from .. import bolt, archives, bass, env
 from ..archives import defaultExt, readExts, compressionSettings, \
     compressCommand
 from ..bolt import DataDict, PickleDict, GPath, Path, sio, SubProgress
@@ -35,6 +37,9 @@
 
 converters_dir = None
 installers_dir = None
+# Max number of source archives to extract at the same time - 7z does the
+# actual work in its own processes, so this is mostly bound by disk IO
+_max_unpack_threads = 4
 
 class ConvertersData(DataDict):
     """Converters Data singleton, initialized in InstallersData."""
@@ -333,8 +338,7 @@ def apply(self, destArchive, crc_installer, progress=None, embedded=0):
         with self.fullPath.unicodeSafe() as tempPath:
             # don't pass progress in as we haven't got the count of BCF's files
             archives.extract7z(tempPath, tmpDir, progress=None)
-        #--Extract source archives
-        lastStep = 0
+        #--Extract the source files the converter references
         if embedded:
             if len(self.srcCRCs) != 1:
                 raise StateError(
@@ -343,20 +347,21 @@ def apply(self, destArchive, crc_installer, progress=None, embedded=0):
             srcCRCs = [embedded]
         else:
             srcCRCs = realCRCs = self.srcCRCs
-        nextStep = step = 0.4 / len(srcCRCs)
+        needed_files = self._get_needed_files()
+        unpack_jobs = []
         for srcCRC, realCRC in zip(srcCRCs, realCRCs):
             srcInstaller = crc_installer[srcCRC]
-            files = bolt.sortFiles([x[0] for x in srcInstaller.fileSizeCrcs])
-            if not files: continue
-            progress(0,
-                     srcInstaller.archive + u'\n' + _(u'Extracting files...'))
-            tempCRC = srcInstaller.crc
-            srcInstaller.crc = realCRC
-            self._unpack(srcInstaller, files,
-                         SubProgress(progress, lastStep, nextStep))
-            srcInstaller.crc = tempCRC
-            lastStep = nextStep
-            nextStep += step
+            files = needed_files.get(realCRC, set())
+            if u'BCF-SubArchives' in needed_files:
+                # Files were taken from subarchives - we can't tell which
+                # subarchives beforehand, so extract all of them
+                files.update(x[0] for x in srcInstaller.fileSizeCrcs
+                             if GPath(x[0]).cext in readExts)
+            if files:
+                unpack_jobs.append(
+                    (srcInstaller, bolt.sortFiles(files), realCRC))
+        lastStep = 0.4 if unpack_jobs else 0
+        self._unpack_parallel(unpack_jobs, SubProgress(progress, 0, lastStep))
         #--Move files around and pack them
         try:
             self._arrangeFiles(SubProgress(progress, lastStep, 0.7))
@@ -378,6 +383,62 @@ def applySettings(self, destInstaller):
         map(destInstaller.__setattr__, self._converter_settings + self.addedSettings,
             map(self.__getattribute__, self._converter_settings + self.addedSettings))
 
+    def _get_needed_files(self):
+        """Return a dict mapping the CRCs of the source installers to the set
+        of their files that the converted archive needs. Files that come from
+        subarchives of the source installers are noted under
+        'BCF-SubArchives'."""
+        needed_files = {}
+        for crcValue, (srcDir, srcFile), destFile in self.convertedFiles:
+            if isinstance(srcDir, (basestring, Path)):
+                if u'%s' % srcDir == u'BCF-Missing': continue # in the BCF
+                srcDir = u'BCF-SubArchives' # srcDir is the subarchive's CRC
+            needed_files.setdefault(srcDir, set()).add(srcFile)
+        return needed_files
+
+    def _unpack_parallel(self, unpack_jobs, progress):
+        """Extract several source installers at the same time. unpack_jobs is
+        a list of (installer, files to extract, CRC to extract them under)
+        tuples. Progress is only reported from the calling thread, as
+        extractions finish."""
+        if not unpack_jobs: return
+        # Create the temp dir here - bass.newTempDir is not thread safe, so
+        # the workers calling getTempDir at once could each create their own
+        tmp_dir = bass.getTempDir()
+        progress.setFull(len(unpack_jobs))
+        progress(0, _(u'Extracting files...'))
+        pending, finished = Queue.Queue(), Queue.Queue()
+        for unpack_job in unpack_jobs: pending.put(unpack_job)
+        stop_unpacking = threading.Event()
+        def _unpack_worker():
+            while not stop_unpacking.is_set():
+                try:
+                    srcInstaller, fileNames, unpack_crc = pending.get_nowait()
+                except Queue.Empty:
+                    return
+                try:
+                    self._unpack(srcInstaller, fileNames,
+                                 unpack_crc=unpack_crc, tmp_dir=tmp_dir)
+                    finished.put((srcInstaller, None))
+                except Exception:
+                    stop_unpacking.set()
+                    finished.put((srcInstaller, sys.exc_info()))
+        workers = [threading.Thread(target=_unpack_worker) for __ in
+                   xrange(min(len(unpack_jobs), _max_unpack_threads))]
+        for worker in workers: worker.start()
+        try:
+            for index in xrange(len(unpack_jobs)):
+                srcInstaller, exc_info = finished.get()
+                if exc_info:
+                    raise exc_info[0], exc_info[1], exc_info[2]
+                progress(index + 1, srcInstaller.archive + u'\n' + _(
+                    u'Extracting files...'))
+        finally:
+            # Don't start new extractions, but let the running ones finish -
+            # the caller will clean up the temp dir
+            stop_unpacking.set()
+            for worker in workers: worker.join()
+
     def _arrangeFiles(self,progress):
         """Copy and/or move extracted files into their proper arrangement."""
         tmpDir = bass.getTempDir()
@@ -416,7 +477,10 @@ def _arrangeFiles(self,progress):
             if numDupes > 1:
                 progress(index, _(u'Copying file...') + u'\n' + destFile.stail)
                 dupes[crcValue] = numDupes - 1
-                srcFile.copyTo(destFile)
+                # Both dirs are in the temp dir, so we can usually hardlink
+                destFile.head.makedirs()
+                if not env.hardlink_file(srcFile.s, destFile.s):
+                    srcFile.copyTo(destFile)
             else:
                 progress(index, _(u'Moving file...') + u'\n' + destFile.stail)
                 srcFile.moveTo(destFile)
@@ -461,16 +525,14 @@ def build(self, srcArchives, idata, destArchive, BCFArchive, blockSize,
         #  crc_installer param to this method
         if len(subArchives) and crc_installer:
             archivedFiles = dict()
-            nextStep = step = 0.3 / len(subArchives)
             #--Extract any subArchives
             #--It would be faster to read them with 7z l -slt
             #--But it is easier to use the existing recursive extraction
-            for index, (installerCRC) in enumerate(subArchives):
-                installer = crc_installer[installerCRC]
-                self._unpack(installer, subArchives[installerCRC],
-                             SubProgress(progress, lastStep, nextStep))
-                lastStep = nextStep
-                nextStep += step
+            self._unpack_parallel([(crc_installer[installerCRC], fileList,
+                                    installerCRC) for installerCRC, fileList
+                                   in subArchives.iteritems()],
+                                  SubProgress(progress, lastStep, 0.3))
+            lastStep = 0.3
             #--Note all extracted files
             tmpDir = bass.getTempDir()
             for crc in tmpDir.list():
@@ -555,16 +617,22 @@ def _pack(self, srcFolder, destArchive, outDir, progress=None):
                 progress)
         bass.rmTempDir()
 
-    def _unpack(self, srcInstaller, fileNames, progress=None):
-        """Recursive function: completely extracts the source installer to
-        subTempDir. It does NOT clear the temp folder.  This should be done
-        prior to calling the function. Each archive and sub-archive is
-        extracted to its own sub-directory to prevent file thrashing"""
+    def _unpack(self, srcInstaller, fileNames, progress=None,
+                unpack_crc=None, tmp_dir=None):
+        """Recursive function: extracts fileNames from the source installer to
+        subTempDir, which is named after unpack_crc (defaults to the
+        installer's CRC) and placed in tmp_dir (defaults to the current temp
+        dir). It does NOT clear the temp folder.  This should be done prior to
+        calling the function. Each archive and sub-archive is extracted to its
+        own sub-directory to prevent file thrashing. May be called from
+        several threads at once, as long as they all pass the same tmp_dir -
+        see _unpack_parallel."""
         #--Sanity check
         if not fileNames: raise ArgumentError(
                 u"No files to extract for %s." % srcInstaller)
-        tmpDir = bass.getTempDir()
-        tempList = bolt.Path.baseTempDir().join(u'WryeBash_listfile.txt')
+        tmpDir = tmp_dir or bass.getTempDir()
+        tempList = bolt.Path.baseTempDir().join(u'WryeBash_listfile_%d.txt' %
+                                                threading.current_thread().ident)
         #--Dump file list
         try:
             with tempList.open('w', encoding='utf-8-sig') as out:
@@ -573,7 +641,7 @@ def _unpack(self, srcInstaller, fileNames, progress=None):
             raise StateError, (u"Error creating file list for 7z:\nError: %s"
                                % e), sys.exc_info()[2]
         #--Determine settings for 7z
-        installerCRC = srcInstaller.crc
+        installerCRC = srcInstaller.crc if unpack_crc is None else unpack_crc
         if srcInstaller.is_archive():
             srcInstaller = GPath(srcInstaller.archive)
             apath = installers_dir.join(srcInstaller)
@@ -593,4 +661,4 @@ def _unpack(self, srcInstaller, fileNames, progress=None):
                 bolt.clearReadOnly(subTempDir) ##: do this once
         #--Recursively unpack subArchives
         for archive in map(subTempDir.join, subArchives):
-            self._unpack(archive, [u'*']) # it will also unpack the embedded BCF if any...
+            self._unpack(archive, [u'*'], tmp_dir=tmpDir) # it will also unpack the embedded BCF if any...
@@ -717,29 +717,42 @@ def dump_to_log(self, log, save_masters):
 
 def _get_xse_chunk(ins):
     """Read a 4-byte string from the specified input stream and return an
-    instance of a matching xSE chunk class for that string. If no matching
-    class is found, an instance of the generic _xSEChunk class is returned
-    instead.
+    instance of the generic _xSEChunk class for it, holding the chunk's body
+    as a binary blob. Use _decode_xse_chunk to decode it.
 
     :param ins: The input stream to read from.
-    :return: A instance of a matching chunk class, or the generic one if no
-        matching class was found."""
+    :return: An instance of the generic chunk class."""
     # The chunk type strings are reversed in the cosaves
     ch_type = _cosave_decode(unpack_4s(ins))[::-1]
-    ch_class = _xse_class_dict.get(ch_type, _xSEChunk)
-    return ch_class(ins, ch_type)
+    return _xSEChunk(ins, ch_type)
+
+def _decode_xse_chunk(raw_chunk):
+    """Decode the body of the specified chunk, as returned by _get_xse_chunk,
+    and return an instance of the matching xSE chunk class for it. If no
+    matching class is found, the chunk itself is returned instead.
+
+    :param raw_chunk: The undecoded chunk.
+    :return: An instance of a matching chunk class, or raw_chunk if no
+        matching class was found."""
+    ch_class = _xse_class_dict.get(raw_chunk.chunk_type, _xSEChunk)
+    if ch_class is _xSEChunk: return raw_chunk
+    with sio(struct_pack(u'=2I', raw_chunk.chunk_version,
+                         raw_chunk.data_len) + raw_chunk.chunk_data) as ins:
+        return ch_class(ins, raw_chunk.chunk_type)
 
 class _xSEPluginChunk(_AChunk, _Remappable):
-    """A single xSE chunk, composed of _xSEChunk objects."""
-    __slots__ = (u'plugin_signature', u'chunks', u'remappable_chunks',
-                 u'orig_size')
+    """A single xSE chunk, composed of _xSEChunk objects. Only the headers of
+    those are parsed when reading - their bodies are decoded when they are
+    first accessed, and chunks that were never decoded are written back out
+    byte-for-byte."""
+    __slots__ = (u'plugin_signature', u'_chunks', u'_decoded', u'orig_size')
 
     def __init__(self, ins, light=False):
         self.plugin_signature = unpack_int(ins) # aka opcodeBase on pre papyrus
         num_chunks = unpack_int(ins)
         self.orig_size = unpack_int(ins) # Store the size for testing
-        self.chunks = []
-        self.remappable_chunks = []
+        self._chunks = []
+        self._decoded = []
         if light:
             self._read_chunk(ins)
         else:
@@ -748,28 +761,49 @@ def __init__(self, ins, light=False):
 
     def _read_chunk(self, ins):
         """Reads a single chunk from the specified input stream and appends it
-        to self.chunks and, if the chunk is remappable, to
-        self.remappable_chunks.
+        to self._chunks, without decoding its body.
 
         :param ins: The input stream to read from."""
-        new_chunk = _get_xse_chunk(ins)
-        self.chunks.append(new_chunk)
-        if isinstance(new_chunk, _Remappable):
-            self.remappable_chunks.append(new_chunk)
+        self._chunks.append(_get_xse_chunk(ins))
+        self._decoded.append(False)
+
+    def get_chunk(self, chunk_index):
+        """Returns the chunk at the specified index, decoding it first if
+        that has not happened yet.
+
+        :param chunk_index: The index of the chunk to return."""
+        if not self._decoded[chunk_index]:
+            self._chunks[chunk_index] = _decode_xse_chunk(
+                self._chunks[chunk_index])
+            self._decoded[chunk_index] = True
+        return self._chunks[chunk_index]
+
+    @property
+    def chunks(self):
+        """All chunks in this plugin chunk, decoding them if necessary."""
+        return [self.get_chunk(i) for i in xrange(len(self._chunks))]
+
+    @property
+    def remappable_chunks(self):
+        """All remappable chunks in this plugin chunk. Only those are decoded,
+        if necessary."""
+        return [self.get_chunk(i) for i, c in enumerate(self._chunks)
+                if issubclass(_xse_class_dict.get(c.chunk_type, _xSEChunk),
+                              _Remappable)]
 
     def write_chunk(self, out):
         # Don't forget to reverse signature when writing again
         pack_int(out, self.plugin_signature)
-        pack_int(out, len(self.chunks))
+        pack_int(out, len(self._chunks))
         pack_int(out, self.chunk_length())
-        for chunk in self.chunks:
+        for chunk in self._chunks:
             chunk.write_chunk(out)
 
     def chunk_length(self):
         # Every chunk header has a string of length 4 (type) and two integers
         # (version and length)
-        total_len = 12 * len(self.chunks)
-        for chunk in self.chunks:
+        total_len = 12 * len(self._chunks)
+        for chunk in self._chunks:
             total_len += chunk.chunk_length()
         return total_len
 
@@ -1438,8 +1472,7 @@ def get_master_list(self):
         # We only need the first chunk to read the master list
         self.read_cosave(light=True)
         # The first chunk is either a PLGN chunk (on SKSE64) or a MODS one
-        xse_chunks = self._get_xse_plugin().chunks
-        first_chunk = xse_chunks[0]
+        first_chunk = self._get_xse_plugin().get_chunk(0)
         if first_chunk.chunk_type == u'PLGN':
             return [mod_entry.mod_name for mod_entry in
                     first_chunk.mod_entries]
@@ -1457,19 +1490,20 @@ def has_accurate_master_list(self, has_esl):
             # Check the first chunk's signature. If and only if that signature
             # is PLGN can we accurately return a master list.
             self.read_cosave(light=True)
-            first_ch = self._get_xse_plugin().chunks[0] # type: _xSEChunk
+            first_ch = self._get_xse_plugin().get_chunk(0) # type: _xSEChunk
             return first_ch.chunk_type == u'PLGN'
 
     def dump_to_log(self, log, save_masters):
         super(xSECosave, self).dump_to_log(log, save_masters)
         for plugin_chunk in self.cosave_chunks: # type: _xSEPluginChunk
             plugin_sig = self._get_plugin_signature(plugin_chunk)
+            xse_chunks = plugin_chunk.chunks
             log.setHeader(_(u'Plugin: %s, Total chunks: %u') % (
-                plugin_sig, len(plugin_chunk.chunks)))
+                plugin_sig, len(xse_chunks)))
             log(u'=' * 40)
             log(_(u'  Type   Version  Size (in bytes)'))
             log(u'-' * 40)
-            for chunk in plugin_chunk.chunks: # type: _xSEChunk
+            for chunk in xse_chunks: # type: _xSEChunk
                 log(u'  %4s  %-4u        %u' % (chunk.chunk_type,
                                                 chunk.chunk_version,
                                                 chunk.chunk_length()))
@@ -25,7 +25,7 @@
 from ._saves import SreNPC, SaveFile
 from .. import bush, bolt
 from ..bolt import Flags, encode, sio, Path, struct_pack, struct_unpack, \
-    pack_int
+    pack_int, Progress, SubProgress
 from ..brec import getModIndex, MreRecord, genFid, RecHeader, null2
 from ..exception import SaveFileError, StateError
 from ..mod_files import LoadFactory, MasterMap, ModFile
@@ -114,10 +114,14 @@ def save_getCreatedFaces(saveFile,targetid=None):
             saveFile = SaveFile(saveInfo)
             saveFile.load()
         faces = {}
-        for record in saveFile.created:
-            if record.recType != 'NPC_': continue
+        if targetid:
+            record = saveFile.getCreated(targetid)
+            npc_records = [record] if record and record.recType == 'NPC_' \
+                else []
+        else:
+            npc_records = saveFile.getCreatedOfType('NPC_')
+        for record in npc_records:
             #--Created NPC record
-            if targetid and record.fid != targetid: continue
             npc = record.getTypeCopy()
             face = faces[npc.fid] = PCFaces.PCFace()
             face.face_masters = saveFile._masters
@@ -206,15 +210,13 @@ def save_setCreatedFace(saveFile,targetid,face):
         Note: Created NPCs do NOT use irefs!"""
         targetid = bolt.intArg(targetid)
         #--Find record
-        for index,record in enumerate(saveFile.created):
-            if record.fid == targetid:
-                npc = record.getTypeCopy()
-                saveFile.created[index] = npc
-                break
-        else:
+        record = saveFile.getCreated(targetid)
+        if record is None:
             raise StateError(u"Record %08X not found in %s." % (targetid,saveFile.fileInfo.name))
-        if npc.recType != 'NPC_':
+        if record.recType != 'NPC_':
             raise StateError(u"Record %08X in %s is not an NPC." % (targetid,saveFile.fileInfo.name))
+        npc = record.getTypeCopy()
+        saveFile.setCreated(npc)
         #--Update masters
         for fid in (face.race, face.eye, face.hair):
             if not fid: continue
@@ -435,6 +437,12 @@ def mod_getRaceFaces(modInfo):
     @staticmethod
     def mod_addFace(modInfo,face):
         """Writes a pcFace to a mod file."""
+        return PCFaces.mod_addFaces(modInfo, [face])[0]
+
+    @staticmethod
+    def mod_addFaces(modInfo, faces):
+        """Writes pcFaces to a mod file, loading and saving it only once.
+        Returns the new NPC records, in the order of faces."""
         #--Mod File
         loadFactory = LoadFactory(True,MreRecord.type_class['NPC_'])
         modFile = ModFile(modInfo,loadFactory)
@@ -449,15 +457,26 @@ def mod_addFace(modInfo,face):
         from . import modInfos ##: put it here so I know it's initialized...
         if modInfos.masterName not in tes4.masters:
             tes4.masters.append(modInfos.masterName)
+        npcEids = {record.eid for record in modFile.NPC_.records}
+        npcs = [PCFaces._mod_addFaceRecord(modFile, modInfo, face, npcEids)
+                for face in faces]
+        #--Save
+        modFile.safeSave()
+        return npcs
+
+    @staticmethod
+    def _mod_addFaceRecord(modFile, modInfo, face, npcEids):
+        """Adds an NPC record for a pcFace to a loaded mod file."""
+        tes4 = modFile.tes4
         masterMap = MasterMap(face.face_masters,tes4.masters+[modInfo.name])
         #--Eid
-        npcEids = {record.eid for record in modFile.NPC_.records}
         eidForm = u''.join((u"sg", bush.game.raceShortNames.get(face.race,u'Unk'),
             (face.gender and u'a' or u'u'), re.sub(u'' r'\W', u'', face.pcName), u'%02d'))
         count,eid = 0, eidForm % 0
         while eid in npcEids:
             count += 1
             eid = eidForm % count
+        npcEids.add(eid)
         #--NPC
         npcid = genFid(tes4.num_masters, tes4.getNextObject())
         npc = MreRecord.type_class['NPC_'](
@@ -488,6 +507,20 @@ def mod_addFace(modInfo,face):
         if face.attributes: npc.attributes = face.attributes
         npc.setChanged()
         modFile.NPC_.records.append(npc)
-        #--Save
-        modFile.safeSave()
         return npc
+
+    @staticmethod
+    def saves_exportFaces(saveInfos, modInfo, progress=None):
+        """Exports the player faces of the specified saveInfos to a mod
+        file, loading and saving the mod only once. Returns the new NPC
+        records, in the order of saveInfos."""
+        progress = progress or Progress()
+        progress.setFull(len(saveInfos) + 1)
+        faces = []
+        for index, saveInfo in enumerate(saveInfos):
+            progress(index, _(u'Reading %s.') % saveInfo.name)
+            saveFile = SaveFile(saveInfo)
+            saveFile.load(SubProgress(progress, index, index + 1))
+            faces.append(PCFaces.save_getPlayerFace(saveFile))
+        progress(len(saveInfos), _(u'Saving %s.') % modInfo.name)
+        return PCFaces.mod_addFaces(modInfo, faces)
@@ -56,6 +56,9 @@ def __init__(self):
         self.tagListModTime = None
         #--Bash Tags
         self.tagCache = {}
+        # Incremented whenever the LOOT lists/taglist are (re)loaded, so
+        # cached tags can tell whether they are stale
+        self.lists_generation = 0
         #--Refresh
         self.refreshBashTags()
 
@@ -67,6 +70,7 @@ def refreshBashTags(self):
             if (path.mtime != self.lootMasterTime or
                 (userpath.exists() and userpath.mtime != self.lootUserTime)):
                 self.tagCache = {}
+                self.lists_generation += 1
                 self.lootMasterTime = path.mtime
                 if userpath.exists():
                     self.lootUserTime = userpath.mtime
@@ -82,6 +86,7 @@ def refreshBashTags(self):
         if self.tagList.mtime == self.tagListModTime: return
         self.tagListModTime = self.tagList.mtime
         self.tagCache = {}
+        self.lists_generation += 1
         lootDb.load_lists(self.tagList)
 
     ##: move cache into loot_parser, then build more sophisticated invalidation
@@ -138,6 +143,21 @@ def get_tags_from_dir(self, plugin_name):
                         added.add(tag_entry)
         return process_tags(added), process_tags(removed)
 
+    @staticmethod
+    def get_tag_files_stamps():
+        """Returns a dict mapping the lowercase names (without extension) of
+        the files in Data/BashTags to their (size, mtime), so that callers can
+        tell if a tag file was added, changed or removed without reading it."""
+        tag_files_dir = bass.dirs[u'tag_files']
+        stamps = {}
+        for tag_file in tag_files_dir.list():
+            if tag_file.cext != u'.txt': continue
+            try:
+                stamps[tag_file.sbody.lower()] = tag_files_dir.join(
+                    tag_file).size_mtime()
+            except OSError: pass # a folder or removed in the meantime
+        return stamps
+
     def save_tags_to_dir(self, plugin_name, plugin_tags, plugin_old_tags):
         """Compares plugin_tags to plugin_old_tags and saves the diff to
         Data/BashTags/PLUGIN_NAME.txt.
@@ -24,11 +24,19 @@
 import collections
 import re
 import subprocess
+import threading
+import zipfile
+from functools import partial
 from subprocess import PIPE
+from zlib import crc32
 from .. import env, bolt, bass, archives
 from ..bolt import decoder, encode, Path, startupinfo, unpack_int_signed, \
     unpack_byte, unpack_short, unpack_int64_signed, pack_byte_signed, \
-    pack_byte, pack_int_signed
+    pack_byte, pack_int_signed, struct_pack
+from ..exception import StateError
+
+# Size of the chunks the data streams are read in
+_chunk_size = 1024 * 1024
 
 def _readNetString(open_file):
     """Read a .net string. THIS CODE IS DUBIOUS!"""
@@ -217,78 +225,79 @@ def extractToProject(self,outDir,progress=None):
     def extractFilesZip(self, crcPath, dataPath, outPath, progress):
         fileNames, crcs, sizes_ = self.getFile_CrcSizes(crcPath)
         if len(fileNames) == 0: return
-
-        # Extracted data stream is saved as a file named 'a'
-        progress(0, self.omod_path.tail + u'\n' + _(u'Unpacking %s') % dataPath.stail)
-        cmd = [archives.exe7z, u'e', u'-r', u'-sccUTF-8', dataPath.s, u'-o%s' % outPath]
-        subprocess.call(cmd, startupinfo=startupinfo)
-
-        # Split the uncompress stream into files
-        progress(0.7, self.omod_path.stail + u'\n' + _(u'Unpacking %s') % dataPath.stail)
-        self.splitStream(outPath.join(u'a'), outPath, fileNames, sizes_,
-                         bolt.SubProgress(progress,0.7,1.0,len(fileNames))
-                         )
+        # The data stream is zipped as a single file (named 'a') - inflate it
+        # in process and split it into files as it is decompressed
+        progress(0, self.omod_path.stail + u'\n' + _(u'Unpacking %s') % dataPath.stail)
+        with zipfile.ZipFile(dataPath.s) as data_zip:
+            with data_zip.open(data_zip.infolist()[0]) as stream:
+                self.splitStream(stream, dataPath, outPath, fileNames, crcs,
+                                 sizes_, progress)
         progress(1)
 
-        # Clean up
-        outPath.join(u'a').remove()
-
-    def splitStream(self, streamPath, outDir, fileNames, sizes_, progress):
-        # Split the uncompressed stream into files
-        progress(0, self.omod_path.stail + u'\n' + _(u'Unpacking %s') % streamPath.stail)
-        with streamPath.open(u'rb') as bin_out:
-            for i,name in enumerate(fileNames):
-                progress(i, self.omod_path.stail + u'\n' + _(u'Unpacking %s') % streamPath.stail + u'\n' + name)
-                outFile = outDir.join(name)
-                with outFile.open(u'wb') as output:
-                    output.write(bin_out.read(sizes_[i]))
-        progress(len(fileNames))
+    def splitStream(self, stream, dataPath, outDir, fileNames, crcs, sizes_,
+                    progress):
+        """Split the uncompressed stream into files, checking their CRCs on
+        the way."""
+        # Count the bytes on a subprogress - the caller's one is on its own
+        # scale, see the progress(1) calls after this
+        progress = bolt.SubProgress(progress, 0, 1, full=max(sum(sizes_), 1))
+        done = 0
+        for name, crc, size in zip(fileNames, crcs, sizes_):
+            progress(done, self.omod_path.stail + u'\n' + _(u'Unpacking %s') % dataPath.stail + u'\n' + name)
+            file_crc = 0
+            with outDir.join(name).open(u'wb') as output:
+                remaining = size
+                while remaining:
+                    chunk = stream.read(min(remaining, _chunk_size))
+                    if not chunk:
+                        raise StateError(u'%s: %s is truncated.' % (
+                            self.omod_path.stail, dataPath.stail))
+                    output.write(chunk)
+                    file_crc = crc32(chunk, file_crc)
+                    remaining -= len(chunk)
+            if file_crc & 0xFFFFFFFF != crc & 0xFFFFFFFF:
+                raise StateError(u'%s: CRC mismatch for %s.' % (
+                    self.omod_path.stail, decoder(name)))
+            done += size
+        progress(done)
 
     def extractFiles7z(self, crcPath, dataPath, outPath, progress):
         fileNames, crcs, sizes_ = self.getFile_CrcSizes(crcPath)
         if len(fileNames) == 0: return
-        totalSize = sum(sizes_)
-
-        # Extract data stream to an uncompressed stream
-        subprogress = bolt.SubProgress(progress,0,0.3,full=dataPath.size)
-        subprogress(0, self.omod_path.stail + u'\n' + _(u'Unpacking %s') % dataPath.stail)
-        with dataPath.open('rb') as ins:
-            done = 0
-            with open(outPath.join(dataPath.sbody+u'.tmp').s, u'wb') as output:
-                # Decoder properties
-                output.write(ins.read(5))
-                done += 5
-                subprogress(5)
-
-                # Next 8 bytes are the size of the data stream
-                for i in range(8):
-                    out = totalSize >> (i*8)
-                    pack_byte(output, out & 0xFF)
-                    done += 1
-                    subprogress(done)
-
-                # Now copy the data stream
-                while ins.tell() < dataPath.size:
-                    output.write(ins.read(512))
-                    done += 512
-                    subprogress(done)
-
-        # Now decompress
-        progress(0.3)
-        cmd = [bass.dirs[u'compiled'].join(u'lzma').s,u'd',outPath.join(dataPath.sbody+u'.tmp').s, outPath.join(dataPath.sbody+u'.uncomp').s]
-        subprocess.call(cmd,startupinfo=startupinfo)
-        progress(0.8)
-
-        # Split the uncompressed stream into files
-        self.splitStream(outPath.join(dataPath.sbody+u'.uncomp'), outPath, fileNames, sizes_,
-                         bolt.SubProgress(progress,0.8,1.0,full=len(fileNames))
-                         )
+        progress(0, self.omod_path.stail + u'\n' + _(u'Unpacking %s') % dataPath.stail)
+        # Pipe the data stream through lzma and split its output as it is
+        # decompressed. lzma expects the uncompressed size to follow the 5
+        # bytes of decoder properties, but OMODs don't store it - so feed
+        # the stream from a separate thread, adding the size on the way
+        cmd = [bass.dirs[u'compiled'].join(u'lzma').s, u'd', u'-si', u'-so']
+        lzma_proc = subprocess.Popen(cmd, stdin=PIPE, stdout=PIPE,
+                                     startupinfo=startupinfo)
+        def _feed_lzma():
+            try:
+                with dataPath.open(u'rb') as ins:
+                    lzma_proc.stdin.write(ins.read(5))
+                    lzma_proc.stdin.write(struct_pack(u'<Q', sum(sizes_)))
+                    for chunk in iter(partial(ins.read, _chunk_size), b''):
+                        lzma_proc.stdin.write(chunk)
+            except IOError:
+                pass # lzma quit early, we'll see that below
+            finally:
+                lzma_proc.stdin.close()
+        feeder = threading.Thread(target=_feed_lzma)
+        feeder.start()
+        try:
+            with lzma_proc.stdout as stream:
+                self.splitStream(stream, dataPath, outPath, fileNames, crcs,
+                                 sizes_, progress)
+        finally:
+            # Closing lzma's stdout makes it quit if we failed
+            feeder.join()
+            returncode = lzma_proc.wait()
+        if returncode:
+            raise StateError(u'%s: Unpacking %s failed: lzma returned %d.' % (
+                self.omod_path.stail, dataPath.stail, returncode))
         progress(1)
 
-        # Clean up temp files
-        outPath.join(dataPath.sbody+u'.uncomp').remove()
-        outPath.join(dataPath.sbody+u'.tmp').remove()
-
     @staticmethod
     def getFile_CrcSizes(crc_file_path):
         fileNames = list()
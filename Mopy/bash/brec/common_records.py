@@ -38,6 +38,10 @@
 from ..bolt import decoder, encode, GPath, sio
 from ..exception import StateError
 
+def _identity(fid):
+    """Default fid_key for the mergeWith methods below."""
+    return fid
+
 #------------------------------------------------------------------------------
 class MreHeaderBase(MelRecord):
     """File header.  Base class for all 'TES4' like records"""
@@ -133,24 +137,29 @@ def mergeFilter(self, modSet):
         if not self.longFids: raise StateError(u'Fids not in long format')
         self.formIDInList = [f for f in self.formIDInList if f[0] in modSet]
 
-    def mergeWith(self,other,otherMod):
+    def mergeWith(self, other, otherMod, fid_key=None):
         """Merges newLevl settings and entries with self.
-        Requires that: self.items, other.de_records be defined."""
+        Requires that: self.items, other.de_records be defined. If fid_key is
+        given, those sets hold the keys it returns for the FormIDs in the
+        lists instead of the FormIDs themselves."""
         if not self.longFids or not other.longFids:
             raise StateError(u'Fids not in long format')
+        if fid_key is None: fid_key = _identity
         #--Remove items based on other.removes
         if other.de_records:
             removeItems = self.items & other.de_records
-            self.formIDInList = [fi for fi in self.formIDInList if fi not in removeItems]
+            self.formIDInList = [fi for fi in self.formIDInList
+                                 if fid_key(fi) not in removeItems]
             self.items = (self.items | other.de_records)
         #--Add new items from other
         newItems = set()
         formIDInListAppend = self.formIDInList.append
         newItemsAdd = newItems.add
         for fi in other.formIDInList:
-            if fi not in self.items:
+            fi_key = fid_key(fi)
+            if fi_key not in self.items:
                 formIDInListAppend(fi)
-                newItemsAdd(fi)
+                newItemsAdd(fi_key)
         if newItems:
             self.items |= newItems
         #--Is merged list different from other? (And thus written to patch.)
@@ -275,12 +284,14 @@ def mergeFilter(self,modSet):
         if not self.longFids: raise StateError(u'Fids not in long format')
         self.entries = [entry for entry in self.entries if entry.listId[0] in modSet]
 
-    def mergeWith(self,other,otherMod):
+    def mergeWith(self, other, otherMod, fid_key=None):
         """Merges newLevl settings and entries with self.
         Requires that self.items, other.de_records and other.re_records be
-        defined."""
+        defined. If fid_key is given, those sets hold the keys it returns for
+        the FormIDs of the entries instead of the FormIDs themselves."""
         if not self.longFids or not other.longFids:
             raise exception.StateError(u'Fids not in long format')
+        if fid_key is None: fid_key = _identity
         #--Relevel or not?
         if other.re_records:
             for attr in self.__class__.top_copy_attrs:
@@ -295,7 +306,8 @@ def mergeWith(self,other,otherMod):
         #--Remove items based on other.removes
         if other.de_records or other.re_records:
             removeItems = self.items & (other.de_records | other.re_records)
-            self.entries = [entry for entry in self.entries if entry.listId not in removeItems]
+            self.entries = [entry for entry in self.entries
+                            if fid_key(entry.listId) not in removeItems]
             self.items = (self.items | other.de_records) - other.re_records
         hasOldItems = bool(self.items)
         #--Add new items from other
@@ -303,9 +315,10 @@ def mergeWith(self,other,otherMod):
         entriesAppend = self.entries.append
         newItemsAdd = newItems.add
         for entry in other.entries:
-            if entry.listId not in self.items:
+            entry_key = fid_key(entry.listId)
+            if entry_key not in self.items:
                 entriesAppend(entry)
-                newItemsAdd(entry.listId)
+                newItemsAdd(entry_key)
         # Check if merging exceeded the counter's limit and, if so, truncate it
         # and warn. Note that pre-Skyrim games do not have this limitation.
         from .. import bush
@@ -82,6 +82,12 @@ class MelCtda(MelUnion):
     _ctda_type_flags = Flags(0, Flags.getNames(
         u'do_or', u'use_aliases', u'use_global', u'use_packa_data',
         u'swap_subject_and_target'))
+    # Maps the game and __init__ parameters to the structs built for them.
+    # Games use the same conditions in hundreds of places, and building
+    # several hundred structs for each of them used to dominate the time it
+    # takes to import the record definitions. The structs hold no record
+    # state, so all MelCtda instances with the same parameters share them.
+    _built_structs = {}
 
     def __init__(self, ctda_sub_sig=b'CTDA', suffix_fmt=u'',
             suffix_elements=None, old_suffix_fmts=None):
@@ -100,13 +106,18 @@ def __init__(self, ctda_sub_sig=b'CTDA', suffix_fmt=u'',
         if old_suffix_fmts is None: old_suffix_fmts = set()
         if suffix_elements is None: suffix_elements = []
         from .. import bush
-        super(MelCtda, self).__init__({
+        structs_key = (type(self), bush.game.fsName, ctda_sub_sig, suffix_fmt,
+                       tuple(suffix_elements), frozenset(old_suffix_fmts))
+        try:
+            func_structs = self._built_structs[structs_key]
+        except KeyError:
             # Build a (potentially truncated) struct for each function index
-            func_index: self._build_struct(func_data, ctda_sub_sig, suffix_fmt,
-                                           suffix_elements, old_suffix_fmts)
-            for func_index, func_data
-            in bush.game.condition_function_data.iteritems()
-        }, decider=PartialLoadDecider(
+            func_structs = self._built_structs[structs_key] = {
+                func_index: self._build_struct(func_data, ctda_sub_sig,
+                    suffix_fmt, suffix_elements, old_suffix_fmts)
+                for func_index, func_data
+                in bush.game.condition_function_data.iteritems()}
+        super(MelCtda, self).__init__(func_structs, decider=PartialLoadDecider(
             # Skip everything up to the function index in one go, we'll be
             # discarding this once we rewind anyways.
             loader=MelStruct(ctda_sub_sig, u'8sH', u'ctda_ignored', u'ifunc'),
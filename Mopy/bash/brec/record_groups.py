@@ -24,22 +24,30 @@
 
 # Python imports
 from __future__ import division, print_function
+import os
 import struct
 from collections import deque
+from functools import partial
 from itertools import chain
 from operator import itemgetter, attrgetter
 # Wrye Bash imports
 from .mod_io import GrupHeader, ModReader, RecordHeader, TopGrupHeader
 from .utils_constants import group_types
 from ..bolt import GPath, sio
-from ..exception import AbstractError, ModError, ModFidMismatchError
+from ..exception import AbstractError, ModError, ModFidMismatchError, \
+    StateError
 
 class MobBase(object):
     """Group of records and/or subgroups. This basic implementation does not
-    support unpacking, but can report its number of records and be written."""
+    support unpacking, but can report its number of records and be written.
+
+    A group that is loaded from a file without being unpacked does not read
+    its data into memory. It only remembers where in the file the data is
+    (see raw_source) and block copies it from there when it is dumped."""
 
     __slots__ = ['header','size','label','groupType','stamp','debug','data',
-                 'changed','numRecords','loadFactory','inName'] ##: nice collection of forbidden names, including header -> group_header
+                 'changed','numRecords','loadFactory','inName', 'raw_source',
+                 '_num_groups'] ##: nice collection of forbidden names, including header -> group_header
 
     def __init__(self, header, loadFactory, ins=None, do_unpack=False):
         self.header = header
@@ -53,8 +61,13 @@ def __init__(self, header, loadFactory, ins=None, do_unpack=False):
                 header.flags1, header.fid, header.flags2)
         self.debug = False
         self.data = None
+        # A tuple of the path to the file the raw data of this group is in,
+        # the position of the data in it and the size and modification time
+        # the file had when it was loaded, or None if it was read into data
+        self.raw_source = None
         self.changed = False
         self.numRecords = -1
+        self._num_groups = 0
         self.loadFactory = loadFactory
         self.inName = ins and ins.inName
         if ins: self.load_rec_group(ins, do_unpack)
@@ -62,21 +75,29 @@ def __init__(self, header, loadFactory, ins=None, do_unpack=False):
     def load_rec_group(self, ins=None, do_unpack=False):
         """Load data from ins stream or internal data buffer."""
         if self.debug: print(u'GRUP load:',self.label)
-        #--Read, but don't analyze.
+        data_size = self.size - RecordHeader.rec_header_size
+        #--Read, but don't analyze. Data in files on disk is read lazily
         if not do_unpack:
-            self.data = ins.read(self.size - RecordHeader.rec_header_size,
-                                 type(self))
+            src_path = getattr(ins.ins, u'name', None)
+            if isinstance(src_path, basestring):
+                src_stat = os.fstat(ins.ins.fileno())
+                self.raw_source = (src_path, ins.tell(), (src_stat.st_size,
+                                                          src_stat.st_mtime))
+                ins.seek(data_size, 1, type(self))
+            else:
+                self.data = ins.read(data_size, type(self))
         #--Analyze ins.
         elif ins is not None:
-            self._load_rec_group(ins,
-                ins.tell() + self.size - RecordHeader.rec_header_size)
+            self._load_rec_group(ins, ins.tell() + data_size)
         #--Analyze internal buffer.
         else:
-            with self.getReader() as reader:
-                self._load_rec_group(reader, reader.size)
+            reader, end_pos = self._raw_reader()
+            with reader:
+                self._load_rec_group(reader, end_pos)
         #--Discard raw data?
         if do_unpack:
-            self.data = None
+            self.data = self.raw_source = None
+            self.numRecords = -1
             self.setChanged()
 
     def setChanged(self,value=True):
@@ -89,45 +110,99 @@ def getSize(self):
         return self.size
 
     def getNumRecords(self,includeGroups=True):
-        """Returns number of records, including self (if plusSelf), unless
-        there's no subrecords, in which case, it returns 0."""
+        """Returns number of records, including self and any groups nested in
+        self if includeGroups is True, unless there's no subrecords, in which
+        case, it returns 0. Counts them by walking the record headers in the
+        raw data, so may only be used while self is not changed - subclasses
+        that can be unpacked count their unpacked records instead."""
         if self.changed:
             raise AbstractError
-        elif self.numRecords > -1: #--Cached value.
-            return self.numRecords
-        elif not self.data: #--No data >> no records, not even self.
-            self.numRecords = 0
-            return self.numRecords
-        else:
-            numSubRecords = 0
-            reader = self.getReader()
+        if self.numRecords == -1: #--Not cached yet
+            self.numRecords, self._num_groups = self._count_raw_records()
+        if not self.numRecords and not self._num_groups: #--No records, not even self.
+            return 0
+        return self.numRecords + includeGroups * (self._num_groups + 1)
+
+    def _count_raw_records(self):
+        """Returns the number of records and the number of groups in the raw
+        data of this group, by walking their headers."""
+        if self.size <= RecordHeader.rec_header_size: #--No data
+            return 0, 0
+        num_records = num_groups = 0
+        reader, end_pos = self._raw_reader()
+        with reader:
             errLabel = group_types[self.groupType]
             readerAtEnd = reader.atEnd
             readerRecHeader = reader.unpackRecHeader
             readerSeek = reader.seek
-            while not readerAtEnd(reader.size,errLabel):
+            while not readerAtEnd(end_pos,errLabel):
                 header = readerRecHeader()
-                recType,size = header.recType,header.size
-                if recType == 'GRUP': size = 0
-                readerSeek(size,1)
-                numSubRecords += 1
-            self.numRecords = numSubRecords + includeGroups
-            return self.numRecords
+                if header.recType == b'GRUP':
+                    num_groups += 1
+                else:
+                    readerSeek(header.size, 1)
+                    num_records += 1
+        return num_records, num_groups
 
     def dump(self,out):
         """Dumps record header and data into output file stream."""
         if self.changed:
             raise AbstractError
-        if self.numRecords == -1:
-            self.getNumRecords()
-        if self.numRecords > 0:
+        if self.getNumRecords():
             self.header.size = self.size
             out.write(self.header.pack_head())
+            self._dump_raw(out)
+
+    def _raw_reader(self):
+        """Returns a ModReader over the raw data of this group, positioned at
+        the start of the data, and the position at which the data ends."""
+        if self.raw_source is None:
+            reader = ModReader(self.inName, sio(self.data or b''))
+            return reader, reader.size
+        src_pos = self.raw_source[1]
+        reader = ModReader(self.inName, self._open_raw_source())
+        reader.seek(src_pos)
+        return reader, src_pos + self.size - RecordHeader.rec_header_size
+
+    def _open_raw_source(self):
+        """Opens the file the raw data of this group is in, making sure it did
+        not change since the group was loaded from it."""
+        src_path, _src_pos, src_stamp = self.raw_source
+        src_ins = open(src_path, u'rb')
+        src_stat = os.fstat(src_ins.fileno())
+        if (src_stat.st_size, src_stat.st_mtime) != src_stamp:
+            src_ins.close()
+            raise StateError(u'%s: %s changed on disk since the %s group was '
+                             u'loaded from it.' % (self.inName, src_path,
+                                                   self.label))
+        return src_ins
+
+    def _dump_raw(self, out, __chunk_size=0x1000000):
+        """Writes the raw data of this group to out, block copying it from the
+        file it was loaded from if it was never read into memory."""
+        if self.raw_source is None:
             out.write(self.data)
-
-    def getReader(self):
-        """Returns a ModReader wrapped around self.data."""
-        return ModReader(self.inName,sio(self.data))
+            return
+        src_pos = self.raw_source[1]
+        remaining = self.size - RecordHeader.rec_header_size
+        with self._open_raw_source() as ins:
+            ins.seek(src_pos)
+            while remaining:
+                chunk = ins.read(min(remaining, __chunk_size))
+                if not chunk:
+                    raise ModError(self.inName, u'%s group was truncated on '
+                                   u'disk since it was loaded' % self.label)
+                out.write(chunk)
+                remaining -= len(chunk)
+
+    def read_raw_data(self):
+        """Reads the raw data of this group into memory, so that it no longer
+        depends on the file it was loaded from."""
+        if self.raw_source is not None:
+            reader, end_pos = self._raw_reader()
+            with reader:
+                self.data = reader.read(end_pos - reader.tell())
+            self.raw_source = None
 
     def iter_filtered_records(self, wanted_sigs, include_ignored=False):
         """Filters iter_records, returning a generator that only yields records
@@ -146,8 +221,9 @@ def get_all_signatures(self):
     def convertFids(self,mapper,toLong):
         """Converts fids between formats according to mapper.
         toLong should be True if converting to long format or False if
-        converting to short format."""
-        raise AbstractError(u'convertFids not implemented')
+        converting to short format. Raw data is left in the format it was
+        loaded in - see ModFile.save."""
+        if self.changed: raise AbstractError(u'convertFids not implemented')
 
     def indexRecords(self):
         """Indexes records by fid."""
@@ -198,12 +274,34 @@ class MobObjects(MobBase):
     all top groups except CELL, WRLD and DIAL."""
 
     def __init__(self, header, loadFactory, ins=None, do_unpack=False):
-        self.records = []
+        self._records = []
         self.id_records = {}
+        # Maps the same keys as id_records to the slot in records at which
+        # the record is stored
+        self._id_slot = {}
         from .. import bosh
         self._null_fid = (bosh.modInfos.masterName, 0)
         super(MobObjects, self).__init__(header, loadFactory, ins, do_unpack)
 
+    @property
+    def records(self):
+        """The list of records in this block, in order."""
+        return self._records
+
+    @records.setter
+    def records(self, new_records):
+        self._records = new_records
+        self.id_records.clear()
+        self._id_slot.clear()
+
+    def _record_key(self, record):
+        """Returns the key under which the specified record is indexed - its
+        fid, or its EDID if it is keyed by EDID and has a null fid."""
+        record_id = record.fid
+        if record.isKeyedByEid and record_id == self._null_fid:
+            return record.eid
+        return record_id
+
     def get_all_signatures(self):
         return {self.label}
 
@@ -230,6 +328,8 @@ def getActiveRecords(self):
 
     def getNumRecords(self,includeGroups=True):
         """Returns number of records, including self."""
+        if not self.changed:
+            return super(MobObjects, self).getNumRecords(includeGroups)
         numRecords = len(self.records)
         if numRecords: numRecords += includeGroups #--Count self
         self.numRecords = numRecords
@@ -249,7 +349,7 @@ def dump(self,out):
         if not self.changed:
             out.write(TopGrupHeader(self.size, self.label, 0, ##: self.header.pack_head() ?
                                     self.stamp).pack_head())
-            out.write(self.data)
+            self._dump_raw(out)
         else:
             size = self.getSize()
             if size == RecordHeader.rec_header_size: return
@@ -273,13 +373,19 @@ def convertFids(self,mapper,toLong):
     def indexRecords(self):
         """Indexes records by fid."""
         self.id_records.clear()
-        for record in self.records:
-            self.id_records[record.fid] = record
+        self._id_slot.clear()
+        id_recs = self.id_records
+        id_slot = self._id_slot
+        rec_key = self._record_key
+        for slot, record in enumerate(self.records):
+            record_id = rec_key(record)
+            id_recs[record_id] = record
+            id_slot[record_id] = slot
 
     def getRecord(self,fid,default=None):
         """Gets record with corresponding id.
         If record doesn't exist, returns None."""
-        if not self.records: return default
+        if not self._records: return default
         if not self.id_records: self.indexRecords()
         return self.id_records.get(fid,default)
 
@@ -288,18 +394,18 @@ def setRecord(self,record):
         self_recs = self.records
         if self_recs and not self.id_records:
             self.indexRecords()
-        record_id = record.fid
-        if record.isKeyedByEid:
-            if record_id == self._null_fid:
-                record_id = record.eid
+        record_id = self._record_key(record)
         self_id_recs = self.id_records
         # This check fails fairly often, so do this instead of try/except
         if record_id in self_id_recs:
-            ##: Building a fid -> index mapping in indexRecords could make this
-            # O(1) instead of O(n) - see if that's worth it (memory!)
-            self_recs[self_recs.index(
-                self_id_recs[record_id])] = record
+            slot = self._id_slot.get(record_id)
+            if slot is None or self_recs[slot] is not self_id_recs[record_id]:
+                # Someone edited the records list behind our back
+                self.indexRecords()
+                slot = self._id_slot[record_id]
+            self_recs[slot] = record
         else:
+            self._id_slot[record_id] = len(self_recs)
             self_recs.append(record)
         self_id_recs[record_id] = record
 
@@ -316,10 +422,10 @@ def copy_records(self, records):
 
     def keepRecords(self, p_keep_ids):
         """Keeps records with fid in set p_keep_ids. Discards the rest."""
-        self.records = [record for record in self.records if (record.fid == (
-            record.isKeyedByEid and self._null_fid[0],
-            0) and record.eid in p_keep_ids) or record.fid in p_keep_ids]
-        self.id_records.clear()
+        rec_key = self._record_key
+        self.records = [record for record in self._records if
+                        rec_key(record) in p_keep_ids or
+                        record.fid in p_keep_ids]
         self.setChanged()
 
     def updateRecords(self, srcBlock, mergeIds):
@@ -327,21 +433,21 @@ def updateRecords(self, srcBlock, mergeIds):
             self.indexRecords()
         merge_ids_discard = mergeIds.discard
         copy_to_self = self.setRecord
-        dest_rec_fids = self.id_records
+        dest_rec_ids = self.id_records
+        rec_key = self._record_key
         for record in srcBlock.getActiveRecords():
-            src_rec_fid = record.fid
-            if src_rec_fid in dest_rec_fids:
+            src_rec_id = rec_key(record)
+            if src_rec_id in dest_rec_ids:
                 copy_to_self(record.getTypeCopy())
-                merge_ids_discard(src_rec_fid)
+                merge_ids_discard(src_rec_id)
 
     def merge_records(self, block, loadSet, mergeIds, iiSkipMerge, doFilter):
         # YUCK, drop these local imports!
         from .. import bush
-        from ..bosh import modInfos
         from ..mod_files import MasterSet
         bad_form = (GPath(bush.game.master_file), 0xA31D) # DarkPCB record
         is_oblivion = bush.game.displayName == u'Oblivion'
-        _null_fid = (modInfos.masterName, 0)
+        rec_key = self._record_key
         filtered = []
         filteredAppend = filtered.append
         loadSetIsSuperset = loadSet.issuperset
@@ -368,10 +474,7 @@ def merge_records(self, block, loadSet, mergeIds, iiSkipMerge, doFilter):
             if iiSkipMerge: continue
             # We're past all hurdles - stick a copy of this record into
             # ourselves and mark it as merged
-            if record.isKeyedByEid and fid == _null_fid:
-                mergeIdsAdd(record.eid)
-            else:
-                mergeIdsAdd(fid)
+            mergeIdsAdd(rec_key(record))
             copy_to_self(record.getTypeCopy())
         # Apply any merge filtering we've done above to the record block in
         # question. That way, patchers won't see the records that have been
@@ -427,6 +530,8 @@ def getSize(self):
 
     def getNumRecords(self,includeGroups=True):
         # DIAL record + GRUP + INFOs
+        if not self.changed:
+            return 1 + MobBase.getNumRecords(self, includeGroups)
         self.numRecords = 1 + (includeGroups + len(self.records)
                                if self.records else 0)
         return self.numRecords
@@ -439,7 +544,7 @@ def dump(self, out):
         self.dial.dump(out)
         if not self.changed:
             out.write(self.header.pack_head())
-            out.write(self.data)
+            self._dump_raw(out)
         else:
             if not self.records: return
             # Sort our INFOs by PNAM just before writing them out
@@ -647,6 +752,8 @@ def getSize(self):
 
     def getNumRecords(self,includeGroups=True):
         """Returns number of records, including self plus info records."""
+        if not self.changed:
+            return super(MobDials, self).getNumRecords(includeGroups)
         self.numRecords = sum(d.getNumRecords(includeGroups)
                               for d in self.dialogues)
         self.numRecords += includeGroups # top DIAL GRUP
@@ -655,7 +762,7 @@ def getNumRecords(self,includeGroups=True):
     def dump(self, out):
         if not self.changed:
             out.write(self.header.pack_head())
-            out.write(self.data)
+            self._dump_raw(out)
         else:
             dial_size = self.getSize()
             if dial_size == RecordHeader.rec_header_size: return
@@ -774,7 +881,7 @@ class MobCell(MobBase):
     """Represents cell block structure -- including the cell and all
     subrecords."""
     __slots__ = [u'cell', u'persistent_refs', u'distant_refs', u'temp_refs',
-                 u'land', u'pgrd']
+                 u'land', u'pgrd', u'_ref_indices']
 
     def __init__(self, header, loadFactory, cell, ins=None, do_unpack=False):
         self.cell = cell
@@ -783,6 +890,9 @@ def __init__(self, header, loadFactory, cell, ins=None, do_unpack=False):
         self.temp_refs = []
         self.land = None
         self.pgrd = None
+        # Maps each reference list attribute to a [list, length,
+        # {fid: position}] list, built lazily by _get_ref_index
+        self._ref_indices = {}
         super(MobCell, self).__init__(header, loadFactory, ins, do_unpack)
 
     def _load_rec_group(self, ins, endPos):
@@ -924,11 +1034,54 @@ def _write_group_header(self, out, group_size, group_type):
         out.write(GrupHeader(group_size, self.cell.fid, group_type,
                              self.stamp).pack_head()) # FIXME was TESIV only - self.extra??
 
+    #--Indexed reference access ----------------------------------------------
+    def _get_ref_index(self, list_attr):
+        """Returns a dict mapping the fids of the records in the reference
+        list stored in list_attr (one of 'persistent_refs', 'temp_refs' or
+        'distant_refs') to their position in that list. The index is cached
+        and rebuilt if the list was replaced or changed length behind our
+        back - use _find_ref to also catch references that were replaced in
+        place."""
+        ref_list = getattr(self, list_attr)
+        cached = self._ref_indices.get(list_attr)
+        if (cached and cached[0] is ref_list and
+                cached[1] == len(ref_list)):
+            return cached[2]
+        fid_pos = {r.fid: i for i, r in enumerate(ref_list)}
+        self._ref_indices[list_attr] = [ref_list, len(ref_list), fid_pos]
+        return fid_pos
+
+    def _find_ref(self, list_attr, ref_fid):
+        """Returns the position of the reference with the specified fid in the
+        reference list stored in list_attr, or None if there is no such
+        record. Rebuilds the index if the cached position turns out to hold
+        another record."""
+        pos = self._get_ref_index(list_attr).get(ref_fid)
+        if pos is not None and getattr(self, list_attr)[pos].fid != ref_fid:
+            del self._ref_indices[list_attr]
+            pos = self._get_ref_index(list_attr).get(ref_fid)
+        return pos
+
+    def set_ref(self, list_attr, record):
+        """Stores the specified reference in the reference list stored in
+        list_attr, replacing any record with the same fid that is already
+        present in that list or appending it otherwise."""
+        rec_fid = record.fid
+        pos = self._find_ref(list_attr, rec_fid)
+        ref_list = getattr(self, list_attr)
+        if pos is not None:
+            ref_list[pos] = record
+        else:
+            self._ref_indices[list_attr][2][rec_fid] = len(ref_list)
+            ref_list.append(record)
+            self._ref_indices[list_attr][1] += 1
+
     #--Fid manipulation, record filtering ----------------------------------
     def convertFids(self,mapper,toLong):
         """Converts fids between formats according to mapper.
         toLong should be True if converting to long format or False if
         converting to short format."""
+        self._ref_indices.clear() # keyed by the old fids
         self.cell.convertFids(mapper,toLong)
         for record in self.temp_refs:
             record.convertFids(mapper,toLong)
@@ -981,11 +1134,12 @@ def updateRecords(self, srcBlock, mergeIds, __attrget=attrgetter(
         for attr, (self_rec_list, src_rec_list) in zip(
                 (u'persistent_refs', u'temp_refs', u'distant_refs'),
                 self_src_attrs[3:]):
-            fids = {record.fid: i for i, record in enumerate(self_rec_list)}
             for record in src_rec_list:
+                if record.flags1.ignored: continue
                 src_fid = record.fid
-                if not record.flags1.ignored and src_fid in fids:
-                    self_rec_list[fids[src_fid]] = record.getTypeCopy()
+                pos = self._find_ref(attr, src_fid)
+                if pos is not None:
+                    self_rec_list[pos] = record.getTypeCopy()
                     mergeDiscard(src_fid)
 
     def iter_records(self):
@@ -1040,12 +1194,7 @@ def merge_records(self, block, loadSet, mergeIds, iiSkipMerge, doFilter):
         for list_attr in (u'temp_refs', u'persistent_refs', u'distant_refs'):
             filtered_list = []
             filtered_append = filtered_list.append
-            # Build a mapping from fids in the current list to the index at
-            # which they're stored ##: cache? see also updateRecords above
-            dest_list = getattr(self, list_attr)
-            append_to_dest = dest_list.append
-            id_fids = {record.fid: i for i, record
-                       in enumerate(dest_list)}
+            store_ref = partial(self.set_ref, list_attr)
             for src_rec in getattr(block, list_attr):
                 if src_rec.flags1.ignored: continue
                 # If we're Filter-tagged, perform merge filtering first
@@ -1061,13 +1210,8 @@ def merge_records(self, block, loadSet, mergeIds, iiSkipMerge, doFilter):
                 if iiSkipMerge: continue
                 # We're past all hurdles - stick a copy of this record into
                 # ourselves and mark it as merged
-                src_fid = src_rec.fid
-                rec_copy = src_rec.getTypeCopy()
-                mergeIdsAdd(src_fid)
-                if rec_copy.fid in id_fids:
-                    dest_list[id_fids[src_fid]] = rec_copy
-                else:
-                    append_to_dest(rec_copy)
+                mergeIdsAdd(src_rec.fid)
+                store_ref(src_rec.getTypeCopy())
             # Apply any merge filtering we've done here
             setattr(block, list_attr, filtered_list)
 
@@ -1099,19 +1243,29 @@ def indexRecords(self):
         """Indexes records by fid."""
         self.id_cellBlock = {x.cell.fid: x for x in self.cellBlocks}
 
+    def get_cell_block(self, cell_fid, default=None):
+        """Returns the cell block for the cell with the specified fid, or
+        default if this block does not contain such a cell."""
+        if self.cellBlocks and not self.id_cellBlock:
+            self.indexRecords()
+        return self.id_cellBlock.get(cell_fid, default)
+
     def setCell(self,cell):
-        """Adds record to record list and indexed."""
+        """Adds record to record list and indexed. Returns the cell block
+        the cell was stored in."""
         if self.cellBlocks and not self.id_cellBlock:
             self.indexRecords()
         fid = cell.fid
         if fid in self.id_cellBlock:
-            self.id_cellBlock[fid].cell = cell
+            cellBlock = self.id_cellBlock[fid]
+            cellBlock.cell = cell
         else:
             cellBlock = MobCell(GrupHeader(0, 0, 6, self.stamp), ##: Note label is 0 here - specialized GrupHeader subclass?
                                 self.loadFactory, cell)
             cellBlock.setChanged()
             self.cellBlocks.append(cellBlock)
             self.id_cellBlock[fid] = cellBlock
+        return cellBlock
 
     def remove_cell(self, cell):
         """Removes the specified cell from this block. The exact cell object
@@ -1174,6 +1328,8 @@ def dumpBlocks(self,out,bsbCellBlocks,bsb_size,blockGroupType,
 
     def getNumRecords(self,includeGroups=True):
         """Returns number of records, including self and all children."""
+        if not self.changed:
+            return super(MobCells, self).getNumRecords(includeGroups)
         count = sum(x.getNumRecords(includeGroups) for x in self.cellBlocks)
         if count and includeGroups:
             count += 1 + len(self.getUsedBlocks()) + len(
@@ -1348,7 +1504,7 @@ def dump(self,out):
         """Dumps group header and then records."""
         if not self.changed:
             out.write(self.header.pack_head())
-            out.write(self.data)
+            self._dump_raw(out)
         elif self.cellBlocks:
             (totalSize, bsb_size, blocks) = self.getBsbSizes()
             self.header.size = totalSize
@@ -1468,8 +1624,8 @@ def build_cell_block(unpack_block=False, skip_delta=False):
 
     def getNumRecords(self,includeGroups=True):
         """Returns number of records, including self and all children."""
-        if not self.changed:
-            return super(MobCells, self).getNumRecords() ##: includeGroups?
+        if not self.changed: # self.world + the raw children group
+            return 1 + super(MobCells, self).getNumRecords(includeGroups)
         count = 1 # self.world, always present
         count += bool(self.road)
         if self.worldCellBlock:
@@ -1485,7 +1641,7 @@ def dump(self,out):
         self.world.dump(out)
         if not self.changed:
             out.write(self.header.pack_head())
-            out.write(self.data)
+            self._dump_raw(out)
             return self.size + worldSize
         elif self.cellBlocks or self.road or self.worldCellBlock:
             (totalSize, bsb_size, blocks) = self.getBsbSizes()
@@ -1716,7 +1872,7 @@ def dump(self,out):
         """Dumps group header and then records."""
         if not self.changed:
             out.write(self.header.pack_head())
-            out.write(self.data)
+            self._dump_raw(out)
         else:
             if not self.worldBlocks: return
             worldHeaderPos = out.tell()
@@ -1730,6 +1886,8 @@ def dump(self,out):
 
     def getNumRecords(self,includeGroups=True):
         """Returns number of records, including self and all children."""
+        if not self.changed:
+            return super(MobWorlds, self).getNumRecords(includeGroups)
         count = sum(x.getNumRecords(includeGroups) for x in self.worldBlocks)
         return count + includeGroups * bool(count)
 
@@ -1764,19 +1922,29 @@ def updateRecords(self, srcBlock, mergeIds):
             if worldBlock:
                 worldBlock.updateRecords(srcWorldBlock, mergeIds)
 
+    def get_world_block(self, world_fid, default=None):
+        """Returns the world block for the world with the specified fid, or
+        default if this block does not contain such a world."""
+        if self.worldBlocks and not self.id_worldBlocks:
+            self.indexRecords()
+        return self.id_worldBlocks.get(world_fid, default)
+
     def setWorld(self, world):
-        """Adds record to record list and indexed."""
+        """Adds record to record list and indexed. Returns the world block
+        the world was stored in."""
         if self.worldBlocks and not self.id_worldBlocks:
             self.indexRecords()
         fid = world.fid
         if fid in self.id_worldBlocks:
-            self.id_worldBlocks[fid].world = world
+            worldBlock = self.id_worldBlocks[fid]
+            worldBlock.world = world
         else:
             worldBlock = MobWorld(GrupHeader(0, 0, 1, self.stamp), ##: groupType = 1
                                   self.loadFactory, world)
             worldBlock.setChanged()
             self.worldBlocks.append(worldBlock)
             self.id_worldBlocks[fid] = worldBlock
+        return worldBlock
 
     def remove_world(self, world):
         """Removes the specified world from this block. The exact world object
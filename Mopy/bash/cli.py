@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+#
+# GPL License and Copyright Notice ============================================
+#  This file is part of Wrye Bash.
+#
+#  Wrye Bash is free software: you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  Wrye Bash is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with Wrye Bash.  If not, see <https://www.gnu.org/licenses/>.
+#
+#  Wrye Bash copyright (C) 2005-2009 Wrye, 2010-2020 Wrye Bash Team
+#  https://github.com/wrye-bash
+#
+# =============================================================================
+"""Headless batch mode. Boots bosh and bush the same way Wrye Bash does, but
+without creating an application or any windows, then runs the requested
+operations (in the order given) on the real game data and prints their
+timings as JSON to stdout. Run it from the Mopy folder:
+
+    python -m bash.cli -o "C:\\Games\\Skyrim" build-patch crcs
+
+Note that wx must still be importable, since bosh imports balt and the
+settings defaults and Bashed Patch configuration live in basher."""
+
+from __future__ import division, print_function
+import argparse
+import copy
+import gettext
+import json
+import os
+import StringIO
+import sys
+from collections import OrderedDict
+from ConfigParser import ConfigParser
+from timeit import default_timer
+
+from . import bass, bolt
+from .bolt import GPath, SubProgress
+from .exception import BoltError
+# bush, env, load_order and co. are imported after installing the gettext
+# translation in _init, since importing the game modules needs it
+
+# The operations that can be requested, in the order they are listed in the
+# help - each maps to a function taking the parsed arguments and returning a
+# dict of results that gets printed along with the timing
+_operations = OrderedDict()
+
+def _operation(op_name):
+    def _register(op_func):
+        _operations[op_name] = op_func
+        return op_func
+    return _register
+
+def _init(parsed_args):
+    """Mirrors the boot sequence in bash._main, minus everything that needs a
+    wx.App (locale, single instance check, UAC prompts, images, links)."""
+    gettext.NullTranslations().install(unicode=True)
+    bass.active_locale = u'English'
+    from . import bush, env, initialization
+    initialization.init_dirs_mopy()
+    bash_ini = None
+    if os.path.exists(u'bash.ini'):
+        bash_ini = ConfigParser()
+        bash_ini.read(u'bash.ini')
+    # returns None on success, the games it found otherwise (may be empty)
+    if bush.detect_and_set_game(parsed_args.oblivionPath,
+                                bash_ini) is not None:
+        raise BoltError(u'Could not determine the game to run for - pass '
+                        u'its install folder via -o')
+    game_ini_path, init_warnings = initialization.init_dirs(
+        bash_ini, parsed_args.personalPath, parsed_args.localAppDataPath,
+        bush.game)
+    for warning in init_warnings:
+        print(u'Warning: %s' % warning, file=sys.stderr)
+    from . import bosh # this imports balt which imports wx
+    bosh.initBosh(bash_ini, game_ini_path)
+    env.isUAC = env.testUAC(bush.game.gamePath.join(bush.game.mods_dir))
+    from . import basher
+    basher.InitSettings()
+
+def _init_data():
+    """Mirrors BashApp.InitData."""
+    from . import bosh
+    bosh.bsaInfos = bosh.BSAInfos()
+    bosh.bsaInfos.refresh(booting=True)
+    bosh.modInfos = bosh.ModInfos()
+    bosh.modInfos.refresh(booting=True)
+    bosh.saveInfos = bosh.SaveInfos()
+    bosh.saveInfos.refresh(booting=True)
+    bosh.iniInfos = bosh.INIInfos()
+    bosh.iniInfos.refresh(refresh_target=False)
+    return {u'plugins': len(bosh.modInfos), u'saves': len(bosh.saveInfos)}
+
+def _set_load_order(lo_path):
+    """Reads a load order from lo_path - one plugin per line, active ones
+    prefixed with an asterisk, like plugins.txt in the asterisk format - and
+    saves it."""
+    from . import bosh, load_order
+    lord, acti = [], []
+    with GPath(lo_path).open(u'r', encoding=u'utf-8-sig') as ins:
+        for line in ins:
+            line = line.strip()
+            if not line or line.startswith(u'#'): continue
+            is_active = line.startswith(u'*')
+            mod = GPath(line[1:] if is_active else line)
+            lord.append(mod)
+            if is_active: acti.append(mod)
+    load_order.save_lo(lord, acti)
+    bosh.modInfos.refresh(refresh_infos=False)
+    return {u'plugins': len(load_order.cached_lord.loadOrder),
+            u'active': len(load_order.cached_active_tuple())}
+
+@_operation(u'crcs')
+def _refresh_crcs(parsed_args):
+    from . import bosh
+    bosh.modInfos.refresh_crcs()
+    return {u'plugins': len(bosh.modInfos)}
+
+@_operation(u'scan-dirty')
+def _scan_dirty(parsed_args):
+    from . import bosh, load_order
+    from .bosh.mods_metadata import ModCleaner
+    active_infos = [bosh.modInfos[m] for m in
+                    load_order.cached_active_tuple()]
+    scanned = ModCleaner.scan_Many(active_infos,
+                                   ModCleaner.UDR | ModCleaner.FOG)
+    return {u'plugins': len(active_infos),
+            u'udrs': sum(len(udrs) for udrs, _itms, _fogs in scanned)}
+
+def _get_installers_data():
+    from . import bosh
+    idata = bosh.bain.InstallersData()
+    # no fullRefresh, that needs a busy cursor and so a wx.App
+    idata.irefresh(what=u'DISC')
+    return idata
+
+@_operation(u'installers')
+def _refresh_installers(parsed_args):
+    return {u'installers': len(_get_installers_data())}
+
+@_operation(u'anneal')
+def _anneal_installers(parsed_args):
+    idata = _get_installers_data()
+    idata.bain_anneal(None, [False, False])
+    idata.save()
+    return {u'installers': len(idata)}
+
+@_operation(u'build-patch')
+def _build_patch(parsed_args):
+    """Mirrors PatchDialog.PatchExecute, but takes the configuration either
+    from the Bashed Patch itself or from an exported configuration."""
+    from . import bosh
+    from .basher import configIsCBash
+    from .basher.patcher_dialog import all_gui_patchers
+    from .patcher import list_patches_dir
+    from .patcher.patch_files import PatchFile
+    list_patches_dir() # refresh cached dir
+    patch_name = GPath(parsed_args.patch)
+    if patch_name not in bosh.modInfos:
+        raise BoltError(u'Cannot find the Bashed Patch %s in the Data '
+                        u'folder' % patch_name)
+    if parsed_args.patch_config:
+        config_table = bolt.DataTable(bolt.PickleDict(
+            GPath(parsed_args.patch_config)))
+        patch_configs = config_table.getItem(GPath(
+            u'Saved Bashed Patch Configuration (Python)'),
+            u'bash.patch.configs', None)
+        if patch_configs is None:
+            raise BoltError(u'%s is not an exported Python Bashed Patch '
+                            u'configuration' % parsed_args.patch_config)
+    else:
+        patch_configs = bosh.modInfos.table.getItem(
+            patch_name, u'bash.patch.configs', {})
+    if configIsCBash(patch_configs):
+        patch_configs = {}
+    gui_patchers = [copy.deepcopy(p) for p in all_gui_patchers]
+    is_first_load = not patch_configs
+    for patcher in gui_patchers:
+        patcher.getConfig(patch_configs)
+        patcher.SetIsFirstLoad(is_first_load)
+    progress = bolt.Progress()
+    patch_file = PatchFile(bosh.modInfos[patch_name])
+    patch_file.init_patchers_data([p.get_patcher_instance(patch_file) for p
+        in gui_patchers if p.isEnabled], SubProgress(progress, 0, 0.1))
+    patch_file.initFactories(SubProgress(progress, 0.1, 0.2))
+    patch_file.scanLoadMods(SubProgress(progress, 0.2, 0.8))
+    log = bolt.LogFile(StringIO.StringIO())
+    patch_file.buildPatch(log, SubProgress(progress, 0.8, 0.9))
+    if patch_file.tes4.num_masters > 255:
+        raise BoltError(u'The resulting Bashed Patch contains too many '
+                        u'masters (>255)')
+    with patch_file.build_stats.measure(u'save'):
+        patch_file.safeSave()
+    log.out.close()
+    phase_totals = patch_file.build_stats.phase_totals()
+    return {u'phases': {phase: p_totals[u'wall_time'] for phase, p_totals
+                        in phase_totals.iteritems()},
+            u'records_written': phase_totals[u'buildPatch'][
+                u'records_written'],
+            u'peak_rss': patch_file.build_stats.peak_rss}
+
+def _timed(op_func, *op_args):
+    start = default_timer()
+    op_results = op_func(*op_args)
+    return OrderedDict([(u'seconds', default_timer() - start),
+                        (u'results', op_results)])
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=u'Runs Wrye Bash operations without a GUI and prints '
+                    u'their timings as JSON.')
+    parser.add_argument(u'-o', u'--oblivionPath', default=u'',
+                        help=u'the folder the game is installed in')
+    parser.add_argument(u'-p', u'--personalPath', default=u'',
+                        help=u'the user\'s personal directory')
+    parser.add_argument(u'-l', u'--localAppDataPath', default=u'',
+                        help=u'the user\'s local application data directory')
+    parser.add_argument(u'--load-order', metavar=u'FILE',
+                        help=u'set this load order before running the '
+                             u'operations (one plugin per line, active '
+                             u'ones prefixed with *)')
+    parser.add_argument(u'--patch', default=u'Bashed Patch, 0.esp',
+                        help=u'the Bashed Patch to build')
+    parser.add_argument(u'--patch-config', metavar=u'FILE',
+                        help=u'an exported Bashed Patch configuration to use '
+                             u'instead of the one stored for the patch')
+    parser.add_argument(u'-d', u'--debug', action=u'store_true',
+                        help=u'print debug output to stderr')
+    parser.add_argument(u'operations', nargs=u'*', metavar=u'OPERATION',
+                        help=u'the operations to run, in order (one of %s)'
+                             % u', '.join(_operations))
+    parsed_args = parser.parse_args()
+    # choices does not work with nargs='*' and no arguments on py2
+    for op_name in parsed_args.operations:
+        if op_name not in _operations:
+            parser.error(u'unknown operation: %s' % op_name)
+    # these are relative to the user's working directory, not to Mopy
+    for path_arg in (u'load_order', u'patch_config'):
+        if getattr(parsed_args, path_arg):
+            setattr(parsed_args, path_arg,
+                    os.path.abspath(getattr(parsed_args, path_arg)))
+    # relative paths (bash.ini, the Mopy dirs) are resolved against Mopy
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    bolt.deprintOn = parsed_args.debug
+    timings = OrderedDict()
+    try:
+        timings[u'init'] = _timed(_init, parsed_args)
+        timings[u'init_data'] = _timed(_init_data)
+        if parsed_args.load_order:
+            timings[u'load_order'] = _timed(_set_load_order,
+                                            parsed_args.load_order)
+        for op_name in parsed_args.operations:
+            timings[op_name] = _timed(_operations[op_name], parsed_args)
+    except BoltError as e:
+        parser.exit(1, u'%s: error: %s\n' % (parser.prog, e))
+    from . import bush
+    print(json.dumps(OrderedDict([(u'game', bush.game.fsName),
+                                  (u'timings', timings)]), indent=2))
+
+if __name__ == u'__main__':
+    main()
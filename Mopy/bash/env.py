@@ -29,8 +29,8 @@
 import re as _re
 import shutil as _shutil
 import stat
-from ctypes import byref, c_wchar_p, c_void_p, POINTER, Structure, windll, \
-    wintypes
+from ctypes import byref, c_size_t, c_wchar_p, c_void_p, POINTER, sizeof, \
+    Structure, windll, wintypes
 from uuid import UUID
 
 from .bolt import GPath, deprint, Path, decoder, struct_unpack
@@ -712,6 +712,20 @@ def _filterUnixPaths(path):
         for tmpDir in tempDirs:
             tmpDir.rmtree(safety=tmpDir.stail)
 
+def hardlink_file(src_path, dest_path):
+    """Creates a hard link at dest_path to the file at src_path. Returns False
+    if that is not possible, e.g. because the paths are on different volumes
+    or the filesystem does not support hard links."""
+    try:
+        if hasattr(_os, u'link'):
+            _os.link(src_path, dest_path)
+            return True
+        create_hard_link = windll.kernel32.CreateHardLinkW
+        create_hard_link.argtypes = [c_wchar_p, c_wchar_p, c_void_p]
+        return bool(create_hard_link(dest_path, src_path, None))
+    except (AttributeError, OSError):
+        return False
+
 isUAC = False      # True if the game is under UAC protection
 
 def setUAC(handle, uac=True):
@@ -920,3 +934,40 @@ def get_known_path(known_folder_id, user_handle=UserHandle.current):
     _CoTaskMemFree(pPath)
     return path
 # END MIT-LICENSED PART =======================================================
+
+# Memory usage ----------------------------------------------------------------
+# http://msdn.microsoft.com/en-us/library/windows/desktop/ms684877.aspx
+class _PROCESS_MEMORY_COUNTERS(Structure):
+    _fields_ = [
+        ("cb", wintypes.DWORD),
+        ("PageFaultCount", wintypes.DWORD),
+        ("PeakWorkingSetSize", c_size_t),
+        ("WorkingSetSize", c_size_t),
+        ("QuotaPeakPagedPoolUsage", c_size_t),
+        ("QuotaPagedPoolUsage", c_size_t),
+        ("QuotaPeakNonPagedPoolUsage", c_size_t),
+        ("QuotaNonPagedPoolUsage", c_size_t),
+        ("PagefileUsage", c_size_t),
+        ("PeakPagefileUsage", c_size_t),
+    ]
+
+def get_peak_memory_usage():
+    """Returns the peak amount of physical memory used by this process so far
+    in bytes - the peak working set on Windows, the maximum resident set size
+    elsewhere. Returns 0 if that can't be determined."""
+    try:
+        counters = _PROCESS_MEMORY_COUNTERS()
+        counters.cb = sizeof(counters)
+        get_current_process = windll.kernel32.GetCurrentProcess
+        get_current_process.restype = wintypes.HANDLE
+        if windll.psapi.GetProcessMemoryInfo(get_current_process(),
+                byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize
+    except (AttributeError, OSError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    # ru_maxrss is in kilobytes (on linux at least)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
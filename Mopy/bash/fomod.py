@@ -30,6 +30,8 @@
 Only entry point is FomodInstaller. Parsing of the xml tree is done via
 Python's std lib and only as-needed (so that instancing this class isn't
 too performance-heavy and the burden is divided between installer pages).
+The parsed tree and the file lists resolved from it are cached per installer
+CRC (see _CompiledFomod), so reopening a wizard does not parse it again.
 
 The only return values (other than exceptions) a user is expected to have
 out of the FomodInstaller methods are the three wrapper classes:
@@ -187,7 +189,7 @@ def __repr__(self):
             self.file_priority)
 
     @classmethod
-    def process_files(cls, files_elem, file_list, inst_root):
+    def process_files(cls, files_elem, file_index, inst_root):
         """Processes the elements in *files_elem* into a list of
         _FomodFileInfo.
 
@@ -201,7 +203,8 @@ def process_files(cls, files_elem, file_list, inst_root):
         hard time copying folders).
 
         :param files_elem: list of ElementTree elements 'file' and 'folder'
-        :param file_list: list of files in the mod being installed
+        :param file_index: _FileListIndex of the files in the mod being
+            installed
         :param inst_root: The root path to retrieve sources relative to."""
         fm_infos = []
         for file_object in files_elem.findall(u'*'):
@@ -223,21 +226,89 @@ def process_files(cls, files_elem, file_list, inst_root):
                 file_dest = GPath(file_dest)
             file_prty = int(file_object.get(u'priority', u'0'))
             source_lower = file_src.s.lower()
-            # We need to include the path separators when checking, since
-            # otherwise we may end up matching e.g. 'Foo - A/bar.esp' to the
-            # source 'Foo', when the source 'Foo - A' exists.
-            source_starts = (source_lower + u'/', source_lower + u'\\')
-            for fsrc in file_list:
-                fsrc_lower = fsrc.lower()
-                if fsrc_lower == source_lower: # it's a file
-                    fm_infos.append(cls(file_src, file_dest, file_prty))
-                elif fsrc_lower.startswith(source_starts): # it's a folder
-                    fdest = file_dest.s + fsrc[len(file_src):]
-                    if fdest.startswith((u'/', u'\\')):
-                        fdest = fdest[1:]
-                    fm_infos.append(cls(GPath(fsrc), GPath(fdest), file_prty))
+            if source_lower in file_index.index_files: # it's a file
+                fm_infos.append(cls(file_src, file_dest, file_prty))
+            # it's a folder
+            for fsrc in file_index.index_folders.get(source_lower, ()):
+                fdest = file_dest.s + fsrc[len(file_src):]
+                if fdest.startswith((u'/', u'\\')):
+                    fdest = fdest[1:]
+                fm_infos.append(cls(GPath(fsrc), GPath(fdest), file_prty))
         return fm_infos
 
+class _FileListIndex(object):
+    """Indexes the files of the mod being installed by their lowercase path
+    and by the lowercase paths of all folders containing them, so that
+    sources can be resolved without scanning the whole file list."""
+    __slots__ = (u'index_files', u'index_folders')
+
+    def __init__(self, file_list):
+        self.index_files = set()
+        self.index_folders = {}
+        for fsrc in file_list:
+            fsrc_lower = fsrc.lower()
+            self.index_files.add(fsrc_lower)
+            # Only split at path separators, since otherwise we may end up
+            # matching e.g. 'Foo - A/bar.esp' to the source 'Foo', when the
+            # source 'Foo - A' exists.
+            for i, c in enumerate(fsrc_lower):
+                if c in u'/\\':
+                    self.index_folders.setdefault(
+                        fsrc_lower[:i], []).append(fsrc)
+
+class _CompiledFomod(object):
+    """The parts of a ModuleConfig.xml that do not depend on the user's
+    selections or the state of the Data folder: the parsed tree, the ordered
+    pages and the files that 'files' elements resolve to. Cached per
+    installer by _get_compiled_fomod."""
+    __slots__ = (u'fomod_tree', u'fomod_name', u'ordered_pages',
+                 u'_file_index', u'_installer_root', u'_resolved_files')
+
+    def __init__(self, mc_path, file_list, inst_root):
+        self.fomod_tree = etree.parse(mc_path)
+        self.fomod_name = self.fomod_tree.findtext(u'moduleName', u'').strip()
+        install_steps = self.fomod_tree.find(u'installSteps')
+        if install_steps is None:
+            self.ordered_pages = []
+        else:
+            self.ordered_pages = FomodInstaller.order_list(
+                install_steps.findall(u'installStep'),
+                install_steps.get(u'order', u'Ascending'),
+                sort_key_func=lambda p: p.get(u'name'))
+        self._file_index = _FileListIndex(file_list)
+        self._installer_root = inst_root
+        self._resolved_files = {}
+
+    def resolve_files(self, files_elem):
+        """Return the list of _FomodFileInfo for the specified 'files'
+        element, resolving it on first use."""
+        try:
+            return self._resolved_files[files_elem]
+        except KeyError:
+            fm_infos = self._resolved_files[files_elem] = \
+                _FomodFileInfo.process_files(files_elem, self._file_index,
+                                             self._installer_root)
+            return fm_infos
+
+# Installer CRC and root path -> _CompiledFomod, most recently used last
+_compiled_fomods = OrderedDict()
+_max_compiled_fomods = 8
+
+def _get_compiled_fomod(mc_path, file_list, inst_root, installer_crc):
+    """Return the _CompiledFomod for the specified installer, compiling it if
+    it is not cached. Nothing is cached if installer_crc is None."""
+    if installer_crc is None:
+        return _CompiledFomod(mc_path, file_list, inst_root)
+    cache_key = (installer_crc, inst_root)
+    try:
+        compiled_fomod = _compiled_fomods.pop(cache_key)
+    except KeyError:
+        compiled_fomod = _CompiledFomod(mc_path, file_list, inst_root)
+        if len(_compiled_fomods) >= _max_compiled_fomods:
+            _compiled_fomods.popitem(last=False)
+    _compiled_fomods[cache_key] = compiled_fomod
+    return compiled_fomod
+
 class FomodInstaller(object):
     """Represents the installer itself. Keeps parsing on instancing to a
     minimum to reduce performance impact.
@@ -263,9 +334,11 @@ class FomodInstaller(object):
     provide any way to do so, leaving that at your discretion."""
     __slots__ = (u'fomod_tree', u'fomod_name', u'file_list', u'dst_dir',
                  u'game_version', u'_current_page', u'_previous_pages',
-                 u'_has_finished', u'installer_root')
+                 u'_has_finished', u'installer_root', u'_compiled',
+                 u'_file_states', u'_flag_dicts')
 
-    def __init__(self, mc_path, file_list, inst_root, dst_dir, game_version):
+    def __init__(self, mc_path, file_list, inst_root, dst_dir, game_version,
+                 installer_crc=None):
         """Creates a new FomodInstaller with the specified properties.
 
         :param mc_path: string path to 'ModuleConfig.xml'
@@ -274,9 +347,13 @@ def __init__(self, mc_path, file_list, inst_root, dst_dir, game_version):
         :param inst_root: The root path of the installer. All files are
             specified relative to this by the FOMOD config.
         :param dst_dir: the destination directory - <Game>/Data
-        :param game_version: version of the game launch exe"""
-        self.fomod_tree = etree.parse(mc_path)
-        self.fomod_name = self.fomod_tree.findtext(u'moduleName', u'').strip()
+        :param game_version: version of the game launch exe
+        :param installer_crc: the CRC of the installer, if given the parsed
+            ModuleConfig.xml is cached and reused for it"""
+        self._compiled = _get_compiled_fomod(mc_path, file_list, inst_root,
+                                             installer_crc)
+        self.fomod_tree = self._compiled.fomod_tree
+        self.fomod_name = self._compiled.fomod_name
         self.file_list = file_list
         self.installer_root = inst_root
         self.dst_dir = dst_dir
@@ -284,16 +361,18 @@ def __init__(self, mc_path, file_list, inst_root, dst_dir, game_version):
         self._current_page = None
         self._previous_pages = OrderedDict()
         self._has_finished = False
+        # The state of each file tested by a fileDependency - the Data folder
+        # does not change while the installer is running
+        self._file_states = {}
+        # The flags set by the selections on each previous page and all pages
+        # before it, one dict per page in self._previous_pages
+        self._flag_dicts = []
 
     def start_fomod(self):
         root_conditions = self.fomod_tree.find(u'moduleDependencies')
         if root_conditions is not None:
             self.test_conditions(root_conditions)
-        first_page = self.fomod_tree.find(u'installSteps/installStep')
-        if first_page is None:
-            return None
-        self._current_page = InstallerPage(self, first_page)
-        return self._current_page
+        return self._move_to_visible_page(self._compiled.ordered_pages)
 
     def move_to_next(self, user_selection):
         if self._has_finished or self._current_page is None:
@@ -301,11 +380,22 @@ def move_to_next(self, user_selection):
         sort_list = [option for grp in self._current_page for option in grp]
         sorted_selection = sorted(user_selection, key=sort_list.index)
         self._previous_pages[self._current_page] = sorted_selection
-        ordered_pages = self.order_list(
-            self.fomod_tree.findall(u'installSteps/installStep'),
-            self.fomod_tree.find(u'installSteps').get(u'order', u'Ascending'))
+        page_flags = dict(self._fomod_flags())
+        for option in sorted_selection:
+            fm_flags = option.option_object.find(u'conditionFlags')
+            if fm_flags is not None:
+                for fm_flag in fm_flags.findall(u'flag'):
+                    page_flags[fm_flag.get(u'name')] = fm_flag.text
+        self._flag_dicts.append(page_flags)
+        ordered_pages = self._compiled.ordered_pages
         current_index = ordered_pages.index(self._current_page.page_object)
-        for next_page in ordered_pages[current_index + 1:]:
+        return self._move_to_visible_page(ordered_pages[current_index + 1:])
+
+    def _move_to_visible_page(self, candidate_pages):
+        """Makes the first of candidate_pages whose visibility conditions are
+        met the current page and returns it. If there is no such page, the
+        installer has finished and None is returned."""
+        for next_page in candidate_pages:
             try:
                 page_conditions = next_page.find(u'visible')
                 if page_conditions is not None:
@@ -315,15 +405,15 @@ def move_to_next(self, user_selection):
             else:
                 self._current_page = InstallerPage(self, next_page)
                 return self._current_page
-        else:
-            self._has_finished = True
-            self._current_page = None
+        self._has_finished = True
+        self._current_page = None
         return None
 
     def move_to_prev(self):
         self._has_finished = False
         try:
             prev_page, prev_selected = self._previous_pages.popitem(last=True)
+            self._flag_dicts.pop()
             self._current_page = prev_page
             return prev_page, prev_selected
         except KeyError:
@@ -337,8 +427,7 @@ def get_fomod_files(self):
         required_files = []
         required_files_elem = self.fomod_tree.find(u'requiredInstallFiles')
         if required_files_elem is not None:
-            required_files = _FomodFileInfo.process_files(
-                required_files_elem, self.file_list, self.installer_root)
+            required_files = self._compiled.resolve_files(required_files_elem)
         user_files = []
         selected_options = [option.option_object
                             for options in self._previous_pages.values()
@@ -346,8 +435,7 @@ def get_fomod_files(self):
         for option in selected_options:
             option_files = option.find(u'files')
             if option_files is not None:
-                user_files.extend(_FomodFileInfo.process_files(
-                    option_files, self.file_list, self.installer_root))
+                user_files.extend(self._compiled.resolve_files(option_files))
         conditional_files = []
         for cond_pattern in self.fomod_tree.findall(
                 u'conditionalFileInstalls/patterns/pattern'):
@@ -358,8 +446,8 @@ def get_fomod_files(self):
             except FailedCondition:
                 pass
             else:
-                conditional_files.extend(_FomodFileInfo.process_files(
-                    cond_files, self.file_list, self.installer_root))
+                conditional_files.extend(
+                    self._compiled.resolve_files(cond_files))
         file_dict = {}  # dst -> src
         priority_dict = {}  # dst -> priority
         for fm_info in required_files + user_files + conditional_files:
@@ -375,33 +463,33 @@ def get_fomod_files(self):
 
     def _fomod_flags(self):
         """Returns a mapping of 'flag name' -> 'flag value'.
-        Useful for either debugging or testing flag dependencies."""
-        fm_flag_dict = {}
-        fm_flags_list = [option.option_object.find(u'conditionFlags')
-                         for options in self._previous_pages.values()
-                         for option in options]
-        for fm_flags in fm_flags_list:
-            if fm_flags is None:
-                continue
-            for fm_flag in fm_flags.findall(u'flag'):
-                fm_flag_name = fm_flag.get(u'name')
-                fm_flag_value = fm_flag.text
-                fm_flag_dict[fm_flag_name] = fm_flag_value
-        return fm_flag_dict
+        Useful for either debugging or testing flag dependencies. Do not
+        modify the returned dict."""
+        return self._flag_dicts[-1] if self._flag_dicts else {}
+
+    def _get_file_state(self, test_file):
+        """Returns the state of the specified file (missing, active or
+        inactive), memoizing it."""
+        try:
+            return self._file_states[test_file]
+        except KeyError:
+            # Check if it's missing, ghosted or (in)active
+            if not self.dst_dir.join(test_file).exists():
+                actual_type = u'Missing'
+            ##: Needed? Shouldn't this be handled by cached_is_active?
+            elif (test_file.cext in bush.game.espm_extensions and
+                  self.dst_dir.join(test_file + u'.ghost').exists()):
+                actual_type = u'Inactive'
+            else:
+                actual_type = (u'Active' if cached_is_active(test_file)
+                               else u'Inactive')
+            self._file_states[test_file] = actual_type
+            return actual_type
 
     def _test_file_condition(self, condition):
         test_file = GPath(condition.get(u'file'))
         test_type = condition.get(u'state')
-        # Check if it's missing, ghosted or (in)active
-        if not self.dst_dir.join(test_file).exists():
-            actual_type = u'Missing'
-        ##: Needed? Shouldn't this be handled by cached_is_active?
-        elif (test_file.cext in bush.game.espm_extensions and
-              self.dst_dir.join(test_file + u'.ghost').exists()):
-            actual_type = u'Inactive'
-        else:
-            actual_type = (u'Active' if cached_is_active(test_file)
-                           else u'Inactive')
+        actual_type = self._get_file_state(test_file)
         if actual_type != test_type:
             raise FailedCondition(
                 u'File {} should be {} but is {} instead.'.format(
@@ -448,11 +536,12 @@ def test_conditions(self, conditions):
 
     @staticmethod
     def order_list(unordered_list, order_str, _valid_values=frozenset(
-        (u'Explicit', u'Ascending', u'Descending'))):
+        (u'Explicit', u'Ascending', u'Descending')),
+                   sort_key_func=lambda x: x.sort_key):
         if order_str == u'Explicit':
             return unordered_list
         if order_str not in _valid_values:
             raise ValueError(u'Arguments are incorrect: {}, {}'.format(
                 unordered_list, order_str))
-        return sorted(unordered_list, key=lambda x: x.sort_key,
+        return sorted(unordered_list, key=sort_key_func,
                       reverse=order_str == u'Descending')
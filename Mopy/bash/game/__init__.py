@@ -607,13 +607,39 @@ class Esp(object):
     # exists in the Data directory of the game in a purely vanilla
     # installation. Set in a separate file because this can be *very* large,
     # and would make editing the constants a miserable experience if included
-    # (see e.g. skyrim/vanilla_files.py).
-    vanilla_files = set()
+    # (see e.g. skyrim/vanilla_files.py). Only imported on first use of the
+    # vanilla_files property, see _dynamic_import_modules.
+    _vanilla_files_package = None
+    _vanilla_files = None
+    _lower_vanilla_files = None
 
     @property
     def plugin_header_class(self):
         return brec.MreRecord.type_class[self.Esp.plugin_header_sig]
 
+    @property
+    def vanilla_files(self):
+        """Return the set of every file in the Data directory of a vanilla
+        installation, importing game/*/vanilla_files.py the first time."""
+        if self._vanilla_files is None:
+            if self._vanilla_files_package is None:
+                self._vanilla_files = set()
+            else:
+                self._vanilla_files = importlib.import_module(
+                    u'.vanilla_files',
+                    package=self._vanilla_files_package).vanilla_files
+        return self._vanilla_files
+
+    @property
+    def lower_vanilla_files(self):
+        """Return vanilla_files lowercased, as a frozenset that is only
+        built once - check lowercase paths against it, instead of wrapping
+        every vanilla file in a CIstr."""
+        if self._lower_vanilla_files is None:
+            self._lower_vanilla_files = frozenset(
+                f.lower() for f in self.vanilla_files)
+        return self._lower_vanilla_files
+
     # Set in game/*/patcher.py used in Mopy/bash/basher/gui_patchers.py
     gameSpecificPatchers = {}
     gameSpecificListPatchers = {}
@@ -661,8 +687,8 @@ def _dynamic_import_modules(cls, package_name):
         """Dynamically import package modules to avoid importing them for every
         game. We need to pass the package name in for importlib to work.
         Currently populates the GameInfo namespace with the members defined in
-        the relevant constants.py and imports default_tweaks.py and
-        vanilla_files.py."""
+        the relevant constants.py and imports default_tweaks.py. The (large)
+        vanilla_files.py is only imported on first use of vanilla_files."""
         constants = importlib.import_module(u'.constants',
             package=package_name)
         for k in dir(constants):
@@ -674,9 +700,7 @@ def _dynamic_import_modules(cls, package_name):
         tweaks_module = importlib.import_module(u'.default_tweaks',
             package=package_name)
         cls.default_tweaks = tweaks_module.default_tweaks
-        vf_module = importlib.import_module(u'.vanilla_files',
-            package=package_name)
-        cls.vanilla_files = vf_module.vanilla_files
+        cls._vanilla_files_package = package_name
         patchers_module = importlib.import_module(u'.patcher',
             package=package_name)
         cls.gameSpecificPatchers = patchers_module.gameSpecificPatchers
@@ -26,9 +26,11 @@
 # Set MelModel in brec, in this case it's identical to the fallout 3 one
 from ..fallout3.records import MelOwnership, MelDestructible, MelEffects, \
     MelConditions, MelEmbeddedScript, MelItems, MelEquipmentType, MelBipedData
-from ..fallout3.records import _MelModel # HACK - needed for tests
+# Use the Fallout 3 one directly, brec.MelModel may belong to another game if
+# fallout3.records was imported before (e.g. when switching games in tests).
+# HACK - _MelModel itself is needed for tests
+from ..fallout3.records import _MelModel, _MelModel as MelModel
 from ...bolt import Flags
-from ...brec import MelModel # set in Mopy/bash/game/fallout3/records.py
 from ...brec import MelRecord, MelGroups, MelStruct, FID, MelGroup, \
     MelString, MelSet, MelFid, MelOptStruct, MelFids, MelBase, \
     MelFidList, MreGmstBase, MreHeaderBase, MelUnicode, MelColorInterpolator, \
@@ -21,8 +21,6 @@
 #
 # =============================================================================
 from .special import _ExSpecial ##: ugh
-from ....brec import MreRecord
-from ....mod_files import ModFile, LoadFactory
 from ....patcher.patchers.base import ImportPatcher
 
 __all__ = [u'ImportRoadsPatcher']
@@ -41,16 +39,17 @@ def __init__(self, p_name, p_file, p_sources):
         super(ImportRoadsPatcher, self).__init__(p_name, p_file, p_sources)
         self.world_road = {}
 
+    def get_init_data_sigs(self):
+        return self._read_write_records if self.isActive else ()
+
     def initData(self,progress):
         """Get cells from source files."""
         if not self.isActive: return
-        loadFactory = LoadFactory(False, *[MreRecord.type_class[x] for x in
-                                           self._read_write_records])
+        load_plugin = self.patchFile.plugin_cache.load_plugin
         for srcMod in self.srcs:
             if srcMod not in self.patchFile.p_file_minfos: continue
             srcInfo = self.patchFile.p_file_minfos[srcMod]
-            srcFile = ModFile(srcInfo,loadFactory)
-            srcFile.load(True)
+            srcFile = load_plugin(srcInfo, self._read_write_records)
             for worldBlock in srcFile.WRLD.worldBlocks:
                 if worldBlock.road:
                     worldId = worldBlock.world.fid
@@ -186,6 +186,25 @@ def OnDropIndexes(self, indexes, newPos):
         if self.fnDropIndexes:
             _wx.CallLater(10,self.fnDropIndexes,indexes,newPos)
 
+class _VirtualDragListCtrl(_DragListCtrl):
+    """_DragListCtrl in virtual mode - the native control only stores the
+    number of rows and asks us for the contents of each row it paints. The
+    row_provider(row_index) callback must return a tuple of the column labels,
+    the image index and the wx.ItemAttr for that row."""
+
+    def __init__(self, *args, **kwargs):
+        _DragListCtrl.__init__(self, *args, **kwargs)
+        self.row_provider = None
+
+    def OnGetItemText(self, row_index, col_index):
+        return self.row_provider(row_index)[0][col_index]
+
+    def OnGetItemImage(self, row_index):
+        return self.row_provider(row_index)[1]
+
+    def OnGetItemAttr(self, row_index):
+        return self.row_provider(row_index)[2]
+
 class UIListCtrl(WithMouseEvents, WithCharEvents):
     """Backing list control for UILists. Wraps a wx list control, which needs
     a peculiar system with internal ids to support sorting PY3: something simpler?
@@ -198,10 +217,11 @@ class UIListCtrl(WithMouseEvents, WithCharEvents):
     bind_motion = True
     bind_mouse_leaving = bind_lclick_double = bind_lclick_down = True
     _wx_widget_type = _DragListCtrl
+    _extra_style = 0
 
     def __init__(self, parent, allow_edit, is_border_sunken, is_single_cell,
             *args, **kwargs):
-        kwargs['style'] = _wx.LC_REPORT | (allow_edit and _wx.LC_EDIT_LABELS
+        kwargs['style'] = self._extra_style | _wx.LC_REPORT | (allow_edit and _wx.LC_EDIT_LABELS
             ) | (is_border_sunken and _wx.BORDER_SUNKEN) | (
                 is_single_cell and _wx.LC_SINGLE_SEL)
         super(UIListCtrl, self).__init__(parent, *args, **kwargs)
@@ -310,3 +330,59 @@ def lc_delete_column(self, colDex):
     def lc_select_item_at_index(self, index, select=True,
                           __select=_wx.LIST_STATE_SELECTED):
         self._native_widget.SetItemState(index, select * __select, __select)
+
+class VirtualUIListCtrl(UIListCtrl):
+    """UIListCtrl in virtual (owner data) mode, for lists with many items.
+    The native control holds no items - we keep the displayed order of the
+    item keys in a list and the owner provides the contents of each row via
+    set_row_provider(). Rows are only computed when they are painted, and
+    reordering the list just replaces the list of keys."""
+    _wx_widget_type = _VirtualDragListCtrl
+    _extra_style = _wx.LC_VIRTUAL
+
+    def __init__(self, *args, **kwargs):
+        super(VirtualUIListCtrl, self).__init__(*args, **kwargs)
+        self._displayed = [] # :type: list[bolt.Path | basestring | int]
+        self._item_index = {} # :type: dict[bolt.Path | basestring | int, int]
+
+    def set_row_provider(self, row_provider):
+        """Set the callback that computes the contents of a row. It is passed
+        the item key and must return a tuple of the column labels, the image
+        index (-1 for none) and a wx.ItemAttr."""
+        self._native_widget.row_provider = lambda row_index: row_provider(
+            self._displayed[row_index])
+
+    def _set_displayed(self, displayed):
+        self._displayed = displayed
+        self._item_index = {y: x for x, y in enumerate(displayed)}
+        self._native_widget.SetItemCount(len(displayed))
+        self._native_widget.Refresh()
+
+    def InsertListCtrlItem(self, index, value, item):
+        """Insert an item to the list control - value is ignored, the label
+        will be requested from the row provider."""
+        self._set_displayed(self._displayed[:index] + [item] +
+                            self._displayed[index:])
+        return index
+
+    def RemoveItemAt(self, index):
+        self._set_displayed(self._displayed[:index] +
+                            self._displayed[index + 1:])
+
+    def DeleteAll(self):
+        self._set_displayed([])
+
+    def FindIndexOf(self, item):
+        return self._item_index[item]
+
+    def FindItemAt(self, index):
+        return self._displayed[index]
+
+    def ReorderDisplayed(self, inorder):
+        """Display exactly the items in inorder, in that order. Unlike
+        UIListCtrl.ReorderDisplayed, this also adds and removes items."""
+        self._set_displayed(list(inorder))
+
+    def refresh_item_at(self, index):
+        """Repaint the row at the specified index."""
+        self._native_widget.RefreshItem(index)
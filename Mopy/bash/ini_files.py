@@ -326,7 +326,8 @@ def _add_remaining_new_items():
                             value = sectionSettings[setting]
                             line = u'%s=%s' % (setting, value)
                             del sectionSettings[setting]
-                        elif section in deleted_settings and setting in deleted_settings[section]:
+                        elif section in deleted_settings and CIstr(
+                                setting) in deleted_settings[section]:
                             line = u';-' + line
                 tmpFileWrite(line + u'\n')
             # This will occur for the last INI section in the ini file
@@ -343,6 +344,51 @@ def _add_remaining_new_items():
     def applyTweakFile(self, tweak_lines):
         """Read ini tweak file and apply its settings to self (the target ini).
         """
+        self.applyTweakFiles([tweak_lines])
+        return True
+
+    def applyTweakFiles(self, tweaks_lines):
+        """Apply the settings of several ini tweak files to self, in the
+        specified order, reading and writing self only once. Settings set or
+        deleted by a tweak override the ones of the previous tweaks. Return a
+        list holding, for each tweak, the set of (section, setting) tuples it
+        set or deleted that a later tweak overrode with a different value or
+        deleted/undeleted."""
+        ini_settings = DefaultLowerDict(LowerDict)
+        deleted_settings = DefaultLowerDict(LowerDict)
+        # section -> setting -> index of the last tweak that changed it
+        changed_by = DefaultLowerDict(LowerDict)
+        conflicts = [set() for _x in tweaks_lines]
+        def _changed(section, setting, overridden):
+            previous = changed_by[section].get(setting)
+            if previous is not None and previous != tweak_index and \
+                    overridden:
+                conflicts[previous].add((section, setting))
+            changed_by[section][setting] = tweak_index
+        for tweak_index, tweak_lines in enumerate(tweaks_lines):
+            tweak_settings, tweak_deleted = self._parse_tweak_lines(
+                tweak_lines)
+            # Setting a setting wins over deleting it in the same tweak
+            for section, section_deleted in tweak_deleted.iteritems():
+                section_settings = ini_settings.get(section, {})
+                for setting in section_deleted:
+                    _changed(section, setting, setting in section_settings)
+                    section_settings.pop(setting, None)
+                    deleted_settings[section][setting] = True
+            for section, section_settings in tweak_settings.iteritems():
+                section_deleted = deleted_settings.get(section, {})
+                merged_settings = ini_settings[section]
+                for setting, value in section_settings.iteritems():
+                    _changed(section, setting, setting in section_deleted or
+                        merged_settings.get(setting, value) != value)
+                    section_deleted.pop(setting, None)
+                    merged_settings[setting] = value
+        self.saveSettings(ini_settings, deleted_settings)
+        return conflicts
+
+    def _parse_tweak_lines(self, tweak_lines):
+        """Return the settings and deleted settings of the specified ini
+        tweak lines, in the format saveSettings expects."""
         reDeleted = self.reDeletedSetting
         reComment = self.reComment
         reSection = self.reSection
@@ -363,8 +409,7 @@ def applyTweakFile(self, tweak_lines):
                     2).strip()
             elif maDeleted:
                 deleted_settings[section].add(CIstr(maDeleted.group(1)))
-        self.saveSettings(ini_settings,deleted_settings)
-        return True
+        return ini_settings, deleted_settings
 
     def remove_section(self, target_section): # type: (unicode) -> None
         """Removes a section and all its contents from the INI file. Note that
@@ -436,6 +481,7 @@ def _get_ci_settings(cls, tweakPath):
         """Do not call this on DefaultTweaks - settings are set in __init__"""
         raise AbstractError
     def applyTweakFile(self, tweak_lines): raise AbstractError
+    def applyTweakFiles(self, tweaks_lines): raise AbstractError
     def saveSettings(self,ini_settings,deleted_settings={}):
         raise AbstractError
 
@@ -581,7 +627,7 @@ def saveSettings(self,ini_settings,deleted_settings={}):
                     tmpFile.write(section[setting])
         self.abs_path.untemp()
 
-    def applyTweakFile(self, tweak_lines):
+    def _parse_tweak_lines(self, tweak_lines):
         reDeleted = self.reDeleted
         reComment = self.reComment
         ini_settings = DefaultLowerDict(LowerDict)
@@ -603,8 +649,7 @@ def applyTweakFile(self, tweak_lines):
                 # Save the setting for applying
                 if line[-1] != u'\n': line += u'\n'
                 settings_[section_key][setting] = line
-        self.saveSettings(ini_settings,deleted_settings)
-        return True
+        return ini_settings, deleted_settings
 
     def remove_section(self, target_section, do_backup=False):
         # type: (unicode, bool) -> None
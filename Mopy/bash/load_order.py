@@ -45,6 +45,8 @@
 import math
 import collections
 import time
+from array import array
+from bisect import bisect_left
 # Internal
 from . import bass
 from . import bolt
@@ -59,7 +61,8 @@
 locked = False
 warn_locked = False
 _lords_pickle = None # type: bolt.PickleDict
-_LORDS_PICKLE_VERSION = 2
+# 3: saved load orders are stored as a delta-encoded history
+_LORDS_PICKLE_VERSION = 3
 # active mod lists were saved in BashSettings.dat - sentinel needed for moving
 # them to BashloadOrder.dat
 __active_mods_sentinel = {}
@@ -162,17 +165,139 @@ def _new_entry():
     _saved_load_orders[_current_list_index:_current_list_index] = [
         lo_entry(time.time(), cached_lord)]
 
+# Saved load orders are pickled as a history of deltas over a table of the
+# plugin names they contain, with a full snapshot (checkpoint) every
+# _checkpoint_every entries - see _encode_history
+_checkpoint_every = 32
+# (id(previous lord), id(lord)) -> (previous lord, lord, delta) for the deltas
+# of the pickled history, so persisting only computes the ones for new entries
+_history_deltas = {}
+
+def _lo_delta(prev_lord, lord):
+    """Return the delta that turns prev_lord into lord: a tuple of the mods
+    to remove from the load order, the (position, mod) tuples of the mods to
+    insert after that (in ascending position order) and the mods to activate
+    and deactivate. Mods that keep their relative order (a longest increasing
+    subsequence of their old positions) are left alone, so a plugin that was
+    moved is removed and reinserted, but nothing else is touched."""
+    common = [] # (position in lord, position in prev_lord)
+    for lo_pos, mod in enumerate(lord.loadOrder):
+        try:
+            common.append((lo_pos, prev_lord.lindex(mod)))
+        except KeyError: pass # new mod
+    parents = [None] * len(common)
+    tails, tail_indices = [], []
+    for k, (lo_pos, prev_pos) in enumerate(common):
+        pos = bisect_left(tails, prev_pos)
+        if pos: parents[k] = tail_indices[pos - 1]
+        if pos == len(tails):
+            tails.append(prev_pos)
+            tail_indices.append(k)
+        else:
+            tails[pos] = prev_pos
+            tail_indices[pos] = k
+    kept = set()
+    k = tail_indices[-1] if tail_indices else None
+    while k is not None:
+        kept.add(common[k][0])
+        k = parents[k]
+    kept_mods = {lord.loadOrder[p] for p in kept}
+    return (tuple(m for m in prev_lord.loadOrder if m not in kept_mods),
+            tuple((p, m) for p, m in enumerate(lord.loadOrder)
+                  if p not in kept),
+            tuple(lord.active - prev_lord.active),
+            tuple(prev_lord.active - lord.active))
+
+def _apply_lo_delta(prev_lord, lo_delta):
+    """Return the LoadOrder that the specified delta (see _lo_delta) turns
+    prev_lord into."""
+    removed, inserted, activated, deactivated = lo_delta
+    removed = set(removed)
+    lo = [m for m in prev_lord.loadOrder if m not in removed]
+    for lo_pos, mod in inserted:
+        lo.insert(lo_pos, mod)
+    return LoadOrder(lo, (prev_lord.active - set(deactivated)) | set(
+        activated))
+
+def _encode_history(entries):
+    """Encode the specified lo_entry list for pickling. Returns a list of
+    the plugin names it contains and a list of encoded entries, each of which
+    is either a checkpoint - a (date, name indices in load order, load order
+    positions of active mods) tuple, with both packed into an array string -
+    or a (date, removed, inserted, activated, deactivated) delta against the
+    previous entry, with mods replaced by their name index."""
+    names, name_index = [], {}
+    def _index(mod):
+        try:
+            return name_index[mod]
+        except KeyError:
+            name_index[mod] = len(names)
+            names.append(mod)
+            return name_index[mod]
+    encoded, used_deltas = [], {}
+    prev_lord = None
+    for entry_index, (date, lord) in enumerate(entries):
+        if entry_index % _checkpoint_every == 0:
+            encoded.append((date,
+                array('I', [_index(m) for m in lord.loadOrder]).tostring(),
+                array('I', [lord.lindex(m) for m in
+                            lord.activeOrdered]).tostring()))
+        else:
+            delta_key = (id(prev_lord), id(lord))
+            cached = _history_deltas.get(delta_key)
+            if cached and cached[0] is prev_lord and cached[1] is lord:
+                lo_delta = cached[2]
+            else:
+                lo_delta = _lo_delta(prev_lord, lord)
+            used_deltas[delta_key] = (prev_lord, lord, lo_delta)
+            removed, inserted, activated, deactivated = lo_delta
+            encoded.append((date, [_index(m) for m in removed],
+                            [(p, _index(m)) for p, m in inserted],
+                            [_index(m) for m in activated],
+                            [_index(m) for m in deactivated]))
+        prev_lord = lord
+    _history_deltas.clear()
+    _history_deltas.update(used_deltas)
+    return names, encoded
+
+def _decode_history(names, encoded):
+    """Decode the output of _encode_history back into a lo_entry list."""
+    entries = []
+    _history_deltas.clear()
+    prev_lord = None
+    for encoded_entry in encoded:
+        if len(encoded_entry) == 3:
+            date, lo_indices, active_positions = encoded_entry
+            lo = [names[i] for i in array('I', lo_indices)]
+            lord = LoadOrder(lo, [lo[p] for p in array('I',
+                                                        active_positions)])
+        else:
+            date, removed, inserted, activated, deactivated = encoded_entry
+            lo_delta = (tuple(names[i] for i in removed),
+                        tuple((p, names[i]) for p, i in inserted),
+                        tuple(names[i] for i in activated),
+                        tuple(names[i] for i in deactivated))
+            lord = _apply_lo_delta(prev_lord, lo_delta)
+            _history_deltas[(id(prev_lord), id(lord))] = (prev_lord, lord,
+                                                         lo_delta)
+        entries.append(lo_entry(date, lord))
+        prev_lord = lord
+    return entries
+
 def persist_orders(__keep_max=256):
     _lords_pickle.vdata['_lords_pickle_version'] = _LORDS_PICKLE_VERSION
     length = len(_saved_load_orders)
     if length > __keep_max:
         x, y = _keep_max(__keep_max, length)
-        _lords_pickle.data['_saved_load_orders'] = \
-            _saved_load_orders[_current_list_index - x:_current_list_index + y]
+        kept_orders = _saved_load_orders[
+                      _current_list_index - x:_current_list_index + y]
         _lords_pickle.data['_current_list_index'] = x
     else:
-        _lords_pickle.data['_saved_load_orders'] = _saved_load_orders
+        kept_orders = _saved_load_orders
         _lords_pickle.data['_current_list_index'] = _current_list_index
+    _lords_pickle.data['_lo_names'], _lords_pickle.data['_lo_history'] = \
+        _encode_history(kept_orders)
+    _lords_pickle.data.pop('_saved_load_orders', None) # version 2 format
     _lords_pickle.data['_active_mods_lists'] = _active_mods_lists
     ##: save them also in BashSettings.dat in case someone downgrades - drop !
     bass.settings['bash.loadLists.data'] = _active_mods_lists
@@ -326,7 +451,11 @@ def __load_pickled_load_orders():
         active_mods_list = __active_mods_sentinel
     else:
         active_mods_list = {}
-    _saved_load_orders = _lords_pickle.data.get('_saved_load_orders', [])
+    if '_lo_history' in _lords_pickle.data:
+        _saved_load_orders = _decode_history(_lords_pickle.data['_lo_names'],
+                                             _lords_pickle.data['_lo_history'])
+    else:
+        _saved_load_orders = _lords_pickle.data.get('_saved_load_orders', [])
     _current_list_index = _lords_pickle.data.get('_current_list_index', -1)
     _active_mods_lists = _lords_pickle.data.get('_active_mods_lists',
                                                 active_mods_list)
@@ -25,7 +25,8 @@
 
 import re
 import struct
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
+from contextlib import contextmanager
 
 from . import bolt, bush, env, load_order
 from .bolt import deprint, GPath, SubProgress
@@ -58,6 +59,13 @@ def __init__(self,inMasters,outMasters):
             else:
                 map[index] = -1
         self.map = map
+        # The mapped master index of each possible master index, already
+        # shifted into place, or None if it can't be mapped. Used to map many
+        # fids at once, see map_fids
+        self._shifted_map = [None] * 256
+        for in_index, out_index in map.iteritems():
+            if out_index >= 0 and in_index < 256:
+                self._shifted_map[in_index] = out_index << 24
 
     def __call__(self,fid,default=-1):
         """Maps a fid from first set of masters to second. If no mapping
@@ -72,6 +80,94 @@ def __call__(self,fid,default=-1):
         else:
             raise MasterMapError(inIndex)
 
+    def map_fids(self, fids, default=-1):
+        """Maps a sequence of fids from the first set of masters to the second
+        and returns them as a list. Behaves like calling this map on each fid,
+        but is much faster when all of them can be mapped."""
+        shifted_map = self._shifted_map
+        try:
+            return [fid and (shifted_map[fid >> 24] | (fid & 0xFFFFFF))
+                    for fid in fids]
+        except TypeError: # at least one fid can't be mapped
+            return [self(fid, default) for fid in fids]
+
+class FormIdTable(object):
+    """Table of the long FormIDs of the plugins loaded during a Bashed Patch
+    build - each build owns one, see PatchFile. Assigns each plugin an index
+    when it is first seen, so that every long FormID can be packed into a
+    single int - the plugin index shifted left by 24 bits, or'd with the
+    object index.
+
+    While the table is active (see interning), getLongMapper produces the
+    usual (plugin, object index) tuples through it, so each tuple is only
+    created once and then shared by every record that refers to it. That
+    saves memory when many plugins are loaded and makes comparing equal
+    FormIDs an identity check. Patchers key their internal data by packed
+    FormIDs (see key), which hash and compare much faster than tuples, and
+    unpack them only when they need the tuple again, e.g. to log or look up
+    a record.
+
+    Mappers keep the table they were created with alive, so the tuples and
+    packed FormIDs they produce stay valid for as long as anything uses
+    them. There is no way to clear a table - drop it instead."""
+    def __init__(self):
+        self._plugins = []
+        self._plugin_indices = {}
+        self._long_fids = {}
+        # Maps the id of each shared tuple to its packed FormID, see key
+        self._packed_by_id = {}
+
+    def plugin_index(self, plugin):
+        """Returns the index of the specified plugin in this table."""
+        try:
+            return self._plugin_indices[plugin]
+        except KeyError:
+            self._plugins.append(plugin)
+            return self._plugin_indices.setdefault(plugin,
+                                                   len(self._plugins) - 1)
+
+    def pack(self, long_fid):
+        """Packs the specified long FormID tuple into an int."""
+        return (self.plugin_index(long_fid[0]) << 24) | long_fid[1]
+
+    def key(self, long_fid):
+        """Returns the packed FormID of the specified long FormID tuple, like
+        pack. Only needs an id lookup for the tuples shared through this
+        table, so use it to key dicts and sets by FormID in hot loops."""
+        packed_fid = self._packed_by_id.get(id(long_fid))
+        return self.pack(long_fid) if packed_fid is None else packed_fid
+
+    def unpack(self, packed_fid):
+        """Returns the shared long FormID tuple for the specified packed
+        FormID."""
+        try:
+            return self._long_fids[packed_fid]
+        except KeyError:
+            long_fid = self._long_fids[packed_fid] = (
+                self._plugins[packed_fid >> 24], packed_fid & 0xFFFFFF)
+            # The tuple is kept alive by _long_fids, so its id stays unique
+            self._packed_by_id[id(long_fid)] = packed_fid
+            return long_fid
+
+    def intern(self, long_fid):
+        """Returns the shared tuple that is equal to the specified long
+        FormID tuple."""
+        return self.unpack(self.pack(long_fid))
+
+    @contextmanager
+    def interning(self):
+        """Makes getLongMapper share the long FormIDs it produces through
+        this table while in this context."""
+        global _active_form_ids
+        prev_form_ids, _active_form_ids = _active_form_ids, self
+        try:
+            yield self
+        finally:
+            _active_form_ids = prev_form_ids
+
+# The FormIdTable getLongMapper currently shares long FormIDs through, if any
+_active_form_ids = None
+
 class LoadFactory(object):
     """Factory for mod representation objects."""
     def __init__(self,keepAll,*recClasses):
@@ -163,6 +259,10 @@ def __init__(self, fileInfo,loadFactory=None):
         self.tops = {} #--Top groups.
         self.topsSkipped = set() #--Types skipped
         self.longFids = False
+        # The masters and size/mtime the plugin had when it was loaded, needed
+        # to write top groups that were not unpacked (see _prepare_raw_tops)
+        self._loaded_masters = []
+        self._loaded_stamp = None
 
     def __getattr__(self, topType, __rh=RecordHeader):
         """Returns top block of specified topType, creating it, if necessary."""
@@ -191,12 +291,14 @@ def load(self, do_unpack=False, progress=None, loadStrings=True,
         from . import bosh
         progress = progress or bolt.Progress()
         progress.setFull(1.0)
+        self._loaded_stamp = self.fileInfo.getPath().size_mtime()
         with ModReader(self.fileInfo.name,self.fileInfo.getPath().open(
                 u'rb')) as ins:
             insRecHeader = ins.unpackRecHeader
             # Main header of the mod file - generally has 'TES4' signature
             header = insRecHeader()
             self.tes4 = bush.game.plugin_header_class(header,ins,True)
+            self._loaded_masters = self.tes4.masters[:]
             # Check if we need to handle strings
             self.strings.clear()
             if do_unpack and loadStrings and self.tes4.flags1.hasStrings:
@@ -291,9 +393,10 @@ def save(self,outPath=None):
         """Save data to file.
         outPath -- Path of the output file to write to. Defaults to original file path."""
         if not self.loadFactory.keepAll: raise StateError(u"Insufficient data to write file.")
+        outPath = outPath or self.fileInfo.getPath()
+        self._prepare_raw_tops(outPath)
         # Convert back to short FormIDs at the IO boundary
         self._convert_fids(to_long=False)
-        outPath = outPath or self.fileInfo.getPath()
         # Too many masters is fatal and results in cryptic struct errors, so
         # loudly complain about it here
         if self.tes4.num_masters > 255:
@@ -311,15 +414,61 @@ def save(self,outPath=None):
                 if rsig in selfTops:
                     selfTops[rsig].dump(out)
 
-    def getLongMapper(self):
-        """Returns a mapping function to map short fids to long fids."""
-        masters_list = self.tes4.masters+[self.fileInfo.name]
+    def _prepare_raw_tops(self, out_path):
+        """Makes sure that the top groups which were loaded without unpacking
+        them can be written to out_path. Their FormIDs are still in the short
+        format of the masters the plugin had when it was loaded, so if the
+        masters changed since then, they have to be unpacked after all.
+        Otherwise they are block copied from the plugin on dump - unless that
+        is the file we are about to overwrite. Localized plugins can't have
+        their masters changed that way, since we can't write the strings of
+        unpacked records back to their STRINGS files."""
+        raw_tops = [b for b in self.tops.itervalues() if not b.changed]
+        if not raw_tops: return
+        src_path = self.fileInfo.getPath()
+        if src_path.size_mtime() != self._loaded_stamp:
+            raise StateError(u'%s changed on disk since it was loaded.' %
+                             self.fileInfo.name)
+        if self.tes4.masters != self._loaded_masters:
+            if self.tes4.flags1.hasStrings:
+                raise StateError(u'%s: Cannot change the masters, since the '
+                    u'plugin is localized and the %s group was not loaded.'
+                    % (self.fileInfo.name, raw_tops[0].label))
+            long_mapper = self.getLongMapper(self._loaded_masters)
+            for raw_top in raw_tops:
+                if type(raw_top) is MobBase:
+                    raise StateError(u'%s: Cannot change the masters, since '
+                        u'the %s group was not loaded.' % (
+                            self.fileInfo.name, raw_top.label))
+                raw_top.load_rec_group(do_unpack=True)
+                raw_top.convertFids(long_mapper, True)
+        elif out_path == src_path:
+            for raw_top in raw_tops:
+                raw_top.read_raw_data()
+
+    def getLongMapper(self, masters=None):
+        """Returns a mapping function to map short fids to long fids. Uses the
+        current masters, unless others are specified."""
+        if masters is None: masters = self.tes4.masters
+        masters_list = masters + [self.fileInfo.name]
         maxMaster = len(masters_list)-1
+        fid_table = _active_form_ids
+        if fid_table is None:
+            def mapper(fid):
+                if fid is None: return None
+                if isinstance(fid, tuple): return fid
+                mod,object = int(fid >> 24),int(fid & 0xFFFFFF)
+                return masters_list[min(mod, maxMaster)], object # clamp HITMEs
+            return mapper
+        # Map master indices to table plugin indices, shifted into place
+        shifted_indices = [fid_table.plugin_index(m) << 24
+                           for m in masters_list]
+        unpack_fid = fid_table.unpack
         def mapper(fid):
             if fid is None: return None
             if isinstance(fid, tuple): return fid
-            mod,object = int(fid >> 24),int(fid & 0xFFFFFF)
-            return masters_list[min(mod, maxMaster)], object # clamp HITMEs
+            return unpack_fid(shifted_indices[min(int(fid >> 24), maxMaster)]
+                              | int(fid & 0xFFFFFF)) # clamp HITMEs
         return mapper
 
     def getShortMapper(self):
@@ -421,6 +570,86 @@ def getMgefName(self):
     def __repr__(self):
         return u'ModFile<%s>' % self.fileInfo.name
 
+class PluginCache(object):
+    """Session-scoped cache of fully loaded plugins, shared between all
+    consumers that only need to read records from plugins (e.g. the initData
+    phase of the import patchers, or a CSV export). Loaded plugins are keyed
+    by path and by the record types they were loaded with. Consumers should
+    register the record types they will need up front via register_sigs, so
+    that every plugin gets loaded with the union of all those types and hence
+    parsed only once.
+
+    The ModFile objects handed out, and the records in them, are shared by
+    all consumers, so they are read-only. They are loaded without keepAll,
+    so trying to save them raises a StateError. Consumers must copy any
+    mutable value they keep around (e.g. a list of entries or a struct),
+    since it may end up in another consumer's data too. Use a regular
+    ModFile to edit, merge or save a plugin. The cache is bounded by the
+    total number of records it holds, which is what its memory usage scales
+    with, and evicts the least recently used plugins first."""
+    def __init__(self, max_records=250000):
+        self._max_records = max_records
+        self._wanted_sigs = set()
+        # Maps plugin path to a tuple of (ModFile, frozenset of loaded record
+        # types, number of loaded records, stat tuple), most recently used
+        # last
+        self._cached = OrderedDict()
+        self._cached_records = 0
+
+    def register_sigs(self, rec_sigs):
+        """Registers the specified record types as ones that will be requested
+        from this cache in this session."""
+        self._wanted_sigs.update(rec_sigs)
+
+    def load_plugin(self, mod_info, rec_sigs):
+        """Returns a read-only ModFile for the specified ModInfo, which will
+        have (at least) the specified record types loaded, unpacked and
+        converted to long FormIDs.
+
+        :param mod_info: The ModInfo object to load.
+        :param rec_sigs: An iterable of the record types needed."""
+        rec_sigs = frozenset(rec_sigs)
+        plugin_key = mod_info.abs_path
+        try:
+            stat_tuple = mod_info.abs_path.size_mtime()
+        except OSError:
+            stat_tuple = None
+        cached = self._cached.pop(plugin_key, None)
+        if cached:
+            self._cached_records -= cached[2]
+            if cached[3] == stat_tuple and cached[1] >= rec_sigs:
+                self._store(plugin_key, cached)
+                return cached[0]
+            # We need more record types, or the plugin changed on disk
+            self._wanted_sigs.update(cached[1])
+        self._wanted_sigs.update(rec_sigs)
+        load_sigs = frozenset(self._wanted_sigs)
+        mod_file = ModFile(mod_info, LoadFactory(
+            False, *[MreRecord.type_class[s] for s in load_sigs]))
+        mod_file.load(do_unpack=True)
+        num_records = sum(1 for block in mod_file.tops.itervalues()
+                          for _record in block.iter_records())
+        self._store(plugin_key, (mod_file, load_sigs, num_records,
+                                 stat_tuple))
+        return mod_file
+
+    def _store(self, plugin_key, cache_entry):
+        """Stores the specified entry as the most recently used one, evicting
+        the least recently used ones if we go over our record limit."""
+        self._cached[plugin_key] = cache_entry
+        self._cached_records += cache_entry[2]
+        # Always keep at least the entry we just stored around
+        while self._cached_records > self._max_records and \
+                len(self._cached) > 1:
+            _evicted_key, evicted = self._cached.popitem(last=False)
+            self._cached_records -= evicted[2]
+
+    def clear(self):
+        """Drops all cached plugins, ending this session."""
+        self._cached.clear()
+        self._cached_records = 0
+        self._wanted_sigs.clear()
+
 # TODO(inf) Use this for a bunch of stuff in mods_metadata.py (e.g. UDRs)
 class ModHeaderReader(object):
     """Allows very fast reading of a plugin's headers, skipping reading and
@@ -98,6 +98,10 @@ def __init__(self):
         # Automatically set in _parse_sources to the patch file's aliases -
         # used if the Aliases Patcher has been enabled
         self.aliases = {}
+        # A mod_files.PluginCache to load plugins we only read from (i.e. not
+        # the ones passed to writeToMod) through. May be shared with other
+        # parsers, None means every plugin gets loaded from scratch
+        self.plugin_cache = None
 
     # Plugin-related utilities
     def _mod_has_tag(self, tag_name):
@@ -107,15 +111,18 @@ def _mod_has_tag(self, tag_name):
         return self._current_mod and tag_name in bosh.modInfos[
             self._current_mod].getBashTags()
 
-    @staticmethod
-    def _load_plugin(mod_info, target_types):
+    def _load_plugin(self, mod_info, target_types, read_only=False):
         """Loads the specified record types in the specified ModInfo and
         returns the result.
 
         :param mod_info: The ModInfo object to read.
         :param target_types: A list, set or tuple containing strings that shows
             which record types to load.
+        :param read_only: If True, the caller promises not to edit the result,
+            so it may come from (and stay in) our plugin_cache.
         :return: An object representing the loaded plugin."""
+        if read_only and self.plugin_cache:
+            return self.plugin_cache.load_plugin(mod_info, target_types)
         mod_file = ModFile(mod_info, LoadFactory(
             False, *[MreRecord.type_class[t] for t in target_types]))
         mod_file.load(do_unpack=True)
@@ -145,7 +152,7 @@ def _fp_loop(mod_to_read):
         for mod_name in master_names:
             if mod_name in self._fp_mods: continue
             _fp_loop(self._load_plugin(bosh.modInfos[mod_name],
-                                       self._fp_types))
+                                       self._fp_types, read_only=True))
         # Finally, process the mod itself
         if loaded_mod.fileInfo.name in self._fp_mods: return
         _fp_loop(loaded_mod)
@@ -218,7 +225,7 @@ def readFromMod(self, mod_info):
             self._current_mod = None
             return
         # Load mod_info once and for all, then execute every needed pass
-        loaded_mod = self._load_plugin(mod_info, a_types)
+        loaded_mod = self._load_plugin(mod_info, a_types, read_only=True)
         if self._fp_types:
             self._read_plugin_fp(loaded_mod)
         if self._sp_types:
@@ -72,6 +72,12 @@ def initData(self,progress):
         """Compiles material, i.e. reads source text, esp's, etc. as
         necessary."""
 
+    def get_init_data_sigs(self):
+        """Returns the signatures of the record types this patcher will load
+        through the patch file's plugin_cache in initData, so that each plugin
+        only has to be loaded once for all patchers."""
+        return ()
+
     def scan_mod_file(self, modFile, progress):
         """Scans specified mod file to extract info. May add record to patch
         mod, but won't alter it. If adds record, should first convert it to
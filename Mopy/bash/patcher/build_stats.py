@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+#
+# GPL License and Copyright Notice ============================================
+#  This file is part of Wrye Bash.
+#
+#  Wrye Bash is free software: you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  Wrye Bash is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with Wrye Bash.  If not, see <https://www.gnu.org/licenses/>.
+#
+#  Wrye Bash copyright (C) 2005-2009 Wrye, 2010-2020 Wrye Bash Team
+#  https://github.com/wrye-bash
+#
+# =============================================================================
+"""Lightweight instrumentation for Bashed Patch builds. Records wall time, CPU
+time, record counts and memory usage for each phase of a build, broken down
+by patcher and (while scanning) by plugin."""
+from __future__ import division
+import json
+import os
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+
+from .. import env
+
+def _cpu_time():
+    """Returns the user + system CPU time used by this process so far."""
+    process_times = os.times()
+    return process_times[0] + process_times[1]
+
+class BuildStats(object):
+    """Collects measurements for a single Bashed Patch build. Each measurement
+    is a dict with the keys 'phase', 'patcher', 'plugin', 'wall_time',
+    'cpu_time', 'records_scanned', 'records_written' and 'peak_rss_growth'.
+    The latter is by how many bytes the code measured raised the peak memory
+    usage of the process - the peak itself is process-wide, so it is only
+    kept once, in peak_rss. Measuring the same phase, patcher and plugin
+    again adds to the existing measurement, so a patcher scanning every
+    plugin still only gets one. All it does per measurement is read two
+    clocks and one memory counter, so it is always on."""
+    # The phases of a build, in the order they happen
+    phases = (u'initData', u'initFactories', u'scanLoadMods', u'buildPatch',
+              u'save')
+
+    def __init__(self):
+        # Maps (phase, patcher, plugin) to the measurement for it
+        self._measurements = OrderedDict()
+        self.peak_rss = 0
+
+    @property
+    def measurements(self):
+        return self._measurements.values()
+
+    @contextmanager
+    def measure(self, phase, patcher=None, plugin=None):
+        """Context manager that measures the code executed inside it and
+        adds the result to the measurement for the specified phase, patcher
+        name and plugin name. Yields the measurement dict, so that the caller
+        can add to records_scanned and records_written."""
+        m_key = (phase, patcher, plugin and u'%s' % plugin)
+        try:
+            measurement = self._measurements[m_key]
+        except KeyError:
+            measurement = self._measurements[m_key] = {
+                u'phase': phase, u'patcher': patcher, u'plugin': m_key[2],
+                u'wall_time': 0, u'cpu_time': 0, u'records_scanned': 0,
+                u'records_written': 0, u'peak_rss_growth': 0}
+        start_peak = env.get_peak_memory_usage()
+        start_wall, start_cpu = time.time(), _cpu_time()
+        try:
+            yield measurement
+        finally:
+            measurement[u'wall_time'] += time.time() - start_wall
+            measurement[u'cpu_time'] += _cpu_time() - start_cpu
+            end_peak = env.get_peak_memory_usage()
+            measurement[u'peak_rss_growth'] += end_peak - start_peak
+            self.peak_rss = max(self.peak_rss, end_peak)
+
+    def _totals(self, key_attr, wanted):
+        """Sums up wall time, CPU time, record counts and peak memory growth
+        of all measurements for which wanted returns True, grouped by the
+        value of key_attr."""
+        totals = OrderedDict()
+        for m in self.measurements:
+            if not wanted(m): continue
+            curr = totals.setdefault(m[key_attr], defaultdict(int))
+            for k in (u'wall_time', u'cpu_time', u'records_scanned',
+                      u'records_written', u'peak_rss_growth'):
+                curr[k] += m[k]
+        return totals
+
+    def phase_totals(self):
+        """Returns an OrderedDict mapping the phases that were measured to
+        dicts holding their summed up wall time, CPU time, record counts and
+        peak memory growth."""
+        return self._totals(u'phase',
+            lambda m: not m[u'patcher'] and not m[u'plugin'])
+
+    def log_stats(self, log, max_plugins=10):
+        """Writes a summary of the collected measurements to the specified
+        patch log."""
+        def _fmt(t):
+            return _(u'%(wall).3fs wall, %(cpu).3fs CPU') % {
+                u'wall': t[u'wall_time'], u'cpu': t[u'cpu_time']}
+        log.setHeader(u'= ' + _(u'Build Statistics'), True)
+        log.setHeader(u'=== ' + _(u'Phases'))
+        phase_totals = self.phase_totals()
+        for phase in self.phases:
+            if phase not in phase_totals: continue
+            log(u'* %s: %s, %s' % (phase, _fmt(phase_totals[phase]),
+                _(u'peak memory +%.1f MB') % (
+                    phase_totals[phase][u'peak_rss_growth'] / 1048576)))
+        log(u'* ' + _(u'Peak memory usage: %.1f MB') % (
+            self.peak_rss / 1048576))
+        log.setHeader(u'=== ' + _(u'Patchers'))
+        patcher_totals = self._totals(u'patcher', lambda m: m[u'patcher'])
+        for patcher, p_totals in sorted(patcher_totals.iteritems(),
+                key=lambda i: i[1][u'wall_time'], reverse=True):
+            log(u'* %s: %s, %s' % (patcher, _fmt(p_totals),
+                _(u'%(scanned)d records scanned, %(written)d kept') % {
+                    u'scanned': p_totals[u'records_scanned'],
+                    u'written': p_totals[u'records_written']}))
+        plugin_totals = self._totals(u'plugin', lambda m: m[u'plugin'] and
+            not m[u'patcher'] and m[u'phase'] == u'scanLoadMods')
+        if plugin_totals:
+            log.setHeader(u'=== ' + _(u'Slowest Plugins'))
+            for plugin, p_totals in sorted(plugin_totals.iteritems(),
+                    key=lambda i: i[1][u'wall_time'],
+                    reverse=True)[:max_plugins]:
+                log(u'* %s: %s, %s' % (plugin, _fmt(p_totals),
+                    _(u'%d records') % p_totals[u'records_scanned']))
+
+    def write_report(self, report_path):
+        """Writes all collected measurements as JSON to the specified
+        path."""
+        with report_path.open(u'wb') as out:
+            json.dump({u'version': 2, u'peak_rss': self.peak_rss,
+                       u'measurements': self.measurements}, out, indent=1,
+                      sort_keys=True)
@@ -34,7 +34,8 @@
 from ..bolt import GPath, SubProgress, deprint, Progress
 from ..exception import BoltError, CancelError, ModError
 from ..localize import format_date
-from ..mod_files import ModFile, LoadFactory
+from ..mod_files import ModFile, LoadFactory, PluginCache, FormIdTable
+from .build_stats import BuildStats
 
 # the currently executing patch set in _Mod_Patch_Update before showing the
 # dialog - used in getAutoItems, to get mods loading before the patch
@@ -133,10 +134,21 @@ def init_patchers_data(self, patchers, progress):
         """Gives each patcher a chance to get its source data."""
         self._patcher_instances = [p for p in patchers if p.isActive]
         if not self._patcher_instances: return
+        # Let patchers share the plugins they load - union the record types
+        # they need so that each plugin only gets loaded once
+        for patcher in self._patcher_instances:
+            self.plugin_cache.register_sigs(patcher.get_init_data_sigs())
         progress = progress.setFull(len(self._patcher_instances))
-        for index, patcher in enumerate(self._patcher_instances):
-            progress(index, _(u'Preparing') + u'\n' + patcher.getName())
-            patcher.initData(SubProgress(progress, index))
+        measure = self.build_stats.measure
+        try:
+            with measure(u'initData'), self.form_ids.interning():
+                for index, patcher in enumerate(self._patcher_instances):
+                    progress(index, _(u'Preparing') + u'\n' +
+                             patcher.getName())
+                    with measure(u'initData', patcher.getName()):
+                        patcher.initData(SubProgress(progress, index))
+        finally:
+            self.plugin_cache.clear()
         progress(progress.full, _(u'Patchers prepared.'))
         # initData may set isActive to zero - TODO(ut) track down
         self._patcher_instances = [p for p in patchers if p.isActive]
@@ -169,6 +181,13 @@ def __init__(self, modInfo):
         self.loadSet = frozenset(self.loadMods)
         self.set_mergeable_mods([])
         self.p_file_minfos = bosh.modInfos
+        # Read-only plugins shared by the patchers during initData
+        self.plugin_cache = PluginCache()
+        # The long FormIDs of the plugins loaded during this build - see
+        # FormIdTable. The phases of the build make it active while they run
+        self.form_ids = FormIdTable()
+        # Timings, record counts and memory usage of this build
+        self.build_stats = BuildStats()
 
     def getKeeper(self):
         """Returns a function to add fids to self.keepIds."""
@@ -186,6 +205,10 @@ def new_gmst(self, gmst_eid, gmst_val):
 
     def initFactories(self,progress):
         """Gets load factories."""
+        with self.build_stats.measure(u'initFactories'):
+            self._init_factories(progress)
+
+    def _init_factories(self, progress):
         progress(0,_(u"Processing."))
         readClasses = {x for x in bush.game.readClasses}
         writeClasses = {x for x in bush.game.writeClasses}
@@ -201,56 +224,80 @@ def initFactories(self,progress):
 
     def scanLoadMods(self,progress):
         """Scans load+merge mods."""
+        with self.build_stats.measure(u'scanLoadMods'), \
+                self.form_ids.interning():
+            self._scan_load_mods(progress)
+
+    def _scan_load_mods(self, progress):
         nullProgress = Progress()
         progress = progress.setFull(len(self.allMods))
         for index,modName in enumerate(self.allMods):
-            modInfo = bosh.modInfos[modName]
-            bashTags = modInfo.getBashTags()
-            if modName in self.loadSet and u'Filter' in bashTags:
-                self.unFilteredMods.append(modName)
-            try:
-                loadFactory = (self.readFactory,self.mergeFactory)[modName in self.mergeSet]
-                progress(index, u'%s\n' % modName + _(u'Loading...'))
-                modFile = ModFile(modInfo,loadFactory)
-                modFile.load(True,SubProgress(progress,index,index+0.5))
-            except ModError as e:
-                deprint('load error:', traceback=True)
-                self.loadErrorMods.append((modName,e))
-                continue
-            try:
-                #--Error checks
-                if 'WRLD' in modFile.tops and modFile.WRLD.orphansSkipped:
-                    self.worldOrphanMods.append(modName)
-                # TODO adapt for other games
-                if bush.game.fsName == u'Oblivion' and 'SCPT' in \
-                        modFile.tops and \
-                        modName != GPath(bush.game.master_file):
-                    gls = modFile.SCPT.getRecord(0x00025811)
-                    if gls and gls.compiled_size == 4 and gls.last_index == 0:
-                        self.compiledAllMods.append(modName)
-                pstate = index+0.5
-                isMerged = modName in self.mergeSet
-                doFilter = isMerged and u'Filter' in bashTags
-                #--iiMode is a hack to support Item Interchange. Actual key used is IIM.
-                iiMode = isMerged and u'IIM' in bashTags
-                if isMerged:
-                    progress(pstate, u'%s\n' % modName + _(u'Merging...'))
-                    self.mergeModFile(modFile, doFilter, iiMode)
-                else:
-                    progress(pstate, u'%s\n' % modName + _(u'Scanning...'))
-                    self.update_patch_records_from_mod(modFile)
-                for patcher in sorted(self._patcher_instances,
-                        key=attrgetter(u'patcher_order')):
-                    if iiMode and not patcher.iiMode: continue
-                    progress(pstate, u'%s\n%s' % (modName, patcher.getName()))
-                    patcher.scan_mod_file(modFile,nullProgress)
-            except CancelError:
-                raise
-            except:
-                print(u'MERGE/SCAN ERROR: %s' % modName)
-                raise
+            with self.build_stats.measure(u'scanLoadMods',
+                                          plugin=modName) as plugin_stats:
+                self._scan_load_mod(index, modName, progress, nullProgress,
+                                    plugin_stats)
         progress(progress.full,_(u'Load mods scanned.'))
 
+    def _scan_load_mod(self, index, modName, progress, nullProgress,
+                       plugin_stats):
+        """Loads, merges and/or scans a single load or merge mod, storing
+        the number of records it contains in plugin_stats."""
+        modInfo = bosh.modInfos[modName]
+        bashTags = modInfo.getBashTags()
+        if modName in self.loadSet and u'Filter' in bashTags:
+            self.unFilteredMods.append(modName)
+        try:
+            loadFactory = (self.readFactory,self.mergeFactory)[modName in self.mergeSet]
+            progress(index, u'%s\n' % modName + _(u'Loading...'))
+            modFile = ModFile(modInfo,loadFactory)
+            modFile.load(True,SubProgress(progress,index,index+0.5))
+        except ModError as e:
+            deprint('load error:', traceback=True)
+            self.loadErrorMods.append((modName,e))
+            return
+        # Count the records per top group once, patchers only scan some
+        top_counts = {top_sig: block.getNumRecords(False)
+                      for top_sig, block in modFile.tops.iteritems()}
+        plugin_stats[u'records_scanned'] += sum(top_counts.itervalues())
+        measure = self.build_stats.measure
+        try:
+            #--Error checks
+            if 'WRLD' in modFile.tops and modFile.WRLD.orphansSkipped:
+                self.worldOrphanMods.append(modName)
+            # TODO adapt for other games
+            if bush.game.fsName == u'Oblivion' and 'SCPT' in \
+                    modFile.tops and \
+                    modName != GPath(bush.game.master_file):
+                gls = modFile.SCPT.getRecord(0x00025811)
+                if gls and gls.compiled_size == 4 and gls.last_index == 0:
+                    self.compiledAllMods.append(modName)
+            pstate = index+0.5
+            isMerged = modName in self.mergeSet
+            doFilter = isMerged and u'Filter' in bashTags
+            #--iiMode is a hack to support Item Interchange. Actual key used is IIM.
+            iiMode = isMerged and u'IIM' in bashTags
+            if isMerged:
+                progress(pstate, u'%s\n' % modName + _(u'Merging...'))
+                self.mergeModFile(modFile, doFilter, iiMode)
+            else:
+                progress(pstate, u'%s\n' % modName + _(u'Scanning...'))
+                self.update_patch_records_from_mod(modFile)
+            for patcher in sorted(self._patcher_instances,
+                    key=attrgetter(u'patcher_order')):
+                if iiMode and not patcher.iiMode: continue
+                progress(pstate, u'%s\n%s' % (modName, patcher.getName()))
+                with measure(u'scanLoadMods',
+                             patcher.getName()) as patcher_stats:
+                    patcher_stats[u'records_scanned'] += sum(
+                        top_counts.get(s, 0) for s in
+                        set(patcher.getReadClasses()))
+                    patcher.scan_mod_file(modFile,nullProgress)
+        except CancelError:
+            raise
+        except:
+            print(u'MERGE/SCAN ERROR: %s' % modName)
+            raise
+
     def mergeModFile(self, modFile, doFilter, iiMode):
         """Copies contents of modFile into self."""
         def add_to_factories(merged_sig):
@@ -283,6 +330,13 @@ def buildPatch(self,log,progress):
         """Completes merge process. Use this when finished using
         scanLoadMods."""
         if not self._patcher_instances: return
+        with self.build_stats.measure(u'buildPatch') as build_stats, \
+                self.form_ids.interning():
+            self._build_patch(log, progress)
+            build_stats[u'records_written'] += sum(
+                x.getNumRecords(False) for x in self.tops.values())
+
+    def _build_patch(self, log, progress):
         self._log_header(log, self.fileInfo.name)
         # Run buildPatch on each patcher
         self.keepIds |= self.mergeIds
@@ -290,7 +344,12 @@ def buildPatch(self,log,progress):
         for index,patcher in enumerate(sorted(self._patcher_instances,
                 key=attrgetter(u'patcher_order'))):
             subProgress(index,_(u'Completing')+u'\n%s...' % patcher.getName())
-            patcher.buildPatch(log,SubProgress(subProgress,index))
+            kept_before = len(self.keepIds)
+            with self.build_stats.measure(u'buildPatch',
+                                          patcher.getName()) as patcher_stats:
+                patcher.buildPatch(log,SubProgress(subProgress,index))
+                patcher_stats[u'records_written'] += (len(self.keepIds) -
+                                                      kept_before)
         # Trim records to only keep ones we actually changed
         progress(0.9,_(u'Completing')+u'\n'+_(u'Trimming records...'))
         for block in self.tops.values():
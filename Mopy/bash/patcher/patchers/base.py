@@ -24,18 +24,32 @@
 """This module contains base patcher classes."""
 from __future__ import print_function
 from collections import Counter, defaultdict
+from copy import deepcopy
+from functools import partial
 from itertools import chain
 # Internal
 from .. import getPatchesPath
 from ..base import AMultiTweakItem, AMultiTweaker, Patcher, AListPatcher
 from ... import load_order, bush
-from ...bolt import GPath, CsvReader, deprint
+from ...bolt import GPath, CsvReader, Path, deprint
 from ...brec import MreRecord
 from ...exception import AbstractError
 
 # Patchers 1 ------------------------------------------------------------------
 class ListPatcher(AListPatcher,Patcher): pass
 
+_immutable_types = (type(None), bool, int, long, float, basestring, Path)
+def copy_mutable(attr_value):
+    """Returns a deep copy of the specified attribute value of a record read
+    through the plugin cache, which shares its records with other patchers.
+    Values that can't be changed in place (e.g. numbers, strings and
+    FormIDs) are returned as is, which covers most of them."""
+    if isinstance(attr_value, _immutable_types) or (
+            type(attr_value) is tuple and all(
+            isinstance(v, _immutable_types) for v in attr_value)):
+        return attr_value
+    return deepcopy(attr_value)
+
 class MultiTweakItem(AMultiTweakItem):
     # If True, do not call tweak_scan_file and pool the records this tweak
     # wants together with other tweaks so that we can do one big record copy
@@ -44,6 +58,8 @@ class MultiTweakItem(AMultiTweakItem):
     # anything but CELL, DIAL and WRLD). See the wiki page '[dev] Tweak
     # Pooling' for a detailed overview of its implementation.
     supports_pooling = True
+    # The record types this tweak loads in init_tweak_data
+    tweak_init_data_sigs = ()
 
     def getReadClasses(self):
         """Returns load factory classes needed for reading."""
@@ -53,6 +69,13 @@ def getWriteClasses(self):
         """Returns load factory classes needed for writing."""
         return self.__class__.tweak_read_classes
 
+    def init_tweak_data(self, patch_file):
+        """Gives this tweak a chance to read the records it needs from plugins
+        other than the patch during initData, using the specified patch file
+        instance. Plugins must be loaded through patch_file.plugin_cache, with
+        the record types in tweak_init_data_sigs - the records are shared, so
+        treat them as read-only. Default implementation does nothing."""
+
     def prepare_for_tweaking(self, patch_file):
         """Gives this tweak a chance to use prepare for the phase where it gets
         its tweak_record calls using the specified patch file instance. At this
@@ -98,6 +121,12 @@ def initData(self,progress):
         for tweak in self.enabled_tweaks: # type: MultiTweakItem
             for read_sig in tweak.getReadClasses():
                 t_dict[read_sig][tweak.supports_pooling].append(tweak)
+            tweak.init_tweak_data(self.patchFile)
+
+    def get_init_data_sigs(self):
+        return tuple(set(chain.from_iterable(
+            tweak.tweak_init_data_sigs for tweak in self.enabled_tweaks))) \
+            if self.isActive else ()
 
     def getReadClasses(self):
         """Returns load factory classes needed for reading."""
@@ -237,6 +266,21 @@ def getWriteClasses(self):
         return tuple(
             MreRecord.simpleTypes | ({'CELL', 'WRLD', 'REFR', 'ACHR', 'ACRE'}))
 
+    def _import_refs(self, src_cell_block, get_dest_cell_block):
+        """Copies all references from the specified source cell block whose
+        base is to be replaced into the cell block returned by
+        get_dest_cell_block, which is only called if at least one such
+        reference exists. Returns True if any references were copied."""
+        old_new = self.old_new
+        dest_cell_block = None
+        for list_attr in (u'temp_refs', u'persistent_refs'):
+            for record in getattr(src_cell_block, list_attr):
+                if record.base in old_new:
+                    if dest_cell_block is None:
+                        dest_cell_block = get_dest_cell_block()
+                    dest_cell_block.set_ref(list_attr, record)
+        return dest_cell_block is not None
+
     def scanModFile(self,modFile,progress):
         """Scans specified mod file to extract info. May add record to patch mod,
         but won't alter it."""
@@ -249,127 +293,64 @@ def scanModFile(self,modFile,progress):
 ##                    getattr(self.patchFile,type).setRecord(record)
         if 'CELL' in modFile.tops:
             for cellBlock in modFile.CELL.cellBlocks:
-                cellImported = False
-                if cellBlock.cell.fid in patchCells.id_cellBlock:
-                    patchCells.id_cellBlock[cellBlock.cell.fid].cell = cellBlock.cell
-                    cellImported = True
-                for record in cellBlock.temp_refs:
-                    if record.base in self.old_new:
-                        if not cellImported:
-                            patchCells.setCell(cellBlock.cell)
-                            cellImported = True
-                        for newRef in patchCells.id_cellBlock[cellBlock.cell.fid].temp_refs:
-                            if newRef.fid == record.fid:
-                                loc = patchCells.id_cellBlock[cellBlock.cell.fid].temp_refs.index(newRef)
-                                patchCells.id_cellBlock[cellBlock.cell.fid].temp_refs[loc] = record
-                                break
-                        else:
-                            patchCells.id_cellBlock[cellBlock.cell.fid].temp_refs.append(record)
-                for record in cellBlock.persistent_refs:
-                    if record.base in self.old_new:
-                        if not cellImported:
-                            patchCells.setCell(cellBlock.cell)
-                            cellImported = True
-                        for newRef in patchCells.id_cellBlock[cellBlock.cell.fid].persistent_refs:
-                            if newRef.fid == record.fid:
-                                loc = patchCells.id_cellBlock[cellBlock.cell.fid].persistent_refs.index(newRef)
-                                patchCells.id_cellBlock[cellBlock.cell.fid].persistent_refs[loc] = record
-                                break
-                        else:
-                            patchCells.id_cellBlock[cellBlock.cell.fid].persistent_refs.append(record)
+                patch_cell_block = patchCells.get_cell_block(
+                    cellBlock.cell.fid)
+                if patch_cell_block:
+                    patch_cell_block.cell = cellBlock.cell
+                    self._import_refs(cellBlock, lambda: patch_cell_block)
+                else:
+                    self._import_refs(cellBlock,
+                        partial(patchCells.setCell, cellBlock.cell))
         if 'WRLD' in modFile.tops:
             for worldBlock in modFile.WRLD.worldBlocks:
-                worldImported = False
-                if worldBlock.world.fid in patchWorlds.id_worldBlocks:
-                    patchWorlds.id_worldBlocks[worldBlock.world.fid].world = worldBlock.world
-                    worldImported = True
+                patch_world_block = patchWorlds.get_world_block(
+                    worldBlock.world.fid)
+                if patch_world_block:
+                    patch_world_block.world = worldBlock.world
                 for cellBlock in worldBlock.cellBlocks:
-                    cellImported = False
-                    if worldBlock.world.fid in patchWorlds.id_worldBlocks and cellBlock.cell.fid in patchWorlds.id_worldBlocks[worldBlock.world.fid].id_cellBlock:
-                        patchWorlds.id_worldBlocks[worldBlock.world.fid].id_cellBlock[cellBlock.cell.fid].cell = cellBlock.cell
-                        cellImported = True
-                    for record in cellBlock.temp_refs:
-                        if record.base in self.old_new:
-                            if not worldImported:
-                                patchWorlds.setWorld(worldBlock.world)
-                                worldImported = True
-                            if not cellImported:
-                                patchWorlds.id_worldBlocks[worldBlock.world.fid].setCell(cellBlock.cell)
-                                cellImported = True
-                            for newRef in patchWorlds.id_worldBlocks[worldBlock.world.fid].id_cellBlock[cellBlock.cell.fid].temp_refs:
-                                if newRef.fid == record.fid:
-                                    loc = patchWorlds.id_worldBlocks[worldBlock.world.fid].id_cellBlock[cellBlock.cell.fid].temp_refs.index(newRef)
-                                    patchWorlds.id_worldBlocks[worldBlock.world.fid].id_cellBlock[cellBlock.cell.fid].temp_refs[loc] = record
-                                    break
-                            else:
-                                patchWorlds.id_worldBlocks[worldBlock.world.fid].id_cellBlock[cellBlock.cell.fid].temp_refs.append(record)
-                    for record in cellBlock.persistent_refs:
-                        if record.base in self.old_new:
-                            if not worldImported:
-                                patchWorlds.setWorld(worldBlock.world)
-                                worldImported = True
-                            if not cellImported:
-                                patchWorlds.id_worldBlocks[worldBlock.world.fid].setCell(cellBlock.cell)
-                                cellImported = True
-                            for newRef in patchWorlds.id_worldBlocks[worldBlock.world.fid].id_cellBlock[cellBlock.cell.fid].persistent_refs:
-                                if newRef.fid == record.fid:
-                                    loc = patchWorlds.id_worldBlocks[worldBlock.world.fid].id_cellBlock[cellBlock.cell.fid].persistent_refs.index(newRef)
-                                    patchWorlds.id_worldBlocks[worldBlock.world.fid].id_cellBlock[cellBlock.cell.fid].persistent_refs[loc] = record
-                                    break
-                            else:
-                                patchWorlds.id_worldBlocks[worldBlock.world.fid].id_cellBlock[cellBlock.cell.fid].persistent_refs.append(record)
+                    patch_cell_block = patch_world_block and \
+                        patch_world_block.get_cell_block(cellBlock.cell.fid)
+                    if patch_cell_block:
+                        patch_cell_block.cell = cellBlock.cell
+                        self._import_refs(cellBlock, lambda: patch_cell_block)
+                        continue
+                    def get_dest_cell_block(wrld=worldBlock.world,
+                                            cell=cellBlock.cell):
+                        return patchWorlds.setWorld(wrld).setCell(cell)
+                    if self._import_refs(cellBlock, get_dest_cell_block):
+                        # setWorld may have created the world block just now
+                        patch_world_block = patchWorlds.get_world_block(
+                            worldBlock.world.fid)
+
+    def _replace_refs(self, cellBlock, count):
+        """Replaces the base of every reference in the specified cell block
+        that is to be replaced in a single pass over the block. Returns True
+        if any references were changed."""
+        old_new = self.old_new
+        keep = self.patchFile.getKeeper()
+        cell_mod = cellBlock.cell.fid[0]
+        changed = False
+        for record in chain(cellBlock.temp_refs, cellBlock.persistent_refs):
+            new_base = old_new.get(record.base)
+            if new_base:
+                record.base = new_base
+                count[cell_mod] += 1
+                record.setChanged()
+                keep(record.fid)
+                changed = True
+        return changed
 
     def buildPatch(self,log,progress):
         """Adds merged fids to patchfile."""
         if not self.isActive: return
-        old_new,old_eid,new_eid = self.old_new,self.old_eid,self.new_eid
         keep = self.patchFile.getKeeper()
         count = Counter()
-        def swapper(oldId):
-            newId = old_new.get(oldId,None)
-            return newId if newId else oldId
-##        for type in MreRecord.simpleTypes:
-##            for record in getattr(self.patchFile,type).getActiveRecords():
-##                if record.fid in self.old_new:
-##                    record.fid = swapper(record.fid)
-##                    count.increment(record.fid[0])
-####                    record.mapFids(swapper,True)
-##                    record.setChanged()
-##                    keep(record.fid)
         for cellBlock in self.patchFile.CELL.cellBlocks:
-            for record in cellBlock.temp_refs:
-                if record.base in self.old_new:
-                    record.base = swapper(record.base)
-                    count[cellBlock.cell.fid[0]] += 1
-##                    record.mapFids(swapper,True)
-                    record.setChanged()
-                    keep(record.fid)
-            for record in cellBlock.persistent_refs:
-                if record.base in self.old_new:
-                    record.base = swapper(record.base)
-                    count[cellBlock.cell.fid[0]] += 1
-##                    record.mapFids(swapper,True)
-                    record.setChanged()
-                    keep(record.fid)
+            self._replace_refs(cellBlock, count)
         for worldBlock in self.patchFile.WRLD.worldBlocks:
             keepWorld = False
             for cellBlock in worldBlock.cellBlocks:
-                for record in cellBlock.temp_refs:
-                    if record.base in self.old_new:
-                        record.base = swapper(record.base)
-                        count[cellBlock.cell.fid[0]] += 1
-##                        record.mapFids(swapper,True)
-                        record.setChanged()
-                        keep(record.fid)
-                        keepWorld = True
-                for record in cellBlock.persistent_refs:
-                    if record.base in self.old_new:
-                        record.base = swapper(record.base)
-                        count[cellBlock.cell.fid[0]] += 1
-##                        record.mapFids(swapper,True)
-                        record.setChanged()
-                        keep(record.fid)
-                        keepWorld = True
+                keepWorld |= self._replace_refs(cellBlock, count)
             if keepWorld:
                 keep(worldBlock.world.fid)
 
@@ -31,7 +31,6 @@
 from ... import bush
 from ...brec import MreRecord
 from ...exception import ModSigMismatchError
-from ...mod_files import ModFile, LoadFactory
 
 #------------------------------------------------------------------------------
 ##: currently relies on the merged subrecord being sorted - fix that
@@ -53,6 +52,8 @@ def __init__(self, p_name, p_file, p_sources):
         p_sources = [x for x in p_sources if
                      x in p_file.p_file_minfos and x in p_file.allSet]
         super(_AMerger, self).__init__(p_name, p_file, p_sources)
+        # The records are tracked by packed fid (see FormIdTable.key) in
+        # id_deltas, mod_id_entries and touched
         self.id_deltas = defaultdict(list)
         merger_masters = set(chain.from_iterable(
             self._recurse_masters(srcMod, p_file.p_file_minfos)
@@ -89,21 +90,23 @@ def getReadClasses(self):
     def getWriteClasses(self):
         return self.getReadClasses()
 
+    def get_init_data_sigs(self):
+        return tuple(self._wanted_subrecord) if self.isActive else ()
+
     def initData(self,progress):
         if not self.isActive or not self.srcs: return
-        wanted_sigs = list(self._wanted_subrecord)
-        loadFactory = LoadFactory(False, *[MreRecord.type_class[x]
-                                           for x in wanted_sigs])
+        wanted_sigs = self.get_init_data_sigs()
+        load_plugin = self.patchFile.plugin_cache.load_plugin
+        fid_key = self.patchFile.form_ids.key
         progress.setFull(len(self.srcs))
         for index,srcMod in enumerate(self.srcs):
             srcInfo = self.patchFile.p_file_minfos[srcMod]
-            srcFile = ModFile(srcInfo,loadFactory)
-            srcFile.load(True)
+            srcFile = load_plugin(srcInfo, wanted_sigs)
             for block in wanted_sigs:
                 if block not in srcFile.tops: continue
                 self._present_sigs.add(block)
                 for record in srcFile.tops[block].getActiveRecords():
-                    self.touched.add(record.fid)
+                    self.touched.add(fid_key(record.fid))
             progress.plus()
         self.isActive = bool(self._present_sigs)
 
@@ -112,6 +115,7 @@ def scanModFile(self, modFile, progress):
         touched = self.touched
         id_deltas = self.id_deltas
         mod_id_entries = self.mod_id_entries
+        fid_key = self.patchFile.form_ids.key
         modName = modFile.fileInfo.name
         #--Master or source?
         if modName in self._masters_and_srcs:
@@ -120,9 +124,10 @@ def scanModFile(self, modFile, progress):
                 if curr_sig not in modFile.tops: continue
                 sr_attr = self._wanted_subrecord[curr_sig]
                 for record in modFile.tops[curr_sig].getActiveRecords():
-                    if record.fid in touched:
+                    rec_key = fid_key(record.fid)
+                    if rec_key in touched:
                         try:
-                            id_entries[record.fid] = getattr(
+                            id_entries[rec_key] = getattr(
                                 record, sr_attr)[:]
                         except AttributeError:
                             raise ModSigMismatchError(modName, record)
@@ -175,20 +180,22 @@ def scanModFile(self, modFile, progress):
                     # updating it is handled by
                     # mergeModFile/update_patch_records_from_mod
                     curr_fid = record.fid
-                    if curr_fid in touched and curr_fid not in id_records:
+                    if fid_key(curr_fid) in touched and \
+                            curr_fid not in id_records:
                         patchBlock.setRecord(record.getTypeCopy())
 
     def buildPatch(self,log,progress):
         if not self.isActive: return
         keep = self.patchFile.getKeeper()
         id_deltas = self.id_deltas
+        fid_key = self.patchFile.form_ids.key
         mod_count = Counter()
         en_key = self._entry_key
         for curr_sig in self._present_sigs:
             sr_attr = self._wanted_subrecord[curr_sig]
             for record in getattr(self.patchFile, unicode(
                     curr_sig, u'ascii')).records:
-                deltas = id_deltas[record.fid]
+                deltas = id_deltas.get(fid_key(record.fid))
                 if not deltas: continue
                 # Use sorted to preserve duplicates, but ignore order. This is
                 # safe because order does not matter for items.
@@ -306,37 +313,32 @@ def _insertPackage(self, id_merged_deleted, fi, index, pkg, recordData):
                         break
                     i += 1
 
+    def get_init_data_sigs(self):
+        return self.target_rec_types if self.isActive else ()
+
     def initData(self,progress):
         """Get data from source files."""
         if not self.isActive: return
         target_rec_types = self.target_rec_types
-        loadFactory = LoadFactory(False, *[MreRecord.type_class[x] for x
-                                           in target_rec_types])
+        load_plugin = self.patchFile.plugin_cache.load_plugin
         progress.setFull(len(self.srcs))
-        cachedMasters = {}
         mer_del = self.id_merged_deleted
         minfs = self.patchFile.p_file_minfos
         for index,srcMod in enumerate(self.srcs):
             tempData = {}
             if srcMod not in minfs: continue
             srcInfo = minfs[srcMod]
-            srcFile = ModFile(srcInfo,loadFactory)
+            srcFile = load_plugin(srcInfo, target_rec_types)
             bashTags = srcInfo.getBashTags()
-            srcFile.load(True)
             for recClass in (MreRecord.type_class[x] for x in target_rec_types):
                 if recClass.rec_sig not in srcFile.tops: continue
                 for record in srcFile.tops[
                     recClass.rec_sig].getActiveRecords():
-                    tempData[record.fid] = record.aiPackages
+                    # Copy, the lists get edited below and srcFile is shared
+                    tempData[record.fid] = list(record.aiPackages)
             for master in reversed(srcInfo.masterNames):
                 if master not in minfs: continue # or break filter mods
-                if master in cachedMasters:
-                    masterFile = cachedMasters[master]
-                else:
-                    masterInfo = minfs[master]
-                    masterFile = ModFile(masterInfo,loadFactory)
-                    masterFile.load(True)
-                    cachedMasters[master] = masterFile
+                masterFile = load_plugin(minfs[master], target_rec_types)
                 blocks = (MreRecord.type_class[x] for x in target_rec_types)
                 for block in blocks:
                     if block.rec_sig not in srcFile.tops: continue
@@ -446,36 +448,31 @@ def __init__(self, p_name, p_file, p_sources):
         self.id_merged_deleted = {}
         self._read_write_records = bush.game.actor_types
 
+    def get_init_data_sigs(self):
+        return self._read_write_records if self.isActive else ()
+
     def initData(self,progress):
         """Get data from source files."""
         if not self.isActive: return
         target_rec_types = self._read_write_records
-        loadFactory = LoadFactory(False, *[MreRecord.type_class[x] for x
-                                           in target_rec_types])
+        load_plugin = self.patchFile.plugin_cache.load_plugin
         progress.setFull(len(self.srcs))
-        cachedMasters = {}
         mer_del = self.id_merged_deleted
         minfs = self.patchFile.p_file_minfos
         for index,srcMod in enumerate(self.srcs):
             tempData = {}
             if srcMod not in minfs: continue
             srcInfo = minfs[srcMod]
-            srcFile = ModFile(srcInfo,loadFactory)
+            srcFile = load_plugin(srcInfo, target_rec_types)
             bashTags = srcInfo.getBashTags()
-            srcFile.load(True)
             for recClass in (MreRecord.type_class[x] for x in target_rec_types):
                 if recClass.rec_sig not in srcFile.tops: continue
                 for record in srcFile.tops[recClass.rec_sig].getActiveRecords():
-                    tempData[record.fid] = record.spells
+                    # Copy, the lists get edited below and srcFile is shared
+                    tempData[record.fid] = list(record.spells)
             for master in reversed(srcInfo.masterNames):
                 if master not in minfs: continue # or break filter mods
-                if master in cachedMasters:
-                    masterFile = cachedMasters[master]
-                else:
-                    masterInfo = minfs[master]
-                    masterFile = ModFile(masterInfo,loadFactory)
-                    masterFile.load(True)
-                    cachedMasters[master] = masterFile
+                masterFile = load_plugin(minfs[master], target_rec_types)
                 for block in (MreRecord.type_class[x] for x in target_rec_types):
                     if block.rec_sig not in srcFile.tops: continue
                     if block.rec_sig not in masterFile.tops: continue
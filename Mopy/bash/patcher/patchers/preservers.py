@@ -26,13 +26,12 @@
 from collections import defaultdict, Counter
 from itertools import chain
 # Internal
-from .base import ImportPatcher
+from .base import ImportPatcher, copy_mutable
 from .. import getPatchesPath
 from ... import bush, load_order, parsers
 from ...bolt import attrgetter_cache, deprint, floats_equal, setattr_deep
 from ...brec import MreRecord
 from ...exception import ModSigMismatchError
-from ...mod_files import ModFile, LoadFactory
 
 #------------------------------------------------------------------------------
 class _APreserver(ImportPatcher):
@@ -58,7 +57,8 @@ class _APreserver(ImportPatcher):
 
     def __init__(self, p_name, p_file, p_sources):
         super(_APreserver, self).__init__(p_name, p_file, p_sources)
-        #--(attribute-> value) dicts keyed by long fid.
+        #--(attribute-> value) dicts keyed by packed fid (see
+        # FormIdTable.key)
         self.id_data = defaultdict(dict)
         self.srcClasses = set() #--Record classes actually provided by src
         # mods/files.
@@ -118,13 +118,19 @@ def _process_csv_sources(self, parsed_sources):
         filtered_dict = {k: v for k, v in parsed_sources.iteritems()
                          if k and k in MreRecord.type_class}
         self.srcClasses.update(MreRecord.type_class[x] for x in filtered_dict)
+        fid_key = self.patchFile.form_ids.key
         for src_data in filtered_dict.itervalues():
-            self.id_data.update(src_data)
+            self.id_data.update((fid_key(fid), fid_data) for fid, fid_data
+                                in src_data.iteritems())
 
     def getReadClasses(self):
         return tuple(
             x.rec_sig for x in self.srcClasses) if self.isActive else ()
 
+    def get_init_data_sigs(self):
+        return tuple(x.rec_sig for x in self.recAttrs_class) if \
+            self.isActive else ()
+
     def getWriteClasses(self):
         return self.getReadClasses()
 
@@ -134,6 +140,7 @@ def _init_data_loop(self, recClass, srcFile, srcMod, temp_id_data,
         recAttrs = self.recAttrs_class[recClass]
         fid_attrs = self._fid_rec_attrs_class[recClass]
         loaded_mods = self.patchFile.loadSet
+        fid_key = self.patchFile.form_ids.key
         if self._multi_tag:
             # For multi-tag importers, we need to look up the applied bash tags
             # and use those to find all applicable attributes
@@ -154,23 +161,24 @@ def _init_data_loop(self, recClass, srcFile, srcMod, temp_id_data,
                     self.patchFile.patcher_mod_skipcount[
                         self._patcher_name][srcMod] += 1
                     continue
-            temp_id_data[record.fid] = {attr: __attrgetters[attr](record)
-                                        for attr in recAttrs}
+            temp_id_data[fid_key(record.fid)] = {
+                attr: copy_mutable(__attrgetters[attr](record))
+                for attr in recAttrs}
 
     # noinspection PyDefaultArgument
     def initData(self, progress, __attrgetters=attrgetter_cache):
         if not self.isActive: return
         id_data = self.id_data
-        loadFactory = LoadFactory(False, *self.recAttrs_class.keys())
+        fid_key = self.patchFile.form_ids.key
+        load_plugin = self.patchFile.plugin_cache.load_plugin
+        init_sigs = self.get_init_data_sigs()
         progress.setFull(len(self.srcs) + len(self.csv_srcs))
-        cachedMasters = {}
         minfs = self.patchFile.p_file_minfos
         for index,srcMod in enumerate(self.srcs):
             temp_id_data = {}
             if srcMod not in minfs: continue
             srcInfo = minfs[srcMod]
-            srcFile = ModFile(srcInfo,loadFactory)
-            srcFile.load(do_unpack=True)
+            srcFile = load_plugin(srcInfo, init_sigs)
             for recClass in self.recAttrs_class:
                 if recClass.rec_sig not in srcFile.tops: continue
                 self.srcClasses.add(recClass)
@@ -184,19 +192,14 @@ def initData(self, progress, __attrgetters=attrgetter_cache):
                 continue
             for master in srcInfo.masterNames:
                 if master not in minfs: continue # or break filter mods
-                if master in cachedMasters:
-                    masterFile = cachedMasters[master]
-                else:
-                    masterFile = ModFile(minfs[master], loadFactory)
-                    masterFile.load(True)
-                    cachedMasters[master] = masterFile
+                masterFile = load_plugin(minfs[master], init_sigs)
                 for recClass in self.recAttrs_class:
                     if recClass.rec_sig not in masterFile.tops: continue
                     if recClass not in self.classestemp: continue
                     for record in masterFile.tops[
                         recClass.rec_sig].iter_filtered_records(
                         self.getReadClasses()): # ugh, looks hideous...
-                        fid = record.fid
+                        fid = fid_key(record.fid)
                         if fid not in temp_id_data: continue
                         for attr, value in temp_id_data[fid].iteritems():
                             try:
@@ -214,6 +217,7 @@ def initData(self, progress, __attrgetters=attrgetter_cache):
     # noinspection PyDefaultArgument
     def scanModFile(self, modFile, progress, __attrgetters=attrgetter_cache):
         id_data = self.id_data
+        fid_key = self.patchFile.form_ids.key
         for recClass in self.srcClasses:
             if recClass.rec_sig not in modFile.tops: continue
             patchBlock = getattr(self.patchFile,
@@ -226,8 +230,10 @@ def scanModFile(self, modFile, progress, __attrgetters=attrgetter_cache):
                 fid = record.fid
                 # Skip if we've already copied this record or if we're not
                 # interested in it
-                if fid in copied_records or fid not in id_data: continue
-                for attr, value in id_data[fid].iteritems():
+                if fid in copied_records: continue
+                fid_data = id_data.get(fid_key(fid))
+                if fid_data is None: continue
+                for attr, value in fid_data.iteritems():
                     if __attrgetters[attr](record) != value:
                         patchBlock.setRecord(record.getTypeCopy())
                         break
@@ -237,13 +243,15 @@ def _inner_loop(self, keep, records, top_mod_rec, type_count,
                     __attrgetters=attrgetter_cache):
         loop_setattr = setattr_deep if self._deep_attrs else setattr
         id_data = self.id_data
+        fid_key = self.patchFile.form_ids.key
         for record in records:
             rec_fid = record.fid
-            if rec_fid not in id_data: continue
-            for attr, value in id_data[rec_fid].iteritems():
+            rec_data = id_data.get(fid_key(rec_fid))
+            if rec_data is None: continue
+            for attr, value in rec_data.iteritems():
                 if __attrgetters[attr](record) != value: break
             else: continue
-            for attr, value in id_data[rec_fid].iteritems():
+            for attr, value in rec_data.iteritems():
                 loop_setattr(record, attr, value)
             keep(rec_fid)
             type_count[top_mod_rec] += 1
@@ -449,6 +457,9 @@ def __init__(self, p_name, p_file, p_sources):
         self.cellData = defaultdict(dict)
         self.recAttrs = bush.game.cellRecAttrs # dict[unicode, tuple[str]]
 
+    def get_init_data_sigs(self):
+        return self._read_write_records if self.isActive else ()
+
     def initData(self, progress, __attrgetters=attrgetter_cache):
         """Get cells from source files."""
         if not self.isActive: return
@@ -466,8 +477,8 @@ def importCellBlockData(cellBlock):
                 actual_attrs = ((attrs - bush.game.cell_skip_interior_attrs)
                                 if cellBlock.cell.flags.isInterior else attrs)
                 for attr in actual_attrs:
-                    tempCellData[fid][attr] = __attrgetters[attr](
-                        cellBlock.cell)
+                    tempCellData[fid][attr] = copy_mutable(
+                        __attrgetters[attr](cellBlock.cell))
         def checkMasterCellBlockData(cellBlock):
             """
             Add attribute values from record(s) in master file(s).
@@ -486,10 +497,9 @@ def checkMasterCellBlockData(cellBlock):
                     master_attr = __attrgetters[attr](cellBlock.cell)
                     if tempCellData[rec_fid][attr] != master_attr:
                         cellData[rec_fid][attr] = tempCellData[rec_fid][attr]
-        loadFactory = LoadFactory(False, MreRecord.type_class[b'CELL'],
-                                         MreRecord.type_class[b'WRLD'])
+        load_plugin = self.patchFile.plugin_cache.load_plugin
+        init_sigs = self.get_init_data_sigs()
         progress.setFull(len(self.srcs))
-        cachedMasters = {}
         minfs = self.patchFile.p_file_minfos
         for srcMod in self.srcs:
             if srcMod not in minfs: continue
@@ -499,9 +509,7 @@ def checkMasterCellBlockData(cellBlock):
             # values from the value in any of srcMod's masters.
             tempCellData = defaultdict(dict)
             srcInfo = minfs[srcMod]
-            srcFile = ModFile(srcInfo,loadFactory)
-            srcFile.load(True)
-            cachedMasters[srcMod] = srcFile
+            srcFile = load_plugin(srcInfo, init_sigs)
             bashTags = srcInfo.getBashTags()
             # print bashTags
             tags = bashTags & set(self.recAttrs)
@@ -520,13 +528,7 @@ def checkMasterCellBlockData(cellBlock):
                         importCellBlockData(worldBlock.worldCellBlock)
             for master in srcInfo.masterNames:
                 if master not in minfs: continue # or break filter mods
-                if master in cachedMasters:
-                    masterFile = cachedMasters[master]
-                else:
-                    masterInfo = minfs[master]
-                    masterFile = ModFile(masterInfo,loadFactory)
-                    masterFile.load(True)
-                    cachedMasters[master] = masterFile
+                masterFile = load_plugin(minfs[master], init_sigs)
                 if b'CELL' in masterFile.tops:
                     for cellBlock in masterFile.CELL.cellBlocks:
                         checkMasterCellBlockData(cellBlock)
@@ -631,10 +633,12 @@ class ImportGraphicsPatcher(_APreserver):
     def _inner_loop(self, keep, records, top_mod_rec, type_count,
                     __attrgetters=attrgetter_cache):
         id_data = self.id_data
+        fid_key = self.patchFile.form_ids.key
         for record in records:
             fid = record.fid
-            if fid not in id_data: continue
-            for attr, value in id_data[fid].iteritems():
+            fid_data = id_data.get(fid_key(fid))
+            if fid_data is None: continue
+            for attr, value in fid_data.iteritems():
                 rec_attr = __attrgetters[attr](record)
                 if isinstance(rec_attr,
                               basestring) and isinstance(value, basestring):
@@ -650,7 +654,7 @@ def _inner_loop(self, keep, records, top_mod_rec, type_count,
                         # aren't __both__ NONE)
                 if rec_attr != value: break
             else: continue
-            for attr, value in id_data[fid].iteritems():
+            for attr, value in fid_data.iteritems():
                 setattr(record, attr, value)
             keep(fid)
             type_count[top_mod_rec] += 1
@@ -33,13 +33,12 @@
 import re
 from collections import defaultdict, Counter
 # Internal
-from ... import bosh, bush
+from ... import bush
 from ...bolt import GPath, deprint
-from ...brec import MreRecord, MelObject, strFid
+from ...brec import MelObject, strFid
 from ...exception import BoltError
-from ...mod_files import ModFile, LoadFactory
 from ...patcher.base import AMultiTweaker
-from .base import MultiTweakItem, ListPatcher
+from .base import MultiTweakItem, ListPatcher, copy_mutable
 
 # Utilities & Constants -------------------------------------------------------
 def _find_vanilla_eyes():
@@ -332,6 +331,9 @@ def __init__(self, p_name, p_file, p_sources, enabled_tweaks):
         self.vanilla_eyes = _find_vanilla_eyes()
         self.enabled_tweaks = enabled_tweaks
 
+    def get_init_data_sigs(self):
+        return (b'RACE',) if self.isActive and self.srcs else ()
+
     def initData(self,progress):
         """Get data from source files."""
         # HACK - wholesale copy of MultiTweaker.initData, see #494
@@ -341,15 +343,15 @@ def initData(self,progress):
         for tweak in self.enabled_tweaks: # type: MultiTweakItem
             for read_sig in tweak.getReadClasses():
                 t_dict[read_sig][tweak.supports_pooling].append(tweak)
+            tweak.init_tweak_data(self.patchFile)
         if not self.isActive or not self.srcs: return
-        loadFactory = LoadFactory(False,MreRecord.type_class['RACE'])
+        load_plugin = self.patchFile.plugin_cache.load_plugin
+        minfs = self.patchFile.p_file_minfos
         progress.setFull(len(self.srcs))
-        cachedMasters = {}
         for index,srcMod in enumerate(self.srcs):
-            if srcMod not in bosh.modInfos: continue
-            srcInfo = bosh.modInfos[srcMod]
-            srcFile = ModFile(srcInfo,loadFactory)
-            srcFile.load(True)
+            if srcMod not in minfs: continue
+            srcInfo = minfs[srcMod]
+            srcFile = load_plugin(srcInfo, (b'RACE',))
             bashTags = srcInfo.getBashTags()
             if 'RACE' not in srcFile.tops: continue
             self.tempRaceData = {} #so as not to carry anything over!
@@ -414,20 +416,14 @@ def initData(self,progress):
                 if u'R.AddSpells' in bashTags:
                     tempRaceData['AddSpells'] = race.spells
                 if u'R.ChangeSpells' in bashTags:
-                    raceData['spellsOverride'] = race.spells
+                    raceData['spellsOverride'] = race.spells[:]
                 if u'R.Description' in bashTags:
                     tempRaceData['text'] = race.text
             for master in srcInfo.masterNames:
-                if not master in bosh.modInfos: continue  # or break
+                if not master in minfs: continue  # or break
                 # filter mods
-                if master in cachedMasters:
-                    masterFile = cachedMasters[master]
-                else:
-                    masterInfo = bosh.modInfos[master]
-                    masterFile = ModFile(masterInfo,loadFactory)
-                    masterFile.load(True)
-                    if 'RACE' not in masterFile.tops: continue
-                    cachedMasters[master] = masterFile
+                masterFile = load_plugin(minfs[master], (b'RACE',))
+                if b'RACE' not in masterFile.tops: continue
                 for race in masterFile.RACE.getActiveRecords():
                     if race.fid not in self.tempRaceData: continue
                     tempRaceData = self.tempRaceData[race.fid]
@@ -441,7 +437,9 @@ def initData(self,progress):
                         del tempRaceData['AddSpells']
                     for race_key in tempRaceData:
                         if tempRaceData[race_key] != getattr(race, race_key):
-                            raceData[race_key] = tempRaceData[race_key]
+                            # Copy, the race came from the plugin cache
+                            raceData[race_key] = copy_mutable(
+                                tempRaceData[race_key])
             progress.plus()
 
     def scanModFile(self, modFile, progress):
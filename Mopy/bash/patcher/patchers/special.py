@@ -23,7 +23,7 @@
 import copy
 from collections import defaultdict
 from itertools import chain
-from operator import attrgetter
+from operator import attrgetter, itemgetter
 # Internal
 from .base import Patcher, ListPatcher
 from ... import bush
@@ -96,6 +96,9 @@ def __init__(self, p_name, p_file, p_sources, remove_empty, tag_choices):
         :type tag_choices: defaultdict[bolt.Path, set[unicode]]"""
         super(_AListsMerger, self).__init__(p_name, p_file, p_sources)
         self.isActive |= bool(p_file.loadSet) # Can do meaningful work even without sources
+        # The lists and their items are tracked by packed fid (see
+        # FormIdTable.key) in type_list, masterItems and the items, de_records
+        # and re_records sets of the lists
         self.type_list = {rec: {} for rec in self._read_write_records}
         self.masterItems = defaultdict(dict)
         # Calculate levelers/de_masters first, using unmodified self.srcs
@@ -125,12 +128,13 @@ def annotate_plugin(self, ann_plugin):
     def scanModFile(self, modFile, progress):
         #--Begin regular scan
         sc_name = modFile.fileInfo.name
+        fid_key = self.patchFile.form_ids.key
         #--PreScan for later Relevs/Delevs?
         if sc_name in self.de_masters:
             for list_type in self._read_write_records:
                 for de_list in getattr(modFile, list_type).getActiveRecords():
-                    self.masterItems[de_list.fid][sc_name] = set(
-                        self._get_entries(de_list))
+                    self.masterItems[fid_key(de_list.fid)][sc_name] = {
+                        fid_key(x) for x in self._get_entries(de_list)}
         #--Relev/Delev setup
         applied_tags = self.tag_choices[sc_name]
         is_relev = self._re_tag in applied_tags
@@ -141,21 +145,23 @@ def scanModFile(self, modFile, progress):
             new_lists = getattr(modFile, list_type)
             for new_list in new_lists.getActiveRecords():
                 list_fid = new_list.fid
+                list_key = fid_key(list_fid)
                 # FIXME(inf) This is hideous and slows everything down
                 if (sc_name == u'Unofficial Oblivion Patch.esp' and
                         list_fid in self.OverhaulUOPSkips):
-                    stored_lists[list_fid].mergeOverLast = True
+                    stored_lists[list_key].mergeOverLast = True
                     continue
                 is_list_owner = (list_fid[0] == sc_name)
                 #--Items, delevs and relevs sets
-                new_list.items = items = set(self._get_entries(new_list))
+                new_list.items = items = {fid_key(x) for x in
+                                          self._get_entries(new_list)}
                 if not is_list_owner:
                     #--Relevs
                     new_list.re_records = items.copy() if is_relev else set()
                     #--Delevs: all items in masters minus current items
                     new_list.de_records = delevs = set()
                     if is_delev:
-                        id_master_items = self.masterItems.get(list_fid)
+                        id_master_items = self.masterItems.get(list_key)
                         if id_master_items:
                             for de_master in modFile.tes4.masters:
                                 if de_master in id_master_items:
@@ -168,13 +174,14 @@ def scanModFile(self, modFile, progress):
                 if is_list_owner:
                     de_list = copy.deepcopy(new_list)
                     de_list.mergeSources = []
-                    stored_lists[list_fid] = de_list
-                elif list_fid not in stored_lists:
+                    stored_lists[list_key] = de_list
+                elif list_key not in stored_lists:
                     de_list = copy.deepcopy(new_list)
                     de_list.mergeSources = [sc_name]
-                    stored_lists[list_fid] = de_list
+                    stored_lists[list_key] = de_list
                 else:
-                    stored_lists[list_fid].mergeWith(new_list, sc_name)
+                    stored_lists[list_key].mergeWith(new_list, sc_name,
+                                                     fid_key)
 
     def buildPatch(self, log, progress):
         keep = self.patchFile.getKeeper()
@@ -192,15 +199,15 @@ def buildPatch(self, log, progress):
             for stored_list in sorted(stored_lists.values(),
                                       key=attrgetter('eid')):
                 if not stored_list.mergeOverLast: continue
-                list_fid = stored_list.fid
-                keep(list_fid)
-                patch_block.setRecord(stored_lists[list_fid])
+                keep(stored_list.fid)
+                patch_block.setRecord(stored_list)
                 log(u'* ' + stored_list.eid)
                 for merge_source in stored_list.mergeSources:
                     log(u'  * ' + self.annotate_plugin(merge_source))
                 self._check_list(stored_list, log)
         #--Discard empty sublists
         if not self.remove_empty_sublists: return
+        fid_key = self.patchFile.form_ids.key
         for list_type, list_label in self._type_to_label.iteritems():
             if list_type not in self._read_write_records: continue
             patch_block = getattr(self.patchFile, list_type)
@@ -209,15 +216,15 @@ def buildPatch(self, log, progress):
             # Build a dict mapping leveled lists to other leveled lists that
             # they are sublists in
             sub_supers = {x: [] for x in stored_lists.keys()}
-            for stored_list in sorted(stored_lists.values()):
-                list_fid = stored_list.fid
+            for list_key, stored_list in sorted(stored_lists.iteritems(),
+                                                key=itemgetter(1)):
                 if not stored_list.items:
-                    empty_lists.append(list_fid)
+                    empty_lists.append(list_key)
                 else:
                     sub_lists = [x for x in stored_list.items
                                 if x in sub_supers]
                     for sub_list in sub_lists:
-                        sub_supers[sub_list].append(list_fid)
+                        sub_supers[sub_list].append(list_key)
             #--Clear empties
             removed_empty_sublists = set()
             cleaned_lists = set()
@@ -231,7 +238,7 @@ def buildPatch(self, log, progress):
                     # Remove the emtpy list from this sublist
                     old_entries = stored_list.entries
                     stored_list.entries = [x for x in stored_list.entries
-                                           if x.listId != empty_list]
+                                           if fid_key(x.listId) != empty_list]
                     stored_list.items.remove(empty_list)
                     patch_block.setRecord(stored_list)
                     # If removing the empty list made this list empty too, then
@@ -245,7 +252,7 @@ def buildPatch(self, log, progress):
                     # an ITPO
                     if old_entries != stored_list.entries:
                         cleaned_lists.add(stored_list.eid)
-                        keep(sub_super)
+                        keep(stored_list.fid)
             log.setHeader(u'=== ' + _(u'Empty %s Sublists') % list_label)
             for list_eid in sorted(removed_empty_sublists, key=unicode.lower):
                 log(u'* ' + list_eid)
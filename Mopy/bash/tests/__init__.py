@@ -97,18 +97,46 @@ def iter_resources(resource_subfolder, filter_by_game=frozenset()):
 }
 # Cache for created and initialized GameInfos
 _game_cache = {}
+# GameInfo.init sets up class-level brec state (header formats, record
+# classes), so we have to restore each game's state when switching to it
+_brec_state_attrs = {
+    u'RecordHeader': (u'rec_header_size', u'rec_pack_format',
+                      u'rec_pack_format_str', u'header_unpack',
+                      u'sub_header_fmt', u'sub_header_unpack',
+                      u'sub_header_size', u'pack_formats', u'top_grup_sigs',
+                      u'valid_header_sigs', u'plugin_form_version'),
+    u'MreRecord': (u'type_class', u'simpleTypes'),
+}
+_default_brec_state = {}
+_game_brec_states = {}
+def _get_brec_state():
+    from .. import brec
+    return {(cls_name, a): getattr(getattr(brec, cls_name), a)
+            for cls_name, attrs in _brec_state_attrs.iteritems()
+            for a in attrs}
+
+def _set_brec_state(brec_state):
+    from .. import brec
+    for (cls_name, a), state_val in brec_state.iteritems():
+        setattr(getattr(brec, cls_name), a, state_val)
+
 def set_game(game_fsName):
     """Hotswitches bush.game to the game with the specified resource subfolder
     name."""
+    if not _default_brec_state: # no game initialized yet
+        _default_brec_state.update(_get_brec_state())
     # noinspection PyProtectedMember
     try:
         bush.game = _game_cache[game_fsName]
+        _set_brec_state(_game_brec_states[game_fsName])
     except KeyError:
         bush.game = new_game = bush._allGames[game_fsName](u'')
         from .. import brec
         brec.MelModel = None
+        _set_brec_state(_default_brec_state)
         new_game.init()
         _game_cache[game_fsName] = new_game
+        _game_brec_states[game_fsName] = _get_brec_state()
     bush.game_mod = bush._allModules[game_fsName]
     from .. import brec
     brec.MelModel = bush.game_mod.records._MelModel
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+#
+# GPL License and Copyright Notice ============================================
+#  This file is part of Wrye Bash.
+#
+#  Wrye Bash is free software: you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  Wrye Bash is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with Wrye Bash.  If not, see <https://www.gnu.org/licenses/>.
+#
+#  Wrye Bash copyright (C) 2005-2009 Wrye, 2010-2020 Wrye Bash Team
+#  https://github.com/wrye-bash
+#
+# =============================================================================
+from .._games_lo import _plan_restamp
+
+def _restamp(mtimes):
+    """Applies the mtime changes planned by _plan_restamp, checking that they
+    result in strictly increasing mtimes. Returns the indices of the plugins
+    that were restamped and the new mtimes."""
+    new_mtimes = _plan_restamp(mtimes)
+    restamped = [k for k, new_mtime in enumerate(new_mtimes)
+                 if new_mtime is not None]
+    applied = [old_mtime if new_mtime is None else new_mtime
+               for old_mtime, new_mtime in zip(mtimes, new_mtimes)]
+    assert all(a < b for a, b in zip(applied, applied[1:]))
+    return restamped, applied
+
+class TestPlanRestamp(object):
+    def test_sorted(self):
+        """Tests that nothing gets restamped if the order is already
+        correct."""
+        assert _restamp([]) == ([], [])
+        assert _restamp([1000, 1001, 5000])[0] == []
+
+    def test_ties(self):
+        """Tests that tied plugins after the master get spread out, but the
+        master keeps its mtime."""
+        assert _restamp([1000, 1000, 1000, 1000, 5000]) == (
+            [1, 2, 3], [1000, 2000, 3000, 4000, 5000])
+
+    def test_out_of_order(self):
+        """Tests that only the plugins out of order get restamped."""
+        assert _restamp([1000, 3000, 2000, 4000])[0] in ([1], [2])
+        assert _restamp([1000, 2000, 1500, 1600, 1700, 3000])[0] == [1]
+
+    def test_master_last(self):
+        """Tests that the master is never moved, even if all other plugins
+        are older than it."""
+        assert _restamp([5000, 1000, 2000]) == ([1, 2], [5000, 5060, 5120])
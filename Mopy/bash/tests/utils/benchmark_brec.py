@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+#
+# GPL License and Copyright Notice ============================================
+#  This file is part of Wrye Bash.
+#
+#  Wrye Bash is free software: you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  Wrye Bash is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with Wrye Bash.  If not, see <https://www.gnu.org/licenses/>.
+#
+#  Wrye Bash copyright (C) 2005-2009 Wrye, 2010-2020 Wrye Bash Team
+#  https://github.com/wrye-bash
+#
+# =============================================================================
+"""Script for benchmarking the brec layer. Generates synthetic plugins for
+every game that can build Bashed Patches (see synthetic_plugins) and times
+loading them via ModFile, scanning them via ModHeaderReader, saving them via
+ModFile and merging them into a Bashed Patch. Needs no game data, so it can
+run in CI.
+
+Timings can be stored as a baseline via --save-baseline. Later runs are then
+compared against that baseline and the script exits with a nonzero exit code
+if any timing regressed by more than --tolerance. Baselines are only
+comparable when taken on the same machine with the same options."""
+
+from __future__ import division, print_function
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+from timeit import default_timer
+
+from .. import resource_to_displayName, set_game
+from .synthetic_plugins import PluginSpec, SyntheticModInfo, emulate_bosh, \
+    full_load_factory, generate_plugin
+from ... import bush
+from ...bolt import GPath
+from ...exception import ModError
+from ...mod_files import LoadFactory, ModFile, ModHeaderReader
+
+_default_baseline = GPath(__file__).head.join(u'brec_baselines.json')
+
+def _time_best(bench_func, repeat, setup=None):
+    """Runs bench_func repeat times and returns the fastest wall time. If
+    setup is given, it is called (untimed) before every run and its result is
+    passed to bench_func."""
+    best = None
+    for _x in xrange(repeat):
+        bench_args = (setup(),) if setup else ()
+        start = default_timer()
+        bench_func(*bench_args)
+        elapsed = default_timer() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def _load_plugin(mod_info):
+    mod_file = ModFile(mod_info, full_load_factory())
+    mod_file.load(do_unpack=True, catch_errors=False)
+    loaded_records = sum(block.getNumRecords(False)
+                         for block in mod_file.tops.itervalues())
+    if loaded_records != mod_info.num_records:
+        raise ModError(mod_info.name, u'Loaded %u records, but %u were '
+                                      u'written' % (loaded_records,
+                                                    mod_info.num_records))
+    return mod_file
+
+def _build_patch(master_info, plugin_infos, out_dir):
+    """Emulates the merge, scan and save steps of a Bashed Patch build (see
+    PatchFile.mergeModFile, update_patch_records_from_mod and buildPatch),
+    since PatchFile itself needs a real load order. The first half of the
+    plugins is merged into the patch, the rest is scanned for overrides of
+    the merged records."""
+    merge_factory = LoadFactory(False, *bush.game.mergeClasses)
+    patch_file = ModFile(SyntheticModInfo(out_dir.join(
+        u'Bashed Patch, 0.esp')), LoadFactory(True, *bush.game.mergeClasses))
+    patch_file.longFids = True
+    load_set = frozenset([master_info.name] + [p.name for p in plugin_infos])
+    merge_set = frozenset(p.name for p in
+                          plugin_infos[:len(plugin_infos) // 2])
+    merge_ids = set()
+    for mod_info in [master_info] + plugin_infos:
+        mod_file = ModFile(mod_info, merge_factory)
+        mod_file.load(do_unpack=True, catch_errors=False)
+        if mod_info.name in merge_set:
+            for top_sig, block in mod_file.tops.iteritems():
+                getattr(patch_file, top_sig).merge_records(
+                    block, load_set, merge_ids, False, False)
+        else:
+            for top_sig in set(patch_file.tops) & set(mod_file.tops):
+                patch_file.tops[top_sig].updateRecords(
+                    mod_file.tops[top_sig], merge_ids)
+    keep_ids = set(merge_ids)
+    for block in patch_file.tops.itervalues():
+        block.keepRecords(keep_ids)
+    patch_file.tes4.masters = [master_info.name] + sorted(merge_set)
+    patch_file.save(patch_file.fileInfo.abs_path)
+
+def bench_game(game_fsName, parsed_args):
+    """Generates the synthetic plugins for the specified game and benchmarks
+    them, returning a dict mapping operation names to their best timings."""
+    set_game(game_fsName)
+    emulate_bosh()
+    out_dir = GPath(tempfile.mkdtemp(prefix=u'WryeBashBench'))
+    try:
+        master_spec = PluginSpec(u'Synthetic.esm',
+            num_records=parsed_args.records,
+            compressed_ratio=parsed_args.compressed,
+            localized=parsed_args.localized,
+            num_interior_cells=parsed_args.interior_cells,
+            num_worlds=parsed_args.worlds,
+            cells_per_world=parsed_args.cells_per_world,
+            refs_per_cell=parsed_args.refs_per_cell)
+        master_info = generate_plugin(master_spec, out_dir)
+        plugin_infos = [generate_plugin(PluginSpec(
+            u'Synthetic_%02d.esp' % i, master=master_spec,
+            num_records=parsed_args.records // 10,
+            compressed_ratio=parsed_args.compressed,
+            localized=parsed_args.localized,
+            num_interior_cells=parsed_args.interior_cells // 10,
+            refs_per_cell=parsed_args.refs_per_cell,
+            override_ratio=parsed_args.overrides, seed=i), out_dir)
+            for i in xrange(parsed_args.plugins)]
+        save_path = out_dir.join(u'Synthetic_Saved.esm')
+        repeat = parsed_args.repeat
+        return {
+            u'ModFile.load': _time_best(
+                lambda: _load_plugin(master_info), repeat),
+            u'ModHeaderReader': _time_best(
+                lambda: ModHeaderReader.read_mod_headers(master_info),
+                repeat),
+            # Loading leaves the fids in long format, so saving has to convert
+            # and repack every record - reload before each run to keep it so
+            u'ModFile.save': _time_best(
+                lambda loaded_master: loaded_master.save(save_path), repeat,
+                setup=lambda: _load_plugin(master_info)),
+            u'Bashed Patch': _time_best(
+                lambda: _build_patch(master_info, plugin_infos, out_dir),
+                repeat),
+        }
+    finally:
+        shutil.rmtree(out_dir.s, ignore_errors=True)
+
+def _bench_options(parsed_args):
+    """Returns the options that affect timings, to make sure we only compare
+    against baselines taken with the same options."""
+    return {o: getattr(parsed_args, o) for o in (
+        u'records', u'compressed', u'localized', u'interior_cells',
+        u'worlds', u'cells_per_world', u'refs_per_cell', u'plugins',
+        u'overrides')}
+
+def _compare(results, baseline, tolerance):
+    """Prints the results next to the baseline timings and returns the
+    number of timings that regressed by more than tolerance."""
+    num_regressions = 0
+    for gm_name, timings in sorted(results.iteritems()):
+        print(u'%s:' % gm_name)
+        base_timings = baseline.get(gm_name, {})
+        for op_name, op_time in sorted(timings.iteritems()):
+            base_time = base_timings.get(op_name)
+            if base_time is None:
+                print(u'  %-16s %8.3fs' % (op_name, op_time))
+                continue
+            change = (op_time - base_time) / base_time if base_time else 0.0
+            regressed = change > tolerance
+            num_regressions += regressed
+            print(u'  %-16s %8.3fs (baseline %.3fs, %+.1f%%)%s' % (
+                op_name, op_time, base_time, change * 100,
+                u' REGRESSION' if regressed else u''))
+    return num_regressions
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(u'-g', u'--games', nargs=u'+', metavar=u'GAME',
+                        choices=sorted(resource_to_displayName),
+                        help=u'the games to benchmark (default: all that can '
+                             u'build Bashed Patches)')
+    parser.add_argument(u'--records', type=int, default=20000,
+                        help=u'the number of non-cell records in the master')
+    parser.add_argument(u'--compressed', type=float, default=0.1,
+                        help=u'the fraction of compressed records')
+    parser.add_argument(u'--localized', action=u'store_true',
+                        help=u'generate localized plugins where supported')
+    parser.add_argument(u'--interior-cells', type=int, default=200)
+    parser.add_argument(u'--worlds', type=int, default=2)
+    parser.add_argument(u'--cells-per-world', type=int, default=256)
+    parser.add_argument(u'--refs-per-cell', type=int, default=20)
+    parser.add_argument(u'--plugins', type=int, default=8,
+                        help=u'the number of plugins to build a Bashed Patch '
+                             u'from, besides the master')
+    parser.add_argument(u'--overrides', type=float, default=0.05,
+                        help=u"the fraction of the master's records each "
+                             u'plugin overrides')
+    parser.add_argument(u'--repeat', type=int, default=3,
+                        help=u'the number of runs to take the best time of')
+    parser.add_argument(u'--baseline', type=unicode,
+                        default=_default_baseline.s,
+                        help=u'the baseline file to compare against')
+    parser.add_argument(u'--save-baseline', action=u'store_true',
+                        help=u'store the timings of this run as the baseline')
+    parser.add_argument(u'--tolerance', type=float, default=0.25,
+                        help=u'the slowdown relative to the baseline that '
+                             u'counts as a regression')
+    parsed_args = parser.parse_args()
+    wanted_games = [resource_to_displayName[g] for g in parsed_args.games or
+                    sorted(resource_to_displayName)]
+    results = {}
+    for gm_name in wanted_games:
+        # noinspection PyProtectedMember
+        if not bush._allGames[gm_name].Esp.canBash:
+            continue
+        print(u'Benchmarking %s...' % gm_name)
+        results[gm_name] = bench_game(gm_name, parsed_args)
+    baseline_path = GPath(parsed_args.baseline)
+    bench_options = _bench_options(parsed_args)
+    baseline = {}
+    if baseline_path.exists():
+        with baseline_path.open(u'r') as ins:
+            stored = json.load(ins)
+        if stored.get(u'options') == bench_options:
+            baseline = stored.get(u'timings', {})
+        else:
+            print(u'Baseline was taken with different options, not '
+                  u'comparing against it')
+    num_regressions = _compare(results, baseline, parsed_args.tolerance)
+    if parsed_args.save_baseline:
+        with baseline_path.open(u'w') as out:
+            json.dump({u'options': bench_options, u'timings': results}, out,
+                      indent=2, sort_keys=True)
+        print(u"Baseline written to '%s'" % baseline_path)
+    if num_regressions:
+        print(u'%u timing(s) regressed' % num_regressions)
+        sys.exit(1)
+
+if __name__ == u'__main__':
+    main()
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+#
+# GPL License and Copyright Notice ============================================
+#  This file is part of Wrye Bash.
+#
+#  Wrye Bash is free software: you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  Wrye Bash is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with Wrye Bash.  If not, see <https://www.gnu.org/licenses/>.
+#
+#  Wrye Bash copyright (C) 2005-2009 Wrye, 2010-2020 Wrye Bash Team
+#  https://github.com/wrye-bash
+#
+# =============================================================================
+"""Script for benchmarking what sharing long FormIDs through a FormIdTable
+(see mod_files.FormIdTable) saves when loading plugins the way a Bashed Patch
+build does. Generates a synthetic master and plugins overriding parts of it
+(see synthetic_plugins) once, then loads all of them in fresh child processes
+- once plainly and once with a FormIdTable active. Each child also keys a dict
+by the FormIDs of all loaded records and intersects and merges per-plugin
+sets of them, the way the patchers do. Running every load in its own process
+means that each peak memory usage only covers that load."""
+
+from __future__ import division, print_function
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from timeit import default_timer
+
+from .. import resource_to_displayName, set_game
+from .synthetic_plugins import PluginSpec, SyntheticModInfo, emulate_bosh, \
+    generate_plugin
+from ... import bush, env
+from ...bolt import GPath
+from ...mod_files import FormIdTable, LoadFactory, ModFile
+
+_master_name = u'Synthetic.esm'
+
+def generate_plugins(out_dir, parsed_args):
+    """Generates the master and the plugins overriding it in out_dir."""
+    master_spec = PluginSpec(_master_name, num_records=parsed_args.records,
+                             num_interior_cells=parsed_args.records // 100)
+    generate_plugin(master_spec, out_dir)
+    for i in xrange(parsed_args.plugins):
+        generate_plugin(PluginSpec(
+            u'Synthetic_%02d.esp' % i, master=master_spec,
+            num_records=parsed_args.records // 10,
+            num_interior_cells=parsed_args.records // 1000,
+            override_ratio=parsed_args.overrides, seed=i), out_dir)
+
+def measure_load(out_dir, use_table):
+    """Loads all plugins in out_dir, master first, with full FormIDs, keys a
+    dict by the FormIDs of all loaded records and intersects and merges the
+    sets of FormIDs of each plugin with those of the master. If use_table is
+    True, does so with a FormIdTable active and uses packed FormIDs as keys.
+    Returns a dict holding the load, keying and set operation times and by
+    how much loading raised the peak memory usage."""
+    start_peak = env.get_peak_memory_usage()
+    plugin_paths = sorted(out_dir.list(), key=lambda p: (p != _master_name,
+                                                         p))
+    load_factory = LoadFactory(False, *bush.game.mergeClasses)
+    fid_table = FormIdTable()
+    fid_key = fid_table.key if use_table else lambda fid: fid
+    start = default_timer()
+    loaded = []
+    for plugin_path in plugin_paths:
+        mod_file = ModFile(SyntheticModInfo(out_dir.join(plugin_path)),
+                           load_factory)
+        if use_table:
+            with fid_table.interning():
+                mod_file.load(do_unpack=True, catch_errors=False)
+        else:
+            mod_file.load(do_unpack=True, catch_errors=False)
+        loaded.append(mod_file)
+    load_time = default_timer() - start
+    start = default_timer()
+    id_records = {}
+    plugin_fids = []
+    for mod_file in loaded:
+        mod_fids = set()
+        for block in mod_file.tops.itervalues():
+            for record in block.iter_records():
+                rec_key = fid_key(record.fid)
+                id_records[rec_key] = record
+                mod_fids.add(rec_key)
+        plugin_fids.append(mod_fids)
+    key_time = default_timer() - start
+    start = default_timer()
+    master_fids = plugin_fids[0]
+    for _x in xrange(10):
+        for mod_fids in plugin_fids[1:]:
+            (master_fids & mod_fids) | (master_fids - mod_fids)
+    sets_time = default_timer() - start
+    return {u'load': load_time, u'key': key_time, u'sets': sets_time,
+            u'records': len(id_records),
+            u'peak_memory': env.get_peak_memory_usage() - start_peak}
+
+def _run_child(parsed_args, out_dir, use_table):
+    """Runs measure_load in a child process and returns its result."""
+    child_args = [sys.executable, u'-B', u'-m', __name__, u'-g',
+                  parsed_args.game, u'--child', out_dir.s]
+    if use_table: child_args.append(u'--table')
+    return json.loads(subprocess.check_output(child_args).splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(u'-g', u'--game', default=u'skyrim',
+                        choices=sorted(resource_to_displayName),
+                        help=u'the game to generate plugins for')
+    parser.add_argument(u'--records', type=int, default=30000,
+                        help=u'the number of non-cell records in the master')
+    parser.add_argument(u'--plugins', type=int, default=8,
+                        help=u'the number of plugins overriding the master')
+    parser.add_argument(u'--overrides', type=float, default=0.3,
+                        help=u"the fraction of the master's records each "
+                             u'plugin overrides')
+    parser.add_argument(u'--repeat', type=int, default=3,
+                        help=u'the number of runs per mode to take the best '
+                             u'result of')
+    # Internal, used to run measure_load in a child process
+    parser.add_argument(u'--child', help=argparse.SUPPRESS)
+    parser.add_argument(u'--table', action=u'store_true',
+                        help=argparse.SUPPRESS)
+    parsed_args = parser.parse_args()
+    set_game(resource_to_displayName[parsed_args.game])
+    emulate_bosh()
+    if parsed_args.child:
+        print(json.dumps(measure_load(GPath(parsed_args.child),
+                                      parsed_args.table)))
+        return
+    out_dir = GPath(tempfile.mkdtemp(prefix=u'WryeBashBench'))
+    try:
+        generate_plugins(out_dir, parsed_args)
+        for mode_name, use_table in ((u'tuples', False),
+                                     (u'FormIdTable', True)):
+            runs = [_run_child(parsed_args, out_dir, use_table)
+                    for _x in xrange(parsed_args.repeat)]
+            print(u'%-12s %u records, load %.3fs, key %.3fs, sets %.3fs, '
+                  u'peak memory +%.1f MB' % (mode_name, runs[0][u'records'],
+                min(r[u'load'] for r in runs), min(r[u'key'] for r in runs),
+                min(r[u'sets'] for r in runs),
+                min(r[u'peak_memory'] for r in runs) / 1048576))
+    finally:
+        shutil.rmtree(out_dir.s, ignore_errors=True)
+
+if __name__ == u'__main__':
+    main()
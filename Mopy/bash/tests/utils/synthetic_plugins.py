@@ -0,0 +1,378 @@
+# -*- coding: utf-8 -*-
+#
+# GPL License and Copyright Notice ============================================
+#  This file is part of Wrye Bash.
+#
+#  Wrye Bash is free software: you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  Wrye Bash is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with Wrye Bash.  If not, see <https://www.gnu.org/licenses/>.
+#
+#  Wrye Bash copyright (C) 2005-2009 Wrye, 2010-2020 Wrye Bash Team
+#  https://github.com/wrye-bash
+#
+# =============================================================================
+"""Generates synthetic plugins for the currently set game (see set_game in
+bash.tests), built purely from that game's record definitions. No game data
+is needed, so this can be used by benchmarks and tests alike.
+
+Note that bosh is never initialized in such a setting, so call emulate_bosh
+after every game switch - ModFile and the record groups query a few bits of
+bosh state."""
+
+from __future__ import division
+import random
+import zlib
+
+from ... import bosh, bush
+from ...bolt import GPath, deprint, sio, struct_pack
+from ...brec import MelLString, MreRecord, ModReader, ModWriter, \
+    RecHeader, RecordHeader
+from ...mod_files import LoadFactory, ModFile
+
+# Here be hacks ---------------------------------------------------------------
+class _StandInModInfos(object):
+    """Provides the bits of bosh.modInfos that the record groups need."""
+    def __init__(self):
+        self.masterName = GPath(bush.game.master_file)
+
+class _StandInIni(object):
+    """Provides the bits of bosh.oblivionIni that ModFile.load needs."""
+    @staticmethod
+    def get_ini_language(cached=True):
+        return u'English'
+
+def emulate_bosh():
+    """Points bosh.modInfos and bosh.oblivionIni at stand-ins for the current
+    game, unless the real ones have been set up."""
+    if bosh.modInfos is None or isinstance(bosh.modInfos, _StandInModInfos):
+        bosh.modInfos = _StandInModInfos()
+    if bosh.oblivionIni is None:
+        bosh.oblivionIni = _StandInIni()
+
+class SyntheticModInfo(object):
+    """Stands in for a ModInfo, providing just what ModFile and
+    ModHeaderReader need to load a synthetic plugin."""
+    def __init__(self, plugin_path, num_records=0):
+        self.abs_path = plugin_path
+        self.name = plugin_path.tail
+        self.mtime = None
+        # The number of records (not counting GRUPs) that were written
+        self.num_records = num_records
+
+    def getPath(self):
+        return self.abs_path
+
+    def getStringsPaths(self, lang=u'English'):
+        sbody, ext = self.name.sbody, self.name.ext
+        ret_paths = []
+        for join, format_str in bush.game.Esp.stringsFiles:
+            strings_path = self.abs_path.head.join(*join).join(format_str % {
+                u'body': sbody, u'ext': ext, u'language': lang})
+            if strings_path.exists():
+                ret_paths.append(strings_path)
+        return ret_paths
+
+    def __repr__(self):
+        return u'SyntheticModInfo<%s>' % self.name
+
+# Plugin generation -----------------------------------------------------------
+class PluginSpec(object):
+    """Describes the contents of a synthetic plugin."""
+    def __init__(self, plugin_name, master=None, num_records=1000,
+                 compressed_ratio=0.0, localized=False, num_interior_cells=0,
+                 num_worlds=0, cells_per_world=0, refs_per_cell=0,
+                 override_ratio=0.0, seed=0):
+        """Describes the contents of a synthetic plugin.
+
+        :param plugin_name: The file name of the plugin.
+        :param master: The PluginSpec of this plugin's master, or None if
+            this plugin has no masters.
+        :param num_records: The number of non-cell records to generate. The
+            record types are taken round-robin from all simple record types
+            of the current game.
+        :param compressed_ratio: The fraction of records that will be stored
+            compressed.
+        :param localized: If True and the current game supports it, FULL
+            subrecords are stored in a STRINGS file.
+        :param num_interior_cells: The number of interior cells.
+        :param num_worlds: The number of worldspaces.
+        :param cells_per_world: The number of exterior cells per worldspace.
+        :param refs_per_cell: The number of references placed in every cell,
+            one in ten of them persistent.
+        :param override_ratio: The fraction of the master's non-cell records
+            and interior cells that this plugin will override.
+        :param seed: Seeds the choice of overrides and compressed records."""
+        self.plugin_name = GPath(plugin_name)
+        self.master = master
+        self.num_records = num_records
+        self.compressed_ratio = compressed_ratio
+        self.localized = localized and bool(bush.game.Esp.stringsFiles)
+        self.num_interior_cells = num_interior_cells
+        self.num_worlds = num_worlds
+        self.cells_per_world = cells_per_world
+        self.refs_per_cell = refs_per_cell
+        self.override_ratio = override_ratio
+        self.seed = seed
+
+def full_load_factory():
+    """Returns a LoadFactory that fully loads all record types of the
+    current game."""
+    return LoadFactory(True, *MreRecord.type_class.itervalues())
+
+_first_object = 0x800 # lower object indices are reserved for the engine
+
+def _has_full(rec_class, __cache={}):
+    """Returns True if the specified record class has a top-level localized
+    FULL subrecord."""
+    try:
+        return __cache[rec_class]
+    except KeyError:
+        ret = __cache[rec_class] = any(
+            isinstance(e, MelLString) and e.subType == b'FULL'
+            for e in rec_class.melSet.elements)
+        return ret
+
+def _probe_record(rec_sig):
+    """Packs a record of the specified type with default values and loads it
+    back, raising an error if either step fails."""
+    probe = _new_record(rec_sig, _first_object, u'Probe')
+    probe.getSize()
+    with ModWriter(sio()) as out:
+        probe.dump(out)
+        probe_data = out.getvalue()
+    with ModReader(GPath(u'Probe'), sio(probe_data)) as ins:
+        MreRecord.type_class[rec_sig](ins.unpackRecHeader(), ins, True)
+
+def _buildable_sigs(__cache={}):
+    """Returns a sorted list of the signatures of all simple record types of
+    the current game that can be packed with their default values and loaded
+    back."""
+    try:
+        return __cache[bush.game.fsName]
+    except KeyError:
+        buildable = []
+        for rec_sig in sorted(MreRecord.simpleTypes & set(
+                RecordHeader.top_grup_sigs)):
+            try:
+                _probe_record(rec_sig)
+            except:
+                deprint(u'%s: cannot round-trip %s records with default '
+                        u'values, skipping' % (bush.game.displayName, rec_sig),
+                        traceback=True)
+                continue
+            buildable.append(rec_sig)
+        ret = __cache[bush.game.fsName] = buildable
+        return ret
+
+def _has_records(*rec_sigs):
+    """Returns True if the current game has record definitions for all of
+    the specified record types."""
+    return all(s in MreRecord.type_class for s in rec_sigs)
+
+def _new_record(rec_sig, fid, eid, full=None):
+    """Creates a record of the specified type with default values for
+    everything but its FormID, EDID and FULL."""
+    record = MreRecord.type_class[rec_sig](RecHeader(rec_sig, 0, 0, fid, 0))
+    if u'eid' in record.__slots__:
+        record.eid = eid
+    if full is not None and _has_full(record.__class__):
+        record.full = full
+    record.setChanged()
+    return record
+
+class _PluginWriter(object):
+    """Builds up and writes out a single synthetic plugin."""
+    def __init__(self, spec, out_dir):
+        self.spec = spec
+        self.out_dir = out_dir
+        # Masters come first in the FormID index space, the plugin itself last
+        self._own_index = int(spec.master is not None) << 24
+        self._next_object = _first_object
+        self._strings = {}
+        self._rand = random.Random(spec.seed)
+        self.num_records = 0
+        self.mod_file = ModFile(SyntheticModInfo(
+            out_dir.join(spec.plugin_name)), full_load_factory())
+
+    def _new_fid(self):
+        object_index = self._next_object
+        self._next_object += 1
+        return self._own_index | object_index
+
+    def _pack(self, record):
+        """Packs the specified record, localizing and compressing it as
+        requested by the spec."""
+        record.getSize()
+        rec_data = record.data
+        if self.spec.localized and _has_full(record.__class__):
+            rec_data = self._localize(record, rec_data)
+        if self._rand.random() < self.spec.compressed_ratio:
+            record.flags1.compressed = True
+            rec_data = struct_pack(u'=I', len(rec_data)) + zlib.compress(
+                rec_data, 6)
+        record.data = rec_data
+        record.size = len(rec_data)
+        self.num_records += 1
+        return record
+
+    def _localize(self, record, rec_data):
+        """Replaces the FULL subrecord in the specified record data with a
+        string ID, storing the string itself in the strings table."""
+        with ModReader(self.spec.plugin_name, sio(rec_data)) as ins:
+            with ModWriter(sio()) as out:
+                while not ins.atEnd(ins.size, record.recType):
+                    sub_type, sub_size = ins.unpackSubHeader(record.recType)
+                    sub_data = ins.read(sub_size, record.recType)
+                    if sub_type == b'FULL':
+                        string_id = len(self._strings) + 1
+                        self._strings[string_id] = record.full
+                        sub_data = struct_pack(u'=I', string_id)
+                    out.packSub(sub_type, sub_data)
+                return out.getvalue()
+
+    def build(self):
+        """Generates all records requested by the spec."""
+        spec = self.spec
+        tes4 = self.mod_file.tes4
+        tes4.author = u'Synthetic'
+        if spec.master is not None:
+            tes4.masters = [spec.master.plugin_name]
+        if bush.game.Esp.validHeaderVersions:
+            tes4.version = max(bush.game.Esp.validHeaderVersions)
+        tes4.flags1.esm = spec.plugin_name.cext == u'.esm'
+        tes4.flags1.hasStrings = spec.localized
+        self._build_records()
+        self._build_interior_cells()
+        self._build_worlds()
+        tes4.nextObject = self._next_object
+
+    def _build_records(self):
+        spec = self.spec
+        rec_sigs = _buildable_sigs()
+        if not rec_sigs: return
+        body = spec.plugin_name.sbody
+        for i in xrange(spec.num_records):
+            rec_sig = rec_sigs[i % len(rec_sigs)]
+            record = _new_record(rec_sig, self._new_fid(),
+                                 u'%s_%s_%06d' % (body, rec_sig, i),
+                                 u'%s %s %d' % (body, rec_sig, i))
+            getattr(self.mod_file, rec_sig).setRecord(self._pack(record))
+        # Override some of the master's records - these were generated by the
+        # loop above (in the master's writer), so we can rebuild their IDs
+        master = spec.master
+        if master is None or not spec.override_ratio: return
+        num_overrides = int(master.num_records * spec.override_ratio)
+        master_body = master.plugin_name.sbody
+        for i in sorted(self._rand.sample(xrange(master.num_records),
+                                          num_overrides)):
+            rec_sig = rec_sigs[i % len(rec_sigs)]
+            record = _new_record(rec_sig, _first_object + i,
+                                 u'%s_%s_%06d' % (master_body, rec_sig, i),
+                                 u'%s %s %d (%s)' % (master_body, rec_sig, i,
+                                                     body))
+            getattr(self.mod_file, rec_sig).setRecord(self._pack(record))
+
+    def _new_cell(self, cell_fid, eid, is_interior, pos_x=None, pos_y=None):
+        cell = _new_record(b'CELL', cell_fid, eid, eid)
+        cell.flags.isInterior = is_interior
+        if not is_interior:
+            cell.posX, cell.posY = pos_x, pos_y
+        return self._pack(cell)
+
+    def _add_refs(self, cell_block):
+        """Places spec.refs_per_cell references in the specified cell
+        block, if the current game has a definition for them."""
+        if not _has_records(b'REFR'): return
+        for i in xrange(self.spec.refs_per_cell):
+            ref = _new_record(b'REFR', self._new_fid(), None)
+            if i % 10 == 0:
+                ref.flags1.persistent = True
+                cell_block.persistent_refs.append(self._pack(ref))
+            else:
+                cell_block.temp_refs.append(self._pack(ref))
+
+    def _build_interior_cells(self):
+        spec = self.spec
+        if not spec.num_interior_cells or not _has_records(b'CELL'): return
+        cells_top = self.mod_file.CELL
+        body = spec.plugin_name.sbody
+        for i in xrange(spec.num_interior_cells):
+            cell = self._new_cell(self._new_fid(), u'%s_Cell_%04d' % (body, i),
+                                  True)
+            self._add_refs(cells_top.setCell(cell))
+        master = spec.master
+        if master is None or not spec.override_ratio: return
+        # The master's interior cells come right after its other records
+        num_overrides = int(master.num_interior_cells * spec.override_ratio)
+        master_body = master.plugin_name.sbody
+        for i in sorted(self._rand.sample(xrange(master.num_interior_cells),
+                                          num_overrides)):
+            cell = self._new_cell(_first_object + master.num_records + i,
+                                  u'%s_Cell_%04d' % (master_body, i), True)
+            self._add_refs(cells_top.setCell(cell))
+
+    def _build_worlds(self):
+        spec = self.spec
+        if not spec.num_worlds or not _has_records(b'CELL', b'WRLD'):
+            return
+        worlds_top = self.mod_file.WRLD
+        body = spec.plugin_name.sbody
+        grid_width = max(int(spec.cells_per_world ** 0.5), 1)
+        for i in xrange(spec.num_worlds):
+            world = _new_record(b'WRLD', self._new_fid(),
+                                u'%s_World_%02d' % (body, i))
+            world_block = worlds_top.setWorld(self._pack(world))
+            for j in xrange(spec.cells_per_world):
+                pos_y, pos_x = divmod(j, grid_width)
+                cell = self._new_cell(self._new_fid(), None, False,
+                                      pos_x - grid_width // 2,
+                                      pos_y - grid_width // 2)
+                self._add_refs(world_block.setCell(cell))
+
+    def write(self):
+        """Writes the plugin (and its STRINGS file, if any) to out_dir and
+        returns a SyntheticModInfo for it."""
+        self.mod_file.save(self.mod_file.fileInfo.abs_path)
+        if self._strings:
+            join, format_str = bush.game.Esp.stringsFiles[0]
+            strings_dir = self.out_dir.join(*join)
+            strings_dir.makedirs()
+            _write_strings_file(strings_dir.join(format_str % {
+                u'body': self.spec.plugin_name.sbody,
+                u'ext': self.spec.plugin_name.ext, u'language': u'English'}),
+                self._strings)
+        return SyntheticModInfo(self.mod_file.fileInfo.abs_path,
+                                self.num_records)
+
+def _write_strings_file(strings_path, strings):
+    """Writes the specified dict, mapping string IDs to strings, to a .STRINGS
+    file (i.e. one with null-terminated strings)."""
+    directory = []
+    string_data = []
+    offset = 0
+    for string_id, string_val in sorted(strings.iteritems()):
+        encoded = string_val.encode(u'utf-8') + b'\x00'
+        directory.append(struct_pack(u'=2I', string_id, offset))
+        string_data.append(encoded)
+        offset += len(encoded)
+    with strings_path.open(u'wb') as out:
+        out.write(struct_pack(u'=2I', len(strings), offset))
+        out.write(b''.join(directory))
+        out.write(b''.join(string_data))
+
+def generate_plugin(spec, out_dir):
+    """Generates the plugin described by the specified PluginSpec in out_dir,
+    returning a SyntheticModInfo for it. Its master, if any, is not
+    generated - call this for the master spec first."""
+    plugin_writer = _PluginWriter(spec, out_dir)
+    plugin_writer.build()
+    return plugin_writer.write()
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+#
+# GPL License and Copyright Notice ============================================
+#  This file is part of Wrye Bash.
+#
+#  Wrye Bash is free software: you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  Wrye Bash is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with Wrye Bash.  If not, see <https://www.gnu.org/licenses/>.
+#
+#  Wrye Bash copyright (C) 2005-2009 Wrye, 2010-2020 Wrye Bash Team
+#  https://github.com/wrye-bash
+#
+# =============================================================================
+"""Tests for the synthetic plugin generator and for the brec benchmark
+harness built on top of it."""
+import shutil
+import tempfile
+from argparse import Namespace
+
+import pytest
+
+from .. import set_game
+from . import benchmark_brec
+from .synthetic_plugins import PluginSpec, SyntheticModInfo, emulate_bosh, \
+    full_load_factory, generate_plugin
+from ...bolt import GPath
+from ...exception import StateError
+from ...mod_files import ModFile
+
+def _with_plugins(test_func, *plugin_specs):
+    """Generates the specified plugins for Skyrim in a temporary folder,
+    loads them fully and passes the resulting ModInfo and ModFile pairs to
+    test_func. Deletes the folder afterwards."""
+    set_game(u'Skyrim')
+    emulate_bosh()
+    out_dir = GPath(tempfile.mkdtemp(prefix=u'WryeBashTest'))
+    try:
+        loaded = []
+        for spec in plugin_specs:
+            mod_info = generate_plugin(spec, out_dir)
+            mod_file = ModFile(mod_info, full_load_factory())
+            mod_file.load(do_unpack=True, catch_errors=False)
+            loaded.append((mod_info, mod_file))
+        test_func(*loaded)
+    finally:
+        shutil.rmtree(out_dir.s, ignore_errors=True)
+
+def _loaded_records(mod_file):
+    return [r for block in mod_file.tops.itervalues()
+            for r in block.iter_records()]
+
+class TestGeneratePlugin(object):
+    def test_record_counts(self):
+        """Tests that all records that were written can be loaded again."""
+        def _check_counts(loaded_plugin):
+            mod_info, mod_file = loaded_plugin
+            assert len(_loaded_records(mod_file)) == mod_info.num_records
+            assert sum(b.getNumRecords(False) for b in
+                       mod_file.tops.itervalues()) == mod_info.num_records
+            # 50 records, 3 interior cells, the world and its 4 cells
+            assert mod_info.num_records == 58
+        _with_plugins(_check_counts, PluginSpec(
+            u'Synthetic.esm', num_records=50, num_interior_cells=3,
+            num_worlds=1, cells_per_world=4))
+
+    def test_compressed_localized(self):
+        """Tests that compressed and localized records load correctly."""
+        def _check_flags(loaded_plugin):
+            mod_info, mod_file = loaded_plugin
+            loaded_records = _loaded_records(mod_file)
+            assert len(loaded_records) == mod_info.num_records
+            assert any(r.flags1.compressed for r in loaded_records)
+            assert not all(r.flags1.compressed for r in loaded_records)
+            assert mod_file.tes4.flags1.hasStrings
+            assert mod_file.strings
+        _with_plugins(_check_flags, PluginSpec(
+            u'Synthetic.esm', num_records=50, compressed_ratio=0.5,
+            localized=True, num_interior_cells=2))
+
+    def test_overrides(self):
+        """Tests that a plugin overrides the requested fraction of its
+        master's records."""
+        master_spec = PluginSpec(u'Synthetic.esm', num_records=100)
+        def _check_overrides(loaded_master, loaded_plugin):
+            master_info, master_file = loaded_master
+            plugin_info, plugin_file = loaded_plugin
+            assert plugin_file.tes4.masters == [master_info.name]
+            master_fids = {r.fid for r in _loaded_records(master_file)}
+            plugin_fids = {r.fid for r in _loaded_records(plugin_file)}
+            assert len(master_fids & plugin_fids) == 20
+            assert len(plugin_fids) == plugin_info.num_records
+        _with_plugins(_check_overrides, master_spec, PluginSpec(
+            u'Synthetic_00.esp', master=master_spec, num_records=10,
+            override_ratio=0.2))
+
+class TestSaveUnloaded(object):
+    """Tests saving plugins whose groups were loaded without unpacking
+    them, i.e. are block copied from the plugin on save."""
+    def _check_save(self, plugin_spec, change_masters):
+        def _save_unloaded(loaded_plugin):
+            mod_info, mod_file = loaded_plugin
+            raw_file = ModFile(mod_info, full_load_factory())
+            raw_file.load(do_unpack=False, catch_errors=False)
+            if change_masters:
+                raw_file.tes4.masters.insert(0, GPath(u'Extra.esm'))
+            saved_path = mod_info.abs_path.head.join(u'Saved.esm')
+            raw_file.save(saved_path)
+            if change_masters:
+                saved_file = ModFile(SyntheticModInfo(saved_path),
+                                     full_load_factory())
+                saved_file.load(do_unpack=True, catch_errors=False)
+                assert len(_loaded_records(saved_file)) == \
+                       mod_info.num_records
+            else:
+                with mod_info.abs_path.open(u'rb') as ins:
+                    with saved_path.open(u'rb') as saved_ins:
+                        assert ins.read() == saved_ins.read()
+        _with_plugins(_save_unloaded, plugin_spec)
+
+    def test_same_masters(self):
+        """Tests that an unchanged plugin is saved byte for byte."""
+        self._check_save(PluginSpec(u'Synthetic.esm', num_records=50,
+                                    localized=True), False)
+
+    def test_changed_masters(self):
+        """Tests that a plugin can still be loaded after changing its
+        masters, which unpacks its groups."""
+        self._check_save(PluginSpec(u'Synthetic.esm', num_records=50,
+                                    compressed_ratio=0.5), True)
+
+    def test_localized_changed_masters(self):
+        """Tests that changing the masters of a localized plugin fails
+        instead of writing its strings inline."""
+        with pytest.raises(StateError):
+            self._check_save(PluginSpec(u'Synthetic.esm', num_records=50,
+                                        localized=True), True)
+
+# The benchmark harness -------------------------------------------------------
+def test_time_best():
+    """Tests that _time_best runs setup before every run, passes its result
+    on and returns the fastest run."""
+    fake_times = iter([0.0, 3.0, 10.0, 11.0, 20.0, 22.0])
+    setup_results = iter([u'a', u'b', u'c'])
+    seen_args = []
+    orig_timer = benchmark_brec.default_timer
+    benchmark_brec.default_timer = lambda: next(fake_times)
+    try:
+        assert benchmark_brec._time_best(seen_args.append, 3,
+            setup=lambda: next(setup_results)) == 1.0
+    finally:
+        benchmark_brec.default_timer = orig_timer
+    assert seen_args == [u'a', u'b', u'c']
+
+def test_bench_game():
+    """Runs the whole benchmark on tiny plugins."""
+    bench_options = Namespace(records=60, compressed=0.2, localized=False,
+        interior_cells=10, worlds=1, cells_per_world=4, refs_per_cell=3,
+        plugins=2, overrides=0.2, repeat=1)
+    timings = benchmark_brec.bench_game(u'Skyrim', bench_options)
+    assert set(timings) == {u'ModFile.load', u'ModHeaderReader',
+                            u'ModFile.save', u'Bashed Patch'}
+    assert all(t >= 0 for t in timings.itervalues())
+
+def test_compare():
+    """Tests that only timings slower than the tolerance allows count as
+    regressions."""
+    assert benchmark_brec._compare(
+        {u'Skyrim': {u'load': 1.5, u'save': 1.2, u'new': 9.0}},
+        {u'Skyrim': {u'load': 1.0, u'save': 1.0}}, 0.25) == 1